@@ -0,0 +1,188 @@
+# === avaliacao_lote.py ===
+# Classificação vetorizada (NumPy) de grandes lotes de tabuleiros
+# Chamar verificar_vitoria/verificar_empate de jogo.py uma vez por tabuleiro
+# custa microssegundos de Python por chamada; para análises e geração de dados
+# de treino com milhões de posições isso domina o tempo. Aqui o lote inteiro
+# é um array (N, 9) int8 e cada linha vencedora vira uma soma vetorizada:
+# soma 3 = X completou a linha, soma -3 = O completou.
+#
+# Codificação das casas (índice linha * 3 + coluna):
+#   0 = vazia, 1 = 'X', -1 = 'O'
+#
+# NumPy é opcional para o resto do projeto: só este módulo depende dele.
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+# === CÓDIGOS DAS CASAS ===
+CASA_VAZIA = 0
+CASA_X = 1
+CASA_O = -1
+CODIGO_SIMBOLO = {'X': CASA_X, 'O': CASA_O}
+
+# === RESULTADOS DE classificar() ===
+EM_ANDAMENTO = 0
+VITORIA_X = 1
+VITORIA_O = 2
+EMPATE = 3
+
+# As 8 linhas vencedoras como índices de casas (mesmas verificadas em jogo.py)
+LINHAS_VITORIA = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Linhas horizontais
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Colunas verticais
+    (0, 4, 8), (2, 4, 6),             # Diagonais principal e secundária
+)
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError("avaliacao_lote precisa do NumPy (pip install numpy)")
+
+
+def para_array(tabuleiros):
+    """
+    Converte tabuleiros de jogo.py (listas 3x3 de strings) em um array (N, 9).
+
+    Args:
+        tabuleiros: Sequência de tabuleiros no formato de jogo.py
+
+    Returns:
+        numpy.ndarray: Array int8 (N, 9) com 0, 1 (X) e -1 (O)
+    """
+    _exigir_numpy()
+    return np.array(
+        [[CODIGO_SIMBOLO.get(simbolo, CASA_VAZIA) for linha in tabuleiro for simbolo in linha]
+         for tabuleiro in tabuleiros],
+        dtype=np.int8,
+    ).reshape(-1, 9)
+
+
+def somas_linhas(tabuleiros):
+    """
+    Soma das 3 casas de cada linha vencedora, para todos os tabuleiros.
+
+    Args:
+        tabuleiros (numpy.ndarray): Array (N, 9) int8
+
+    Returns:
+        numpy.ndarray: Array (N, 8) int8 com valores de -3 a 3
+    """
+    _exigir_numpy()
+    tabuleiros = np.asarray(tabuleiros, dtype=np.int8)
+    # Uma soma por coluna de índices evita o array intermediário (N, 8, 3)
+    indices = np.array(LINHAS_VITORIA, dtype=np.intp)
+    somas = tabuleiros[:, indices[:, 0]]
+    somas = somas + tabuleiros[:, indices[:, 1]]
+    somas += tabuleiros[:, indices[:, 2]]
+    return somas
+
+
+def verificar_vitorias(tabuleiros, jogador):
+    """
+    Versão em lote de jogo.verificar_vitoria.
+
+    Args:
+        tabuleiros (numpy.ndarray): Array (N, 9) int8
+        jogador (str): 'X' ou 'O'
+
+    Returns:
+        numpy.ndarray: Array (N,) bool - True onde `jogador` completou uma linha
+    """
+    alvo = 3 * CODIGO_SIMBOLO[jogador]
+    return (somas_linhas(tabuleiros) == alvo).any(axis=1)
+
+
+def verificar_empates(tabuleiros):
+    """
+    Versão em lote de jogo.verificar_empate (tabuleiro sem casas vazias).
+
+    Como a função original, não olha vencedor: deve ser combinada com
+    verificar_vitorias (ou use classificar).
+
+    Returns:
+        numpy.ndarray: Array (N,) bool
+    """
+    _exigir_numpy()
+    return (np.asarray(tabuleiros) != CASA_VAZIA).all(axis=1)
+
+
+def classificar(tabuleiros):
+    """
+    Classifica cada tabuleiro como vitória de X, vitória de O, empate ou em andamento.
+
+    Segue a ordem de verificação do jogo: vitória antes de empate. Em
+    tabuleiros impossíveis com linhas dos dois jogadores, X tem precedência.
+
+    Args:
+        tabuleiros (numpy.ndarray): Array (N, 9) int8
+
+    Returns:
+        numpy.ndarray: Array (N,) int8 com EM_ANDAMENTO, VITORIA_X,
+                       VITORIA_O ou EMPATE
+    """
+    _exigir_numpy()
+    tabuleiros = np.asarray(tabuleiros, dtype=np.int8)
+    somas = somas_linhas(tabuleiros)
+    vitoria_x = (somas == 3).any(axis=1)
+    vitoria_o = (somas == -3).any(axis=1)
+    cheio = (tabuleiros != CASA_VAZIA).all(axis=1)
+
+    resultado = np.full(len(tabuleiros), EM_ANDAMENTO, dtype=np.int8)
+    resultado[cheio] = EMPATE
+    resultado[vitoria_o] = VITORIA_O
+    resultado[vitoria_x] = VITORIA_X
+    return resultado
+
+
+def todos_tabuleiros():
+    """Array (3^9, 9) com todas as combinações de casas (inclusive impossíveis)."""
+    _exigir_numpy()
+    indices = np.arange(3 ** 9)
+    digitos = (indices[:, None] // (3 ** np.arange(9))) % 3
+    return np.array([CASA_VAZIA, CASA_X, CASA_O], dtype=np.int8)[digitos]
+
+
+if __name__ == '__main__':
+    # Verificação contra jogo.py em todos os 3^9 tabuleiros + comparação de tempo
+    import time
+
+    import jogo
+
+    simbolos = {CASA_VAZIA: ' ', CASA_X: 'X', CASA_O: 'O'}
+    lote = todos_tabuleiros()
+    listas = [[[simbolos[int(v)] for v in linha[i:i + 3]] for i in (0, 3, 6)] for linha in lote]
+
+    inicio = time.perf_counter()
+    esperado = []
+    for tabuleiro in listas:
+        if jogo.verificar_vitoria(tabuleiro, 'X'):
+            esperado.append(VITORIA_X)
+        elif jogo.verificar_vitoria(tabuleiro, 'O'):
+            esperado.append(VITORIA_O)
+        elif jogo.verificar_empate(tabuleiro):
+            esperado.append(EMPATE)
+        else:
+            esperado.append(EM_ANDAMENTO)
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = classificar(lote)
+    t_lote = time.perf_counter() - inicio
+
+    assert (para_array(listas) == lote).all()
+    assert obtido.tolist() == esperado
+    for jogador in ('X', 'O'):
+        assert verificar_vitorias(lote, jogador).tolist() == [
+            jogo.verificar_vitoria(t, jogador) for t in listas]
+    assert verificar_empates(lote).tolist() == [jogo.verificar_empate(t) for t in listas]
+    print(f"{len(lote):,} tabuleiros idênticos a jogo.py")
+
+    grande = np.tile(lote, (50, 1))
+    inicio = time.perf_counter()
+    classificar(grande)
+    t_grande = time.perf_counter() - inicio
+    print(f"jogo.py (escalar): {len(lote) / t_escalar:>14,.0f} tabuleiros/s")
+    print(f"NumPy (lote):      {len(grande) / t_grande:>14,.0f} tabuleiros/s "
+          f"({len(lote) / t_lote:,.0f}/s no lote de {len(lote):,})")
@@ -0,0 +1,264 @@
+# === busca_iterativa.py ===
+# Bot "anytime" com aprofundamento iterativo e latência garantida
+# Busca alfa-beta de profundidade 1, 2, 3, ... sobre as regras de jogo.py
+# (via jogo_nk, que aceita qualquer tamanho de tabuleiro). A jogada devolvida
+# é sempre a da última iteração COMPLETA: quando o prazo (medido com
+# time.perf_counter) estoura no meio de uma iteração, ela é descartada.
+# Assim o tempo de resposta é limitado pelo prazo, qualquer que seja o
+# tabuleiro, e a qualidade da jogada cresce com o tempo disponível.
+#
+# Cada resultado traz nós visitados, profundidade alcançada e tempo gasto
+# para monitoramento dos bots no servidor.
+
+import time
+
+from jogo_nk import VAZIO, DIRECOES, TabuleiroNK, de_lista
+
+# === PARÂMETROS ===
+TEMPO_LIMITE_PADRAO = 0.5
+# Intervalo (em nós) entre consultas ao relógio dentro da busca
+NOS_POR_CONSULTA_RELOGIO = 32
+# Tabuleiros com até este número de casas consideram todas as casas livres;
+# nos maiores só entram casas vizinhas (distância 1) de alguma pedra
+CASAS_BUSCA_COMPLETA = 16
+
+VITORIA = 10 ** 9  # Valor de vitória (menos a distância, para vencer rápido)
+
+
+class TempoEsgotado(Exception):
+    """Prazo estourado no meio de uma iteração (uso interno)."""
+
+
+class ResultadoIterativo:
+    """
+    Resultado de uma jogada do bot.
+
+    Atributos:
+        jogada: (linha, coluna) escolhida, ou None se a partida já terminou
+        valor: Avaliação da jogada para quem joga (|valor| próximo de VITORIA
+               indica vitória/derrota forçada)
+        profundidade: Profundidade da última iteração completa
+        nos: Nós visitados (incluindo a iteração interrompida)
+        segundos: Tempo gasto na jogada
+    """
+
+    def __init__(self, jogada, valor, profundidade, nos, segundos):
+        self.jogada = jogada
+        self.valor = valor
+        self.profundidade = profundidade
+        self.nos = nos
+        self.segundos = segundos
+
+    def __repr__(self):
+        return (f"ResultadoIterativo(jogada={self.jogada}, valor={self.valor}, "
+                f"profundidade={self.profundidade}, nos={self.nos}, "
+                f"segundos={self.segundos:.3f})")
+
+
+def janelas_vitoria(largura, altura, k):
+    """
+    Todos os segmentos de K casas alinhadas (possíveis linhas vencedoras).
+
+    Returns:
+        list: Tuplas de índices (linha * largura + coluna)
+    """
+    janelas = []
+    for linha in range(altura):
+        for coluna in range(largura):
+            for dl, dc in DIRECOES:
+                fim_l = linha + dl * (k - 1)
+                fim_c = coluna + dc * (k - 1)
+                if 0 <= fim_l < altura and 0 <= fim_c < largura:
+                    janelas.append(tuple((linha + dl * i) * largura + coluna + dc * i
+                                         for i in range(k)))
+    return janelas
+
+
+class BuscaIterativa:
+    """
+    Alfa-beta com aprofundamento iterativo e prazo.
+
+    Atributos:
+        tempo_limite: Prazo padrão por jogada em segundos
+        nos: Nós visitados na busca atual
+    """
+
+    def __init__(self, tempo_limite=TEMPO_LIMITE_PADRAO):
+        self.tempo_limite = tempo_limite
+        self.nos = 0
+        self._prazo = 0.0
+        self._janelas = {}  # (largura, altura, k) -> janelas de vitória
+        self._pesos = ()
+
+    # =====================================================================
+    # AVALIAÇÃO E GERAÇÃO DE JOGADAS
+    # =====================================================================
+
+    def _avaliar(self, tabuleiro, jogador):
+        """
+        Heurística para posições não terminais, do ponto de vista de `jogador`.
+
+        Soma um peso por janela de K casas ocupada por um só jogador: quanto
+        mais pedras na janela, maior o peso (10^pedras).
+        """
+        casas = tabuleiro.casas
+        pesos = self._pesos
+        valor = 0
+        for janela in self._janelas[tabuleiro.largura, tabuleiro.altura, tabuleiro.k]:
+            meus = dele = 0
+            for indice in janela:
+                simbolo = casas[indice]
+                if simbolo == jogador:
+                    meus += 1
+                elif simbolo != VAZIO:
+                    dele += 1
+            if not dele:
+                valor += pesos[meus]
+            elif not meus:
+                valor -= pesos[dele]
+        return valor
+
+    def _candidatas(self, tabuleiro):
+        """Casas livres que valem a busca, em ordem de leitura."""
+        casas = tabuleiro.casas
+        if tabuleiro.total_casas <= CASAS_BUSCA_COMPLETA:
+            return [i for i, simbolo in enumerate(casas) if simbolo == VAZIO]
+        if not tabuleiro.historico:
+            # Tabuleiro grande vazio: começa pelo centro
+            return [(tabuleiro.altura // 2) * tabuleiro.largura + tabuleiro.largura // 2]
+
+        largura, altura = tabuleiro.largura, tabuleiro.altura
+        vizinhas = set()
+        for indice in tabuleiro.historico:
+            linha, coluna = divmod(indice, largura)
+            for l in range(max(0, linha - 1), min(altura, linha + 2)):
+                for c in range(max(0, coluna - 1), min(largura, coluna + 2)):
+                    if casas[l * largura + c] == VAZIO:
+                        vizinhas.add(l * largura + c)
+        return sorted(vizinhas)
+
+    # =====================================================================
+    # BUSCA
+    # =====================================================================
+
+    def _negamax(self, tabuleiro, profundidade, alfa, beta, distancia):
+        """Valor da posição para quem está na vez (alfa-beta limitado em profundidade)."""
+        self.nos += 1
+        if self.nos % NOS_POR_CONSULTA_RELOGIO == 0 and time.perf_counter() >= self._prazo:
+            raise TempoEsgotado()
+
+        if tabuleiro.vencedor is not None:
+            # A última jogada (do adversário) venceu
+            return -(VITORIA - distancia)
+        if tabuleiro.jogadas == tabuleiro.total_casas:
+            return 0
+        jogador = tabuleiro.proximo_jogador()
+        if profundidade == 0:
+            return self._avaliar(tabuleiro, jogador)
+
+        largura = tabuleiro.largura
+        melhor = -VITORIA - 1
+        for indice in self._candidatas(tabuleiro):
+            tabuleiro.realizar_jogada(indice // largura, indice % largura, jogador)
+            try:
+                valor = -self._negamax(tabuleiro, profundidade - 1, -beta, -alfa, distancia + 1)
+            finally:
+                tabuleiro.desfazer()
+            if valor > melhor:
+                melhor = valor
+            if melhor > alfa:
+                alfa = melhor
+            if alfa >= beta:
+                break
+        return melhor
+
+    def _iteracao(self, tabuleiro, profundidade, ordem):
+        """
+        Uma iteração completa na raiz.
+
+        Returns:
+            tuple: (melhor_indice, valor, ordem das jogadas por valor)
+        """
+        largura = tabuleiro.largura
+        jogador = tabuleiro.proximo_jogador()
+        alfa = -VITORIA - 1
+        avaliadas = []
+        for indice in ordem:
+            tabuleiro.realizar_jogada(indice // largura, indice % largura, jogador)
+            try:
+                valor = -self._negamax(tabuleiro, profundidade - 1, -VITORIA - 1, -alfa, 1)
+            finally:
+                tabuleiro.desfazer()
+            avaliadas.append((valor, indice))
+            if valor > alfa:
+                alfa = valor
+        # Ordena de forma estável: a próxima iteração começa pela melhor jogada
+        avaliadas.sort(key=lambda par: -par[0])
+        return avaliadas[0][1], avaliadas[0][0], [indice for _, indice in avaliadas]
+
+    def buscar(self, tabuleiro, tempo_limite=None, profundidade_maxima=None):
+        """
+        Escolhe uma jogada para quem está na vez dentro do prazo.
+
+        Args:
+            tabuleiro: TabuleiroNK ou tabuleiro 3x3 de jogo.py (não é modificado)
+            tempo_limite (float): Prazo em segundos (padrão: self.tempo_limite)
+            profundidade_maxima (int): Limite opcional de profundidade
+
+        Returns:
+            ResultadoIterativo: Jogada da última iteração completa e estatísticas
+        """
+        inicio = time.perf_counter()
+        if tempo_limite is None:
+            tempo_limite = self.tempo_limite
+        self._prazo = inicio + tempo_limite
+        self.nos = 0
+
+        tabuleiro = de_lista(tabuleiro).copiar()
+        if tabuleiro.terminou():
+            return ResultadoIterativo(None, 0, 0, 0, time.perf_counter() - inicio)
+
+        chave = (tabuleiro.largura, tabuleiro.altura, tabuleiro.k)
+        if chave not in self._janelas:
+            self._janelas[chave] = janelas_vitoria(*chave)
+        self._pesos = tuple(10 ** n if n else 0 for n in range(tabuleiro.k + 1))
+
+        ordem = self._candidatas(tabuleiro)
+        # Sem nenhuma iteração completa, ao menos uma jogada válida é devolvida
+        melhor, valor, profundidade = ordem[0], 0, 0
+        restantes = tabuleiro.total_casas - tabuleiro.jogadas
+        limite = min(restantes, profundidade_maxima or restantes)
+
+        for alvo in range(1, limite + 1):
+            try:
+                melhor, valor, ordem = self._iteracao(tabuleiro, alvo, ordem)
+            except TempoEsgotado:
+                break
+            profundidade = alvo
+            if abs(valor) >= VITORIA - tabuleiro.total_casas:
+                break  # Resultado forçado: aprofundar não muda a jogada
+            if time.perf_counter() >= self._prazo:
+                break
+
+        return ResultadoIterativo(divmod(melhor, tabuleiro.largura), valor, profundidade,
+                                  self.nos, time.perf_counter() - inicio)
+
+
+def melhor_jogada(tabuleiro, tempo_limite=TEMPO_LIMITE_PADRAO):
+    """
+    Jogada do bot dentro do prazo.
+
+    Returns:
+        tuple: (linha, coluna) ou None se a partida já terminou
+    """
+    return BuscaIterativa(tempo_limite).buscar(tabuleiro).jogada
+
+
+if __name__ == '__main__':
+    # Latência e profundidade alcançada em tabuleiros de tamanhos diferentes
+    busca = BuscaIterativa()
+    for largura, altura, k, prazo in ((3, 3, 3, 0.5), (7, 7, 4, 0.5), (15, 15, 5, 0.2)):
+        tabuleiro = TabuleiroNK(largura, altura, k)
+        tabuleiro.realizar_jogada(altura // 2, largura // 2, 'X')
+        resultado = busca.buscar(tabuleiro, prazo)
+        print(f"{largura}x{altura} K={k}, prazo {prazo:.1f} s: {resultado}")
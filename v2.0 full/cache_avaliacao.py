@@ -0,0 +1,268 @@
+# === cache_avaliacao.py ===
+# Cache persistente de avaliações (LRU com limite de memória)
+# As avaliações dos bots eram recalculadas do zero a cada execução. Este
+# cache guarda valores indexados pela chave canônica da posição (o menor dos 8
+# hashes Zobrist simétricos de solver.py), com capacidade máxima e despejo do
+# item usado há mais tempo (LRU).
+#
+# Ao encerrar, salvar() grava as entradas em um arquivo compacto: cabeçalho +
+# registros de 12 bytes (chave de 64 bits, valor de 32 bits) ordenados pela
+# chave. Na próxima execução o arquivo é mapeado com mmap: nada é lido na
+# inicialização, e uma consulta que falha na memória faz busca binária no
+# arquivo e promove a entrada para o LRU. Partidas repetidas começam "quentes".
+#
+# O Solver compartilhado de solver.py usa abrir_cache_padrao(): o arquivo fica
+# ao lado deste módulo e é regravado ao sair só se algo novo foi avaliado.
+
+import atexit
+import mmap
+import os
+import struct
+import tempfile
+from collections import OrderedDict
+
+# === FORMATO DO ARQUIVO ===
+CABECALHO = struct.Struct('<4sII')  # assinatura, versão, quantidade de registros
+ASSINATURA = b'CAVL'
+VERSAO_CACHE = 1
+REGISTRO = struct.Struct('<Qi')     # chave canônica, valor
+
+CAPACIDADE_PADRAO = 100_000
+ARQUIVO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_avaliacao.bin')
+
+
+class CacheAvaliacao:
+    """
+    Cache LRU de avaliações com persistência em disco via mmap.
+
+    Atributos:
+        capacidade: Máximo de entradas em memória (e no arquivo salvo)
+        caminho: Arquivo de persistência (None = só memória)
+        entradas: OrderedDict chave -> valor, do menos para o mais recente
+        acertos: Consultas resolvidas na memória
+        acertos_disco: Consultas resolvidas no arquivo mapeado
+        falhas: Consultas sem valor conhecido
+        despejos: Entradas removidas da memória por falta de espaço
+        alterado: True se guardar() trouxe algo ainda não salvo
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, caminho=None):
+        self.capacidade = capacidade
+        self.caminho = caminho
+        self.entradas = OrderedDict()
+        self.acertos = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.alterado = False
+        self._mapa = None        # mmap do arquivo (aberto sob demanda)
+        self._registros = 0      # Quantidade de registros no arquivo mapeado
+        self._arquivo_aberto = False
+
+    def __len__(self):
+        return len(self.entradas)
+
+    # =====================================================================
+    # ARQUIVO MAPEADO
+    # =====================================================================
+
+    def _abrir_arquivo(self):
+        """Mapeia o arquivo salvo (uma única vez); arquivo inválido é ignorado."""
+        self._arquivo_aberto = True
+        if self.caminho is None or not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, 'rb') as arquivo:
+            tamanho = os.fstat(arquivo.fileno()).st_size
+            if tamanho < CABECALHO.size:
+                return
+            mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        assinatura, versao, registros = CABECALHO.unpack_from(mapa)
+        if (assinatura != ASSINATURA or versao != VERSAO_CACHE
+                or tamanho != CABECALHO.size + registros * REGISTRO.size):
+            mapa.close()
+            return
+        self._mapa = mapa
+        self._registros = registros
+
+    def _buscar_no_arquivo(self, chave):
+        """Busca binária pela chave nos registros ordenados do arquivo."""
+        if not self._arquivo_aberto:
+            self._abrir_arquivo()
+        mapa = self._mapa
+        if mapa is None:
+            return None
+        inicio, fim = 0, self._registros
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            chave_meio, valor = REGISTRO.unpack_from(mapa, CABECALHO.size + meio * REGISTRO.size)
+            if chave_meio < chave:
+                inicio = meio + 1
+            elif chave_meio > chave:
+                fim = meio
+            else:
+                return valor
+        return None
+
+    def _registros_do_arquivo(self):
+        """Itera (chave, valor) de todos os registros do arquivo mapeado."""
+        if not self._arquivo_aberto:
+            self._abrir_arquivo()
+        if self._mapa is None:
+            return
+        for indice in range(self._registros):
+            yield REGISTRO.unpack_from(self._mapa, CABECALHO.size + indice * REGISTRO.size)
+
+    # =====================================================================
+    # CONSULTA E INSERÇÃO
+    # =====================================================================
+
+    def obter(self, chave):
+        """
+        Valor guardado para a chave canônica (marcando-a como usada agora).
+
+        Returns:
+            int: Valor, ou None se a posição nunca foi avaliada
+        """
+        entradas = self.entradas
+        valor = entradas.get(chave)
+        if valor is not None:
+            entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+        valor = self._buscar_no_arquivo(chave)
+        if valor is not None:
+            self.acertos_disco += 1
+            self._inserir(chave, valor)
+            return valor
+        self.falhas += 1
+        return None
+
+    def guardar(self, chave, valor):
+        """Guarda (ou atualiza) o valor de uma posição."""
+        self.alterado = True
+        if chave in self.entradas:
+            self.entradas[chave] = valor
+            self.entradas.move_to_end(chave)
+            return
+        self._inserir(chave, valor)
+
+    def _inserir(self, chave, valor):
+        self.entradas[chave] = valor
+        if len(self.entradas) > self.capacidade:
+            self.entradas.popitem(last=False)  # Menos usada recentemente
+            self.despejos += 1
+
+    # =====================================================================
+    # PERSISTÊNCIA
+    # =====================================================================
+
+    def salvar(self, caminho=None):
+        """
+        Grava o cache em disco (escrita atômica via arquivo temporário).
+
+        Entradas da memória têm prioridade; o espaço restante até a
+        capacidade é completado com registros do arquivo anterior que não
+        foram consultados nesta execução.
+        """
+        caminho = caminho or self.caminho
+        if caminho is None:
+            return
+        registros = dict(self.entradas)
+        if len(registros) < self.capacidade:
+            for chave, valor in self._registros_do_arquivo():
+                if chave not in registros:
+                    registros[chave] = valor
+                    if len(registros) >= self.capacidade:
+                        break
+
+        # Nome único: vários processos podem salvar o mesmo cache ao sair
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(caminho)),
+                                         suffix='.tmp', delete=False) as arquivo:
+            temporario = arquivo.name
+            try:
+                arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO_CACHE, len(registros)))
+                arquivo.write(b''.join(REGISTRO.pack(chave, registros[chave])
+                                       for chave in sorted(registros)))
+            except BaseException:
+                arquivo.close()
+                os.unlink(temporario)
+                raise
+        os.chmod(temporario, 0o644)  # NamedTemporaryFile cria com 0600
+        self.fechar()
+        os.replace(temporario, caminho)
+        self.alterado = False
+
+    def fechar(self):
+        """Libera o mmap (o arquivo é reaberto na próxima consulta)."""
+        if self._mapa is not None:
+            self._mapa.close()
+        self._mapa = None
+        self._registros = 0
+        self._arquivo_aberto = False
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: entradas, acertos, acertos_disco, falhas, despejos e taxa_acerto
+        """
+        consultas = self.acertos + self.acertos_disco + self.falhas
+        return {
+            'entradas': len(self.entradas),
+            'acertos': self.acertos,
+            'acertos_disco': self.acertos_disco,
+            'falhas': self.falhas,
+            'despejos': self.despejos,
+            'taxa_acerto': (self.acertos + self.acertos_disco) / consultas if consultas else 0.0,
+        }
+
+
+def _salvar_ao_sair(cache):
+    """Salva o cache se houve avaliações novas (falha de escrita é ignorada)."""
+    if not cache.alterado:
+        return
+    try:
+        cache.salvar()
+    except OSError:
+        pass  # Diretório somente leitura: o cache vale só para esta execução
+
+
+def abrir_cache_padrao(capacidade=CAPACIDADE_PADRAO, caminho=ARQUIVO_CACHE):
+    """
+    Cria o cache persistente do processo, salvo automaticamente ao sair.
+
+    Returns:
+        CacheAvaliacao: Cache ligado ao arquivo `caminho`
+    """
+    cache = CacheAvaliacao(capacidade, caminho)
+    atexit.register(_salvar_ao_sair, cache)
+    return cache
+
+
+if __name__ == '__main__':
+    # Duas "sessões" do solver sobre as mesmas partidas aleatórias: a segunda
+    # começa com o cache salvo pela primeira. Capacidade pequena para despejar.
+    import random
+    import time
+
+    import jogo
+    from solver import Solver
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'cache_avaliacao.bin')
+    for sessao in (1, 2):
+        gerador = random.Random(1)
+        cache = CacheAvaliacao(capacidade=400, caminho=caminho)
+        solver = Solver(cache=cache)
+        inicio = time.perf_counter()
+        for _ in range(300):
+            tabuleiro, jogador = jogo.criar_tabuleiro(), 'X'
+            while not (jogo.verificar_vitoria(tabuleiro, 'X') or jogo.verificar_vitoria(tabuleiro, 'O')
+                       or jogo.verificar_empate(tabuleiro)):
+                solver.melhores_jogadas(tabuleiro, jogador)
+                livres = [(i, j) for i in range(3) for j in range(3) if tabuleiro[i][j] not in ('X', 'O')]
+                jogo.realizar_jogada(tabuleiro, *gerador.choice(livres), jogador)
+                jogador = 'O' if jogador == 'X' else 'X'
+        duracao = time.perf_counter() - inicio
+        print(f"Sessão {sessao}: {duracao * 1e3:.1f} ms, {solver.nos} nós, {cache.estatisticas()}")
+        cache.salvar()
+    print(f"Arquivo: {os.path.getsize(caminho)} bytes")
@@ -0,0 +1,365 @@
+# === espectadores.py ===
+# Transmissão de partidas para espectadores (fan-out com leitores lentos)
+# Uma partida do servidor_async só era vista pelos dois jogadores. Aqui cada
+# Partida tem uma Transmissao: cada jogada é codificada UMA vez (frame TCP em
+# texto) e o mesmo objeto bytes é entregue a todos os espectadores.
+#
+# Cada espectador tem uma fila de saída limitada (LIMITE_FILA frames) esvaziada
+# por uma tarefa própria que espera o writer.drain() DELE. Assim um espectador
+# lento nunca atrasa os jogadores nem os outros espectadores: quando a fila
+# dele enche, ela é descartada e, assim que o socket volta a aceitar dados,
+# ele recebe um "ESTADO|..." com todas as jogadas até ali (ressincronização).
+# Quem precisa ressincronizar mais de MAX_RESSINCRONIZACOES vezes, ou não
+# consegue nem receber o ESTADO, é derrubado.
+#
+# Espectadores usam TCP: a contrapressão depende do buffer do transporte.
+
+import asyncio
+import socket
+from collections import deque
+
+from p2p import codificar_frame
+from protocolo import criar_msg_estado, criar_msg_variante, VARIANTE_CLASSICA
+
+# Frames pendentes por espectador antes de descartar e ressincronizar
+LIMITE_FILA = 32
+# Ressincronizações toleradas antes de desconectar o espectador
+MAX_RESSINCRONIZACOES = 3
+# Mensagens publicadas enquanto o ESTADO ainda não pôde ser enviado (socket
+# parado) antes de desconectar o espectador
+MAX_ATRASO_ESTADO = 4 * LIMITE_FILA
+# Limite do buffer do transporte de um espectador: acima disso drain() espera
+# e as jogadas novas se acumulam na fila limitada (não na memória do asyncio)
+LIMITE_BUFFER_TRANSPORTE = 4096
+# Buffer de envio do kernel por espectador: sem limite o kernel aceitaria
+# centenas de KB de um leitor parado antes de a fila perceber o atraso
+BUFFER_KERNEL_ESPECTADOR = 16 * 1024
+
+
+class Espectador:
+    """
+    Assinatura de uma conexão TCP em uma Transmissao.
+
+    Atributos:
+        conexao: ConexaoTCP do espectador
+        fila: Frames (bytes compartilhados) aguardando envio
+        precisa_estado: True se a fila foi descartada e falta o ESTADO
+        ressincronizacoes: Quantas vezes a fila foi descartada
+        atraso: Mensagens publicadas desde que o ESTADO ficou pendente
+        final: True após a última mensagem da partida (a tarefa termina
+               depois de escrever a fila)
+    """
+
+    __slots__ = ('conexao', 'transmissao', 'fila', 'evento', 'precisa_estado',
+                 'ressincronizacoes', 'atraso', 'final', 'tarefa')
+
+    def __init__(self, conexao, transmissao):
+        self.conexao = conexao
+        self.transmissao = transmissao
+        self.fila = deque()
+        self.evento = asyncio.Event()
+        self.precisa_estado = True  # Primeiro envio é o retrato da partida
+        self.ressincronizacoes = 0
+        self.atraso = 0
+        self.final = False
+        transporte = conexao.writer.transport
+        transporte.set_write_buffer_limits(high=LIMITE_BUFFER_TRANSPORTE)
+        sock = transporte.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, BUFFER_KERNEL_ESPECTADOR)
+        self.tarefa = asyncio.get_running_loop().create_task(self.bombear())
+        self.evento.set()
+
+    def entregar(self, frame, final=False):
+        """
+        Enfileira um frame; fila cheia descarta tudo e agenda ressincronização.
+
+        Args:
+            frame (bytes): Frame compartilhado com os outros espectadores
+            final (bool): Fim da partida - sempre enfileirado (o ESTADO não
+                          o inclui) e a tarefa termina depois de enviá-lo
+        """
+        if final:
+            self.fila.append(frame)
+            self.final = True
+            self.evento.set()
+            return
+        if self.precisa_estado:
+            # O ESTADO é montado na hora do envio e já inclui este frame
+            self.atraso += 1
+            if self.atraso > MAX_ATRASO_ESTADO:
+                self.transmissao.derrubar(self)
+            return
+        if len(self.fila) >= LIMITE_FILA:
+            self.fila.clear()
+            self.precisa_estado = True
+            self.ressincronizacoes += 1
+            self.transmissao.ressincronizacoes += 1
+            if self.ressincronizacoes > MAX_RESSINCRONIZACOES:
+                self.transmissao.derrubar(self)
+                return
+        else:
+            self.fila.append(frame)
+        self.evento.set()
+
+    async def bombear(self):
+        """Tarefa do espectador: escreve a fila e espera o socket DELE drenar."""
+        writer = self.conexao.writer
+        try:
+            while True:
+                await self.evento.wait()
+                self.evento.clear()
+                if self.precisa_estado:
+                    self.precisa_estado = False
+                    self.atraso = 0
+                    writer.write(self.transmissao.frame_estado())
+                while self.fila:
+                    writer.write(self.fila.popleft())
+                await writer.drain()
+                if self.final and not self.fila:
+                    return
+        except (ConnectionError, OSError):
+            self.transmissao.cancelar(self.conexao)
+
+    def encerrar(self):
+        self.tarefa.cancel()
+
+
+class Transmissao:
+    """
+    Fan-out das mensagens de uma partida para os espectadores.
+
+    Args:
+        partida: Partida transmitida (usa partida.jogadas e partida.variante)
+
+    Atributos:
+        espectadores: conexao -> Espectador
+        publicadas: Mensagens codificadas (uma codificação por mensagem)
+        entregas: Frames entregues às filas (soma sobre os espectadores)
+        ressincronizacoes: Filas descartadas por leitores lentos
+        derrubados: Espectadores desconectados por lentidão persistente
+    """
+
+    def __init__(self, partida):
+        self.partida = partida
+        self.espectadores = {}
+        self.publicadas = 0
+        self.entregas = 0
+        self.ressincronizacoes = 0
+        self.derrubados = 0
+
+    def __len__(self):
+        return len(self.espectadores)
+
+    def assinar(self, conexao):
+        """Começa a transmitir para `conexao` (primeiro envio: VARIANTE + ESTADO)."""
+        if conexao in self.espectadores:
+            return
+        if self.partida.variante != VARIANTE_CLASSICA:
+            conexao.enviar(criar_msg_variante(self.partida.variante))
+        conexao.assistindo = self
+        self.espectadores[conexao] = Espectador(conexao, self)
+
+    def cancelar(self, conexao):
+        """Remove o espectador (queda da conexão ou troca de partida)."""
+        espectador = self.espectadores.pop(conexao, None)
+        if espectador is not None:
+            espectador.encerrar()
+            conexao.assistindo = None
+
+    def derrubar(self, espectador):
+        """Desconecta um espectador que não acompanha o ritmo da partida."""
+        self.derrubados += 1
+        conexao = espectador.conexao
+        self.cancelar(conexao)
+        conexao.fechar()
+
+    def frame_estado(self):
+        """Frame ESTADO com todas as jogadas feitas até agora."""
+        return codificar_frame(criar_msg_estado(self.partida.jogadas).encode())
+
+    def publicar(self, msg, final=False):
+        """
+        Codifica a mensagem uma vez e entrega o mesmo frame a cada espectador.
+
+        Args:
+            msg (str): Mensagem em texto (JOGADA, FIM_DE_JOGO, EMPATE)
+            final (bool): Última mensagem da partida - depois dela os
+                          espectadores deixam de assinar (conexões continuam
+                          abertas para um novo ASSISTIR)
+        """
+        if not self.espectadores:
+            return
+        frame = codificar_frame(msg.encode())
+        self.publicadas += 1
+        self.entregas += len(self.espectadores)
+        for espectador in list(self.espectadores.values()):
+            espectador.entregar(frame, final)
+        if final:
+            for conexao in self.espectadores:
+                conexao.assistindo = None
+            self.espectadores.clear()
+
+    def encerrar(self):
+        """Partida abandonada: sem mensagem de fim, os espectadores são desconectados."""
+        for conexao in list(self.espectadores):
+            self.cancelar(conexao)
+            conexao.fechar()
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: espectadores, publicadas, entregas, ressincronizacoes e derrubados
+        """
+        return {
+            'espectadores': len(self.espectadores),
+            'publicadas': self.publicadas,
+            'entregas': self.entregas,
+            'ressincronizacoes': self.ressincronizacoes,
+            'derrubados': self.derrubados,
+        }
+
+
+# =====================================================================
+# CLIENTE ESPECTADOR E MEDIÇÃO
+# =====================================================================
+
+def assistir(ip, porta, id_partida=0):
+    """Cliente de terminal: assiste a uma partida e desenha o tabuleiro a cada jogada."""
+    import jogo
+    import jogo_ultimate
+    import p2p
+    from protocolo import VARIANTE_ULTIMATE, criar_msg_assistir, interpretar_msg
+
+    sock = socket.create_connection((ip, porta))
+    p2p.enviar(sock, criar_msg_assistir(id_partida), 'TCP')
+    motor, tabuleiro, jogador = jogo, None, 'X'
+    while True:
+        msg, _ = p2p.receber(sock, 'TCP')
+        if msg is None:
+            print("Conexão encerrada pelo servidor.")
+            break
+        dados = interpretar_msg(msg)
+        tipo = dados[0]
+        if tipo == "VARIANTE":
+            motor = jogo_ultimate if dados[1] == VARIANTE_ULTIMATE else jogo
+        elif tipo == "ESTADO":
+            tabuleiro, jogador = motor.criar_tabuleiro(), 'X'
+            for linha, coluna in dados[1]:
+                motor.realizar_jogada(tabuleiro, linha, coluna, jogador)
+                jogador = 'O' if jogador == 'X' else 'X'
+            motor.exibir_tabuleiro(tabuleiro)
+        elif tipo == "JOGADA" and tabuleiro is not None:
+            motor.realizar_jogada(tabuleiro, dados[1], dados[2], jogador)
+            print(f"{jogador} jogou em ({dados[1] + 1}, {dados[2] + 1})")
+            jogador = 'O' if jogador == 'X' else 'X'
+            motor.exibir_tabuleiro(tabuleiro)
+        elif tipo in ("FIM_DE_JOGO", "EMPATE"):
+            print("Empate!" if tipo == "EMPATE" else f"Vitória de {dados[1]}!")
+            break
+    sock.close()
+
+
+async def _medir_fanout(rapidos, lentos, mensagens):
+    from types import SimpleNamespace
+    import time
+
+    from protocolo import criar_msg_jogada
+    from servidor_async import ConexaoTCP
+
+    partida = SimpleNamespace(jogadas=[], variante=VARIANTE_CLASSICA)
+    transmissao = Transmissao(partida)
+    total = rapidos + lentos
+    todos_assinaram = asyncio.Event()
+    conexoes = []
+
+    async def atender(reader, writer):
+        conexoes.append(ConexaoTCP(writer))
+        transmissao.assinar(conexoes[-1])
+        if len(transmissao) == total:
+            todos_assinaram.set()
+        try:
+            await reader.read()  # Mantém a conexão até o cliente fechar
+        except ConnectionError:
+            pass
+
+    servidor = await asyncio.start_server(atender, '127.0.0.1', 0, backlog=4096)
+    porta = servidor.sockets[0].getsockname()[1]
+
+    async def leitor():
+        reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+        recebidos = 0
+        while True:
+            dados = await reader.read(65536)
+            if not dados:
+                break
+            recebidos += len(dados)
+        writer.close()
+        return recebidos
+
+    tarefas = [asyncio.create_task(leitor()) for _ in range(rapidos)]
+    parados = []
+    for _ in range(lentos):
+        # Nunca lê: o buffer do kernel enche e o espectador fica para trás
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(('127.0.0.1', porta))
+        parados.append(sock)
+    await todos_assinaram.wait()
+
+    custo = 0.0
+    inicio = time.perf_counter()
+    for indice in range(mensagens):
+        casa = indice % 9
+        if casa == 0:
+            partida.jogadas.clear()  # Partidas sucessivas de 9 jogadas (ESTADO pequeno)
+        partida.jogadas.append((casa // 3, casa % 3))
+        antes = time.perf_counter()
+        transmissao.publicar(criar_msg_jogada(casa // 3, casa % 3))
+        custo += time.perf_counter() - antes
+        await asyncio.sleep(0)  # Jogadas chegam espaçadas: as tarefas de envio rodam
+    duracao = time.perf_counter() - inicio
+    transmissao.publicar("EMPATE", final=True)
+
+    await asyncio.sleep(0.5)
+    for sock in parados:
+        sock.close()
+    servidor.close()
+    for conexao in conexoes:
+        conexao.fechar()
+    recebidos = await asyncio.gather(*tarefas)
+    estatisticas = transmissao.estatisticas()
+    print(f"{rapidos} rápidos + {lentos} lentos, {mensagens} mensagens em {duracao:.2f} s: "
+          f"publicar = {custo / mensagens * 1e6:.1f} us por mensagem "
+          f"({custo / mensagens / total * 1e9:.0f} ns por espectador)")
+    print(f"Bytes por espectador rápido: mín {min(recebidos)}, máx {max(recebidos)}; {estatisticas}")
+
+
+def medir_fanout(rapidos=200, lentos=10, mensagens=3000):
+    """Fan-out para muitos espectadores, alguns sem ler nada (lentos)."""
+    asyncio.run(_medir_fanout(rapidos, lentos, mensagens))
+
+
+def main():
+    """
+    Ponto de entrada em linha de comando.
+
+    Uso:
+        python espectadores.py [ip] [porta] [id_partida]
+        python espectadores.py medir [rapidos] [lentos] [mensagens]
+    """
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'medir':
+        argumentos = [int(valor) for valor in sys.argv[2:5]]
+        medir_fanout(*argumentos)
+        return
+
+    ip = sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1'
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 5555
+    id_partida = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    assistir(ip, porta, id_partida)
+
+
+if __name__ == '__main__':
+    main()
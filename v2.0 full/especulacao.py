@@ -0,0 +1,162 @@
+# === especulacao.py ===
+# Pré-cálculo especulativo de respostas enquanto o adversário pensa
+# Entre uma jogada e outra o cliente (ou o bot) fica parado esperando a
+# jogada do oponente. O Especulador usa esse tempo para calcular, com
+# antecedência, a resposta para CADA jogada legal que o oponente pode fazer.
+# Quando a jogada chega, a resposta sai de um dicionário em vez de uma busca.
+#
+# As respostas são indexadas pela chave em base 3 da posição resultante
+# (tabela_jogo.chave_base3), então valem para tabuleiros de jogo.py e
+# TabuleiroBits. calcular_respostas() é uma função pura e pode rodar em
+# qualquer thread/executor; instalar() e responder() são chamados por quem
+# joga (thread da interface ou event loop do servidor).
+
+from jogo_bitboard import INDICE_JOGADOR, TabuleiroBits, casas_livres
+from tabela_jogo import VALOR_SIMBOLO, chave_base3
+
+
+def _jogadas_legais(tabuleiro):
+    """Casas livres (índice linha * 3 + coluna) em qualquer formato de tabuleiro."""
+    if isinstance(tabuleiro, TabuleiroBits):
+        livres = casas_livres(tabuleiro)
+        return [casa for casa in range(9) if livres >> casa & 1]
+    return [i * 3 + j for i in range(3) for j in range(3)
+            if tabuleiro[i][j] not in VALOR_SIMBOLO]
+
+
+def _depois_da_jogada(tabuleiro, casa, simbolo):
+    """Cópia do tabuleiro com `simbolo` jogado em `casa` (o original não muda)."""
+    if isinstance(tabuleiro, TabuleiroBits):
+        copia = tabuleiro.copiar()
+        copia.bits[INDICE_JOGADOR[simbolo]] |= 1 << casa
+        return copia
+    copia = [linha[:] for linha in tabuleiro]
+    copia[casa // 3][casa % 3] = simbolo
+    return copia
+
+
+def calcular_respostas(motor, tabuleiro, oponente, meu_simbolo):
+    """
+    Calcula a resposta de `meu_simbolo` para cada jogada possível do oponente.
+
+    Args:
+        motor: Função (tabuleiro, jogador) -> (linha, coluna) ou None
+        tabuleiro: Posição atual, com o OPONENTE na vez (não é modificada)
+        oponente (str): Símbolo de quem joga agora
+        meu_simbolo (str): Símbolo de quem vai responder
+
+    Returns:
+        dict: chave base 3 da posição após a jogada do oponente -> resposta
+    """
+    respostas = {}
+    for casa in _jogadas_legais(tabuleiro):
+        depois = _depois_da_jogada(tabuleiro, casa, oponente)
+        respostas[chave_base3(depois)] = motor(depois, meu_simbolo)
+    return respostas
+
+
+class Especulador:
+    """
+    Cache de respostas pré-calculadas com contagem de acertos.
+
+    Atributos:
+        motor: Função (tabuleiro, jogador) -> jogada usada nas falhas do cache
+        respostas: Resultado do último calcular_respostas instalado
+        acertos: Respostas servidas do cache
+        falhas: Respostas que precisaram de cálculo na hora
+    """
+
+    def __init__(self, motor):
+        self.motor = motor
+        self.respostas = {}
+        self.acertos = 0
+        self.falhas = 0
+
+    def calcular(self, tabuleiro, oponente, meu_simbolo):
+        """calcular_respostas com o motor deste especulador (para rodar em segundo plano)."""
+        return calcular_respostas(self.motor, tabuleiro, oponente, meu_simbolo)
+
+    def instalar(self, respostas):
+        """Troca o cache pelas respostas recém-calculadas."""
+        self.respostas = respostas
+
+    def limpar(self):
+        """Descarta o cache (ex.: nova partida)."""
+        self.respostas = {}
+
+    def consultar(self, tabuleiro):
+        """
+        Resposta pré-calculada para a posição, contando acerto ou falha.
+
+        Uma resposta guardada como None (o motor não tinha jogada) conta
+        como falha: quem chama ainda precisa recorrer ao motor.
+
+        Returns:
+            tuple: (linha, coluna), ou None se a posição não foi especulada
+        """
+        jogada = self.respostas.get(chave_base3(tabuleiro))
+        if jogada is not None:
+            self.acertos += 1
+            return jogada
+        self.falhas += 1
+        return None
+
+    def responder(self, tabuleiro, jogador):
+        """Resposta do cache ou, na falha, calculada na hora pelo motor."""
+        jogada = self.consultar(tabuleiro)
+        if jogada is None:
+            jogada = self.motor(tabuleiro, jogador)
+        return jogada
+
+    @property
+    def taxa_acerto(self):
+        """Fração das respostas servidas pelo cache (0.0 a 1.0)."""
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: acertos, falhas e taxa_acerto
+        """
+        return {'acertos': self.acertos, 'falhas': self.falhas,
+                'taxa_acerto': self.taxa_acerto}
+
+
+if __name__ == '__main__':
+    # Bot especulativo contra adversário aleatório: taxa de acerto e latência
+    import random
+    import time
+
+    import jogo
+    import mcts
+
+    def motor_mcts(tabuleiro, jogador):
+        return mcts.MCTS().buscar(tabuleiro, max_playouts=2000).jogada
+
+    especulador = Especulador(motor_mcts)
+    espera_com_cache = espera_sem_cache = 0.0
+    for _ in range(20):
+        tabuleiro = jogo.criar_tabuleiro()
+        jogador = 'X'
+        especulador.instalar(especulador.calcular(tabuleiro, 'X', 'O'))
+        while True:
+            if jogador == 'O':
+                inicio = time.perf_counter()
+                linha, coluna = especulador.responder(tabuleiro, 'O')
+                espera_com_cache += time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                motor_mcts(tabuleiro, 'O')
+                espera_sem_cache += time.perf_counter() - inicio
+            else:
+                linha, coluna = random.choice([divmod(c, 3) for c in _jogadas_legais(tabuleiro)])
+            jogo.realizar_jogada(tabuleiro, linha, coluna, jogador)
+            if jogo.verificar_vitoria(tabuleiro, jogador) or jogo.verificar_empate(tabuleiro):
+                break
+            if jogador == 'O':
+                # Tempo "livre" enquanto o adversário pensa: especula as respostas
+                especulador.instalar(especulador.calcular(tabuleiro, 'X', 'O'))
+            jogador = 'O' if jogador == 'X' else 'X'
+    print(f"Especulação: {especulador.estatisticas()}")
+    print(f"Espera total do adversário: {espera_com_cache * 1e3:.1f} ms com cache, "
+          f"{espera_sem_cache * 1e3:.1f} ms sem cache")
@@ -0,0 +1,181 @@
+# === fila_pareamento.py ===
+# Fila de pareamento (matchmaking) com pareamento em tempo constante
+# Antes, uma partida online exigia que os dois jogadores combinassem IP e
+# porta (um deles como "Host" em mostrar_menu_online), e o servidor_async
+# tinha uma única vaga de espera. Aqui os clientes entram em baldes indexados
+# por (variante, faixa de rating): cada balde é um OrderedDict em ordem de
+# chegada, então entrar, sair (queda de conexão) e parear com o mais antigo
+# são O(1). Sem rating, o jogador vai para o balde geral da variante.
+#
+# A fila também mede a profundidade (jogadores esperando), os percentis do
+# tempo até o pareamento e os pareamentos por segundo.
+
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+
+# Largura de cada faixa de rating (1000-1199, 1200-1399, ...)
+LARGURA_FAIXA = 200
+# Amostras de tempo de espera mantidas para os percentis
+AMOSTRAS_TEMPO = 10_000
+
+
+def percentis_tempo(tempos):
+    """
+    Percentis do tempo de espera de um conjunto de amostras.
+
+    Também usada pelo servidor_multiprocesso, que junta as amostras de
+    todos os trabalhadores antes de calcular (percentis não se somam).
+
+    Returns:
+        dict: tempo_pareamento_p50/p90/p99 (0.0 sem amostras)
+    """
+    tempos = sorted(tempos)
+
+    def percentil(p):
+        return tempos[min(len(tempos) - 1, int(p * len(tempos)))] if tempos else 0.0
+
+    return {
+        'tempo_pareamento_p50': percentil(0.50),
+        'tempo_pareamento_p90': percentil(0.90),
+        'tempo_pareamento_p99': percentil(0.99),
+    }
+
+
+class FilaPareamento:
+    """
+    Baldes de espera por (variante, faixa de rating) com pareamento O(1).
+
+    Um jogador com rating procura adversário no próprio balde e, se vazio,
+    nas faixas vizinhas (no máximo três consultas a dicionário).
+
+    Args:
+        largura_faixa (int): Pontos de rating por faixa
+
+    Atributos:
+        baldes: chave -> OrderedDict(conexao -> instante de entrada)
+        chave_de: conexao -> chave do balde em que está esperando
+        pareamentos: Total de pares formados
+        tempos: Últimos tempos de espera (segundos) até o pareamento
+    """
+
+    def __init__(self, largura_faixa=LARGURA_FAIXA):
+        self.largura_faixa = largura_faixa
+        self.baldes = {}
+        self.chave_de = {}
+        self.pareamentos = 0
+        self.tempos = deque(maxlen=AMOSTRAS_TEMPO)
+        self.criada_em = time.monotonic()
+
+    def __len__(self):
+        return len(self.chave_de)
+
+    def __contains__(self, conexao):
+        return conexao in self.chave_de
+
+    def chave(self, variante, rating=None):
+        """Balde de (variante, rating); rating None = balde geral da variante."""
+        return variante, None if rating is None else int(rating) // self.largura_faixa
+
+    def _candidatas(self, chave):
+        variante, faixa = chave
+        if faixa is None:
+            return (chave,)
+        return (chave, (variante, faixa - 1), (variante, faixa + 1))
+
+    def entrar(self, conexao, variante, rating=None, agora=None):
+        """
+        Coloca a conexão na fila ou a pareia com quem espera há mais tempo.
+
+        Uma conexão que já estava esperando muda de balde.
+
+        Returns:
+            tuple: (adversario, variante) se formou par (o adversário é o
+                   mais antigo e joga com 'X'), senão None
+        """
+        agora = time.monotonic() if agora is None else agora
+        self.sair(conexao)
+        chave = self.chave(variante, rating)
+        for candidata in self._candidatas(chave):
+            balde = self.baldes.get(candidata)
+            if balde:
+                adversario, entrada = balde.popitem(last=False)
+                if not balde:
+                    del self.baldes[candidata]
+                del self.chave_de[adversario]
+                self.pareamentos += 1
+                self.tempos.append(agora - entrada)
+                return adversario, variante
+        self.baldes.setdefault(chave, OrderedDict())[conexao] = agora
+        self.chave_de[conexao] = chave
+        return None
+
+    def sair(self, conexao):
+        """Remove a conexão da fila (se estiver esperando)."""
+        chave = self.chave_de.pop(conexao, None)
+        if chave is None:
+            return False
+        balde = self.baldes[chave]
+        del balde[conexao]
+        if not balde:
+            del self.baldes[chave]
+        return True
+
+    def amostras_novas(self, vistos):
+        """
+        Tempos de espera dos pareamentos feitos depois dos primeiros `vistos`.
+
+        Returns:
+            list: Amostras ainda guardadas em tempos, da mais antiga à mais nova
+        """
+        novas = min(self.pareamentos - vistos, len(self.tempos))
+        if novas <= 0:
+            return []
+        return list(islice(self.tempos, len(self.tempos) - novas, None))
+
+    def profundidade(self):
+        """
+        Returns:
+            dict: chave do balde -> jogadores esperando
+        """
+        return {chave: len(balde) for chave, balde in self.baldes.items()}
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: aguardando, pareamentos, pareamentos_por_segundo e
+                  tempo_pareamento_p50/p90/p99 (segundos, últimas amostras)
+        """
+        duracao = time.monotonic() - self.criada_em
+        return {
+            'aguardando': len(self.chave_de),
+            'pareamentos': self.pareamentos,
+            'pareamentos_por_segundo': self.pareamentos / duracao if duracao > 0 else 0.0,
+            **percentis_tempo(self.tempos),
+        }
+
+
+if __name__ == '__main__':
+    # Carga sintética: chegadas com rating aleatório e algumas desistências;
+    # o custo por operação não deve crescer com o tamanho da fila
+    import random
+
+    rng = random.Random(7)
+    for jogadores in (10_000, 100_000, 1_000_000):
+        fila = FilaPareamento()
+        relogio = 0.0
+        inicio = time.perf_counter()
+        for conexao in range(jogadores):
+            relogio += rng.expovariate(1000.0)  # ~1000 chegadas/s simuladas
+            variante = 'ULTIMATE' if rng.random() < 0.2 else 'CLASSICO'
+            rating = rng.gauss(1500, 300) if rng.random() < 0.7 else None
+            fila.entrar(conexao, variante, rating, agora=relogio)
+            if rng.random() < 0.05:
+                fila.sair(rng.randrange(conexao + 1))  # Desistência (pode já ter jogado)
+        duracao = time.perf_counter() - inicio
+        estatisticas = fila.estatisticas()
+        print(f"{jogadores:>9} entradas: {duracao / jogadores * 1e9:.0f} ns por operação, "
+              f"{fila.pareamentos / duracao:,.0f} pareamentos/s reais, "
+              f"{len(fila)} esperando em {len(fila.baldes)} baldes, espera simulada "
+              f"p50={estatisticas['tempo_pareamento_p50'] * 1e3:.1f} ms "
+              f"p99={estatisticas['tempo_pareamento_p99'] * 1e3:.1f} ms")
@@ -2,13 +2,114 @@
 # Módulo responsável pela lógica do jogo da velha
 # Este arquivo contém todas as funções necessárias para gerenciar o tabuleiro,
 # validar jogadas, verificar vitórias e controlar o fluxo do jogo
+#
+# O tabuleiro também carrega uma chave Zobrist de 64 bits, atualizada por XOR
+# em realizar_jogada e desfazer_jogada. Ela serve como chave de dicionário
+# (tabelas de transposição, índices de replays) e como checksum do estado
+# para comparar com o outro jogador em partidas online. Junto com a chave, as
+# mesmas funções atualizam as máscaras de 9 bits de X e O (o layout de
+# jogo_bitboard), e empate_antecipado vira duas consultas a LINHAS_TOCADAS.
+#
+# Para armazenamento e rede, um tabuleiro também pode ser codificado em um
+# inteiro de largura fixa: base 3 (cabe em 16 bits) ou duas máscaras de 9
+# bits (18 bits). Lotes de tabuleiros vão para um array('H') compacto, com
+# 2 bytes por posição.
+
+import random
+from array import array
+
+from jogo_bitboard import LINHAS_TOCADAS, TODAS_LINHAS
+
+# === CHAVES ZOBRIST ===
+# Um número aleatório de 64 bits por (casa, jogador) e um para "vez do O".
+# Semente fixa: as chaves são as mesmas em todas as execuções e máquinas.
+_gerador = random.Random(0x7A0B)
+ZOBRIST = tuple(tuple(_gerador.getrandbits(64) for _ in range(2)) for _ in range(9))
+ZOBRIST_VEZ_O = _gerador.getrandbits(64)
+
+# Índice de cada símbolo na tabela ZOBRIST
+INDICE_SIMBOLO = {'X': 0, 'O': 1}
+
+# === CODIFICAÇÃO COMPACTA ===
+# Dígito em base 3 de cada casa: vazia = 0, X = 1, O = 2. A casa linha*3+coluna
+# tem peso 3^(linha*3+coluna), como em tabela_jogo.chave_base3
+DIGITO_SIMBOLO = {'X': 1, 'O': 2}
+SIMBOLO_DIGITO = (' ', 'X', 'O')
+TOTAL_CODIGOS = 3 ** 9  # 19683 códigos: cabem em um unsigned short
+
+
+class Tabuleiro(list):
+    """
+    Matriz 3x3 (lista de listas) com chave Zobrist incremental.
+
+    Continua sendo uma lista: tabuleiro[linha][coluna] funciona como antes.
+    A chave e as máscaras só acompanham as alterações feitas por
+    realizar_jogada e desfazer_jogada; cópias com [linha[:] for linha in
+    tabuleiro] viram listas comuns (use copiar() para manter a chave).
+
+    Atributos:
+        chave: Chave Zobrist de 64 bits (casas ocupadas + vez do O)
+        mascaras: Lista [mascara_X, mascara_O] (bit linha*3 + coluna)
+    """
+
+    __slots__ = ('chave', 'mascaras')
+
+    def __init__(self, linhas=(), chave=0, mascaras=None):
+        super().__init__(linhas)
+        self.chave = chave
+        self.mascaras = list(mascaras) if mascaras is not None else _mascaras(self)
+
+    def copiar(self):
+        """Cópia independente do tabuleiro, com a mesma chave."""
+        return Tabuleiro([linha[:] for linha in self], self.chave, self.mascaras)
+
+
+def _mascaras(tabuleiro):
+    """Máscaras [X, O] de 9 bits calculadas a partir das casas."""
+    mascaras = [0, 0]
+    for i, linha in enumerate(tabuleiro):
+        for j, simbolo in enumerate(linha):
+            indice = INDICE_SIMBOLO.get(simbolo)
+            if indice is not None:
+                mascaras[indice] |= 1 << (i * 3 + j)
+    return mascaras
+
+
+def chave_zobrist(tabuleiro):
+    """
+    Chave Zobrist de qualquer tabuleiro 3x3 de listas.
+
+    Para um Tabuleiro devolve a chave incremental; para listas comuns calcula
+    do zero. Os dois caminhos dão o mesmo valor: a vez do O é deduzida pela
+    quantidade de peças (ímpar = X jogou por último), como na alternância
+    feita a cada realizar_jogada.
+
+    Args:
+        tabuleiro (list): Matriz 3x3 do jogo
+
+    Returns:
+        int: Chave de 64 bits
+    """
+    if isinstance(tabuleiro, Tabuleiro):
+        return tabuleiro.chave
+    chave = 0
+    pecas = 0
+    for i in range(3):
+        for j in range(3):
+            indice = INDICE_SIMBOLO.get(tabuleiro[i][j])
+            if indice is not None:
+                chave ^= ZOBRIST[i * 3 + j][indice]
+                pecas += 1
+    # Cada jogada alterna a vez: peças em número ímpar = vez do O
+    return chave ^ ZOBRIST_VEZ_O if pecas % 2 else chave
 
 def criar_tabuleiro():
     """
     Cria e inicializa um tabuleiro vazio 3x3 para o jogo da velha.
     
     Returns:
-        list: Matriz 3x3 com espaços vazios (' ') representando casas livres
+        Tabuleiro: Matriz 3x3 com espaços vazios (' ') representando casas
+                   livres e chave Zobrist zerada
     
     Exemplo de retorno:
         [[' ', ' ', ' '],
@@ -16,7 +117,113 @@ def criar_tabuleiro():
          [' ', ' ', ' ']]
     """
     # Cria uma lista de listas 3x3 preenchida com espaços vazios
-    return [[' ' for _ in range(3)] for _ in range(3)]
+    return Tabuleiro([[' ' for _ in range(3)] for _ in range(3)])
+
+def codificar_tabuleiro(tabuleiro):
+    """
+    Codifica o tabuleiro em um inteiro de base 3.
+    
+    Args:
+        tabuleiro (list): Matriz 3x3 do jogo (casas ' ' ou '' são vazias)
+    
+    Returns:
+        int: Código entre 0 e TOTAL_CODIGOS - 1 (o tabuleiro vazio é 0)
+    """
+    codigo = 0
+    # Percorre as casas de trás para frente (método de Horner): a casa 0
+    # termina com peso 1 e a casa 8 com peso 3^8
+    for i in range(2, -1, -1):
+        for j in range(2, -1, -1):
+            codigo = codigo * 3 + DIGITO_SIMBOLO.get(tabuleiro[i][j], 0)
+    return codigo
+
+def decodificar_tabuleiro(codigo):
+    """
+    Reconstrói um tabuleiro a partir do código em base 3.
+    
+    Args:
+        codigo (int): Valor produzido por codificar_tabuleiro
+    
+    Returns:
+        Tabuleiro: Matriz 3x3 com a chave Zobrist já calculada
+    
+    Raises:
+        ValueError: Se o código está fora do intervalo válido
+    """
+    if not 0 <= codigo < TOTAL_CODIGOS:
+        raise ValueError(f"Código de tabuleiro inválido: {codigo}")
+    linhas = []
+    for _ in range(3):
+        linha = []
+        for _ in range(3):
+            codigo, digito = divmod(codigo, 3)
+            linha.append(SIMBOLO_DIGITO[digito])
+        linhas.append(linha)
+    tabuleiro = Tabuleiro(linhas)
+    tabuleiro.chave = chave_zobrist(linhas)
+    return tabuleiro
+
+def codificar_mascaras(tabuleiro):
+    """
+    Codifica o tabuleiro em 18 bits: casas do X nos bits 0-8, do O nos bits 9-17.
+    
+    É o mesmo layout dos bitboards de jogo_bitboard (bits[0] | bits[1] << 9).
+    
+    Returns:
+        int: Código de 18 bits
+    """
+    codigo = 0
+    for i in range(3):
+        for j in range(3):
+            indice = INDICE_SIMBOLO.get(tabuleiro[i][j])
+            if indice is not None:
+                codigo |= 1 << (i * 3 + j + 9 * indice)
+    return codigo
+
+def decodificar_mascaras(codigo):
+    """
+    Reconstrói um tabuleiro a partir do código de 18 bits.
+    
+    Raises:
+        ValueError: Se o código não cabe em 18 bits ou tem casas com X e O
+    """
+    bits_x, bits_o = codigo & 0x1FF, codigo >> 9
+    if bits_o >> 9 or bits_x & bits_o:
+        raise ValueError(f"Código de tabuleiro inválido: {codigo}")
+    linhas = [['X' if bits_x >> (i * 3 + j) & 1 else 'O' if bits_o >> (i * 3 + j) & 1 else ' '
+               for j in range(3)] for i in range(3)]
+    tabuleiro = Tabuleiro(linhas)
+    tabuleiro.chave = chave_zobrist(linhas)
+    return tabuleiro
+
+def empacotar_tabuleiros(tabuleiros):
+    """
+    Guarda um lote de tabuleiros em um array compacto (2 bytes por tabuleiro).
+    
+    Args:
+        tabuleiros: Iterável de matrizes 3x3
+    
+    Returns:
+        array: array('H') com os códigos em base 3 (use .tobytes() para
+               gravar em arquivo ou enviar pela rede)
+    """
+    return array('H', (codificar_tabuleiro(t) for t in tabuleiros))
+
+def desempacotar_tabuleiros(dados):
+    """
+    Reconstrói os tabuleiros de um lote empacotado.
+    
+    Args:
+        dados: array('H') de empacotar_tabuleiros ou os bytes de .tobytes()
+    
+    Returns:
+        list: Tabuleiros na mesma ordem do lote
+    """
+    if not isinstance(dados, array):
+        codigos = array('H')
+        codigos.frombytes(dados)
+        dados = codigos
+    return [decodificar_tabuleiro(codigo) for codigo in dados]
 
 def exibir_tabuleiro(tabuleiro):
     """
@@ -76,10 +283,43 @@ def realizar_jogada(tabuleiro, linha, coluna, jogador):
     if 0 <= linha < 3 and 0 <= coluna < 3 and tabuleiro[linha][coluna] == ' ':
         # Posição válida e livre - realiza a jogada
         tabuleiro[linha][coluna] = jogador
+        # Atualiza a chave (entra a peça na casa e a vez passa para o outro)
+        # e a máscara do jogador
+        if isinstance(tabuleiro, Tabuleiro):
+            casa, indice = linha * 3 + coluna, INDICE_SIMBOLO[jogador]
+            tabuleiro.chave ^= ZOBRIST[casa][indice] ^ ZOBRIST_VEZ_O
+            tabuleiro.mascaras[indice] |= 1 << casa
         return True
     # Posição inválida ou ocupada - jogada não realizada
     return False
 
+def desfazer_jogada(tabuleiro, linha, coluna):
+    """
+    Desfaz a jogada feita em uma posição, liberando a casa.
+    
+    Args:
+        tabuleiro (list): Matriz 3x3 do jogo atual
+        linha (int): Linha da jogada (0-2)
+        coluna (int): Coluna da jogada (0-2)
+    
+    Returns:
+        bool: True se havia uma peça na casa e ela foi removida, False caso contrário
+    
+    A chave Zobrist volta exatamente ao valor anterior à jogada (XOR é a
+    própria inversa).
+    """
+    if not (0 <= linha < 3 and 0 <= coluna < 3):
+        return False
+    simbolo = tabuleiro[linha][coluna]
+    if simbolo not in INDICE_SIMBOLO:
+        return False
+    tabuleiro[linha][coluna] = ' '
+    if isinstance(tabuleiro, Tabuleiro):
+        casa, indice = linha * 3 + coluna, INDICE_SIMBOLO[simbolo]
+        tabuleiro.chave ^= ZOBRIST[casa][indice] ^ ZOBRIST_VEZ_O
+        tabuleiro.mascaras[indice] &= ~(1 << casa)
+    return True
+
 def verificar_vitoria(tabuleiro, jogador):
     """
     Verifica se um jogador específico venceu a partida.
@@ -135,4 +375,25 @@ def verificar_empate(tabuleiro):
     # Verifica se todas as células estão preenchidas (não contêm espaço ' ')
     # Usa list comprehension aninhada para percorrer toda a matriz
     # all() retorna True apenas se TODAS as condições forem True
-    return all(cell != ' ' for row in tabuleiro for cell in row)
\ No newline at end of file
+    return all(cell != ' ' for row in tabuleiro for cell in row)
+
+def empate_antecipado(tabuleiro):
+    """
+    Verifica se o jogo já está empatado antes de o tabuleiro encher.
+    
+    Args:
+        tabuleiro (list): Matriz 3x3 do estado atual do jogo
+    
+    Returns:
+        bool: True se nenhuma linha vencedora ainda é possível para X ou O
+    
+    Lógica:
+        - Uma linha está "morta" quando contém pelo menos um X e um O
+        - Se todas as 8 linhas estão mortas, ninguém pode mais vencer
+        - Assim como verificar_empate, deve ser chamada APÓS verificar vitória
+        - Um Tabuleiro já traz as máscaras atualizadas a cada jogada: são só
+          duas consultas a LINHAS_TOCADAS (listas comuns calculam as máscaras)
+    """
+    mascara_x, mascara_o = (tabuleiro.mascaras if isinstance(tabuleiro, Tabuleiro)
+                            else _mascaras(tabuleiro))
+    return LINHAS_TOCADAS[mascara_x] & LINHAS_TOCADAS[mascara_o] == TODAS_LINHAS
\ No newline at end of file
@@ -0,0 +1,392 @@
+# === jogo_3d.py ===
+# Motor do jogo da velha 3D (cubo 4x4x4, 76 linhas vencedoras)
+# Os laços range(3) de jogo.verificar_vitoria não escalam para o cubo: são 76
+# linhas (16 por eixo em cada direção, diagonais dos planos e 4 diagonais
+# espaciais). Aqui as linhas são geradas uma vez e cada casa guarda a lista
+# das linhas que passam por ela (4 ou 7 no cubo 4x4x4). Cada jogada atualiza
+# só os contadores dessas linhas: o custo por jogada depende das linhas da
+# casa, não do total de linhas do cubo.
+#
+# Casas são endereçadas por índice camada * lado² + linha * lado + coluna ou
+# por (camada, linha, coluna). O lado é parâmetro (padrão 4); as tabelas de
+# cada lado são geradas sob demanda e compartilhadas entre tabuleiros.
+
+from itertools import product
+
+# === PARÂMETROS ===
+LADO_PADRAO = 4
+
+# Pesos da ordenação de jogadas: peças já alinhadas em uma linha viva
+PESOS_LINHA = (1, 4, 16, 64)
+# Valor de vitória na busca (menos a distância, para vencer rápido)
+VITORIA = 10 ** 6
+
+
+# =====================================================================
+# TABELAS DE LINHAS (GERADAS UMA VEZ POR TAMANHO DE CUBO)
+# =====================================================================
+
+def _direcoes():
+    """13 direções do cubo: uma de cada par (d, -d), primeira coordenada != 0 positiva."""
+    direcoes = []
+    for direcao in product((-1, 0, 1), repeat=3):
+        primeira = next((d for d in direcao if d), 0)
+        if primeira > 0:
+            direcoes.append(direcao)
+    return tuple(direcoes)
+
+
+def gerar_linhas(lado):
+    """
+    Todas as linhas vencedoras de um cubo lado x lado x lado.
+
+    Uma linha é um segmento de `lado` casas alinhadas que atravessa o cubo
+    inteiro; no 4x4x4 são ((lado + 2)³ - lado³) / 2 = 76.
+
+    Returns:
+        tuple: Tuplas de índices de casa
+    """
+    linhas = []
+    for dc, dl, dk in _direcoes():
+        for camada, linha, coluna in product(range(lado), repeat=3):
+            fim = (camada + dc * (lado - 1), linha + dl * (lado - 1), coluna + dk * (lado - 1))
+            # Só começa no início do segmento (o passo anterior sai do cubo)
+            antes = (camada - dc, linha - dl, coluna - dk)
+            if all(0 <= v < lado for v in fim) and not all(0 <= v < lado for v in antes):
+                linhas.append(tuple(
+                    ((camada + dc * i) * lado + linha + dl * i) * lado + coluna + dk * i
+                    for i in range(lado)
+                ))
+    return tuple(linhas)
+
+
+_TABELAS = {}
+
+
+def tabelas(lado):
+    """
+    Linhas e índice casa -> linhas para o cubo de lado `lado` (com cache).
+
+    Returns:
+        tuple: (linhas, linhas_da_casa)
+    """
+    if lado not in _TABELAS:
+        linhas = gerar_linhas(lado)
+        linhas_da_casa = [[] for _ in range(lado ** 3)]
+        for indice, linha in enumerate(linhas):
+            for casa in linha:
+                linhas_da_casa[casa].append(indice)
+        _TABELAS[lado] = (linhas, tuple(tuple(l) for l in linhas_da_casa))
+    return _TABELAS[lado]
+
+
+LINHAS, LINHAS_DA_CASA = tabelas(LADO_PADRAO)
+assert len(LINHAS) == 76
+
+
+class TabuleiroCubo:
+    """
+    Cubo lado x lado x lado com contadores de peças por linha.
+
+    Atributos:
+        lado: Casas por aresta
+        casas: Lista plana com 'X', 'O' ou ' '
+        contagem: [contadores do X, contadores do O], um por linha
+        linhas_mortas: Linhas com peças dos dois jogadores (ninguém completa)
+        historico: Pilha de casas jogadas (permite desfazer)
+        vencedor: 'X', 'O' ou None
+    """
+
+    __slots__ = ('lado', 'linhas', 'linhas_da_casa', 'casas', 'contagem',
+                 'linhas_mortas', 'historico', 'vencedor')
+
+    def __init__(self, lado=LADO_PADRAO):
+        self.lado = lado
+        self.linhas, self.linhas_da_casa = tabelas(lado)
+        self.casas = [' '] * (lado ** 3)
+        self.contagem = [[0] * len(self.linhas), [0] * len(self.linhas)]
+        self.linhas_mortas = 0
+        self.historico = []
+        self.vencedor = None
+
+    @property
+    def total_casas(self):
+        return len(self.casas)
+
+    def proximo_jogador(self):
+        """Símbolo de quem joga agora ('X' sempre começa)."""
+        return 'X' if len(self.historico) % 2 == 0 else 'O'
+
+    def indice(self, camada, linha, coluna):
+        """Índice plano de (camada, linha, coluna)."""
+        return (camada * self.lado + linha) * self.lado + coluna
+
+    # =====================================================================
+    # JOGAR E DESFAZER
+    # =====================================================================
+
+    def jogar(self, casa):
+        """
+        Coloca a peça de quem está na vez em `casa` (sem validar).
+
+        Só os contadores das linhas que passam pela casa são tocados.
+        """
+        jogador = len(self.historico) & 1
+        self.casas[casa] = 'XO'[jogador]
+        self.historico.append(casa)
+        meus, dele = self.contagem[jogador], self.contagem[1 - jogador]
+        for linha in self.linhas_da_casa[casa]:
+            meus[linha] += 1
+            if meus[linha] == 1 and dele[linha]:
+                self.linhas_mortas += 1  # Primeira peça minha em linha do adversário
+            elif meus[linha] == self.lado:
+                self.vencedor = 'XO'[jogador]
+
+    def desfazer(self):
+        """Desfaz a última jogada (contadores voltam ao estado anterior)."""
+        casa = self.historico.pop()
+        jogador = len(self.historico) & 1
+        self.casas[casa] = ' '
+        meus, dele = self.contagem[jogador], self.contagem[1 - jogador]
+        for linha in self.linhas_da_casa[casa]:
+            if meus[linha] == 1 and dele[linha]:
+                self.linhas_mortas -= 1
+            meus[linha] -= 1
+        self.vencedor = None
+
+    def terminou(self):
+        """True se alguém venceu ou o cubo encheu."""
+        return self.vencedor is not None or len(self.historico) == len(self.casas)
+
+    def copiar(self):
+        """Cópia independente do tabuleiro."""
+        copia = TabuleiroCubo.__new__(TabuleiroCubo)
+        copia.lado = self.lado
+        copia.linhas, copia.linhas_da_casa = self.linhas, self.linhas_da_casa
+        copia.casas = self.casas[:]
+        copia.contagem = [self.contagem[0][:], self.contagem[1][:]]
+        copia.linhas_mortas = self.linhas_mortas
+        copia.historico = self.historico[:]
+        copia.vencedor = self.vencedor
+        return copia
+
+    # =====================================================================
+    # GERAÇÃO DE JOGADAS
+    # =====================================================================
+
+    def casas_livres(self):
+        """Casas vazias em ordem de índice."""
+        return [casa for casa, simbolo in enumerate(self.casas) if simbolo == ' ']
+
+    def gerar_jogadas(self):
+        """
+        Jogadas ordenadas para busca alfa-beta.
+
+        1. Se quem joga completa uma linha, só essa jogada é devolvida.
+        2. Se o adversário ameaça completar, só os bloqueios são devolvidos
+           (qualquer outra jogada perde na hora).
+        3. Senão, todas as casas livres, das que participam de mais linhas
+           vivas com mais peças (próprias ou do adversário) para as demais.
+
+        Returns:
+            list: Índices de casa (vazia se a partida terminou)
+        """
+        if self.vencedor is not None:
+            return []
+        jogador = len(self.historico) & 1
+        meus, dele = self.contagem[jogador], self.contagem[1 - jogador]
+        falta_um = self.lado - 1
+        casas = self.casas
+        bloqueios = []
+        pontuadas = []
+        for casa, simbolo in enumerate(casas):
+            if simbolo != ' ':
+                continue
+            pontos = 0
+            bloqueia = False
+            for linha in self.linhas_da_casa[casa]:
+                m, d = meus[linha], dele[linha]
+                if not d:
+                    if m == falta_um:
+                        return [casa]  # Vitória imediata
+                    pontos += PESOS_LINHA[min(m, 3)]
+                elif not m:
+                    if d == falta_um:
+                        bloqueia = True
+                    pontos += PESOS_LINHA[min(d, 3)]
+            if bloqueia:
+                bloqueios.append(casa)
+            pontuadas.append((-pontos, casa))
+        if bloqueios:
+            return bloqueios
+        pontuadas.sort()
+        return [casa for _, casa in pontuadas]
+
+    def avaliar(self):
+        """
+        Heurística da posição para quem está na vez.
+
+        Soma PESOS_LINHA das linhas vivas de cada jogador (linhas com peças
+        dos dois não contam).
+        """
+        jogador = len(self.historico) & 1
+        meus, dele = self.contagem[jogador], self.contagem[1 - jogador]
+        valor = 0
+        for m, d in zip(meus, dele):
+            if not d:
+                valor += PESOS_LINHA[min(m, 3)] if m else 0
+            elif not m:
+                valor -= PESOS_LINHA[min(d, 3)]
+        return valor
+
+
+# =====================================================================
+# ADAPTADORES NO ESTILO DE jogo.py
+# =====================================================================
+
+def criar_tabuleiro(lado=LADO_PADRAO):
+    """Cria um cubo vazio (4x4x4 por padrão)."""
+    return TabuleiroCubo(lado)
+
+
+def exibir_tabuleiro(tabuleiro):
+    """Exibe as camadas do cubo lado a lado no terminal."""
+    lado = tabuleiro.lado
+    print()
+    print('   '.join(f"camada {camada + 1}".ljust(2 * lado - 1) for camada in range(lado)))
+    for linha in range(lado):
+        blocos = []
+        for camada in range(lado):
+            inicio = tabuleiro.indice(camada, linha, 0)
+            blocos.append(' '.join(s if s != ' ' else '.' for s in tabuleiro.casas[inicio:inicio + lado]))
+        print('   '.join(bloco.ljust(2 * lado - 1) for bloco in blocos))
+
+
+def realizar_jogada(tabuleiro, camada, linha, coluna, jogador):
+    """
+    Tenta realizar uma jogada no cubo.
+
+    Returns:
+        bool: False se fora do cubo, casa ocupada, fora da vez ou partida encerrada
+    """
+    lado = tabuleiro.lado
+    if not (0 <= camada < lado and 0 <= linha < lado and 0 <= coluna < lado):
+        return False
+    casa = tabuleiro.indice(camada, linha, coluna)
+    if (tabuleiro.vencedor is not None or tabuleiro.casas[casa] != ' '
+            or jogador != tabuleiro.proximo_jogador()):
+        return False
+    tabuleiro.jogar(casa)
+    return True
+
+
+def verificar_vitoria(tabuleiro, jogador):
+    """True se o jogador completou alguma linha."""
+    return tabuleiro.vencedor == jogador
+
+
+def verificar_empate(tabuleiro):
+    """True se o cubo encheu sem vencedor (chamar APÓS verificar vitória)."""
+    return tabuleiro.vencedor is None and len(tabuleiro.historico) == tabuleiro.total_casas
+
+
+def empate_antecipado(tabuleiro):
+    """True se todas as linhas têm peças dos dois jogadores (contador mantido por jogada)."""
+    return tabuleiro.linhas_mortas == len(tabuleiro.linhas)
+
+
+# =====================================================================
+# BUSCA
+# =====================================================================
+
+def _negamax(tabuleiro, profundidade, alfa, beta, distancia):
+    if tabuleiro.vencedor is not None:
+        return -(VITORIA - distancia)
+    jogadas = tabuleiro.gerar_jogadas()
+    if not jogadas:
+        return 0
+    if profundidade == 0:
+        return tabuleiro.avaliar()
+    melhor = -VITORIA - 1
+    for casa in jogadas:
+        tabuleiro.jogar(casa)
+        valor = -_negamax(tabuleiro, profundidade - 1, -beta, -alfa, distancia + 1)
+        tabuleiro.desfazer()
+        if valor > melhor:
+            melhor = valor
+        if melhor > alfa:
+            alfa = melhor
+        if alfa >= beta:
+            break
+    return melhor
+
+
+def melhor_jogada(tabuleiro, profundidade=3):
+    """
+    Jogada por alfa-beta de profundidade fixa sobre gerar_jogadas().
+
+    Returns:
+        tuple: (camada, linha, coluna) ou None se a partida terminou
+    """
+    tabuleiro = tabuleiro.copiar()
+    jogadas = tabuleiro.gerar_jogadas()
+    if not jogadas:
+        return None
+    melhor, alfa = jogadas[0], -VITORIA - 1
+    for casa in jogadas:
+        tabuleiro.jogar(casa)
+        valor = -_negamax(tabuleiro, profundidade - 1, -VITORIA - 1, -alfa, 1)
+        tabuleiro.desfazer()
+        if valor > alfa:
+            melhor, alfa = casa, valor
+    lado = tabuleiro.lado
+    camada, resto = divmod(melhor, lado * lado)
+    return (camada,) + divmod(resto, lado)
+
+
+if __name__ == '__main__':
+    # Custo por jogada com contadores por linha x varredura de todas as linhas,
+    # em cubos com quantidades de linhas diferentes
+    import random
+    import time
+
+    def varrer_linhas(tabuleiro, simbolo):
+        """Verificação ingênua: confere todas as linhas do cubo."""
+        casas = tabuleiro.casas
+        return any(all(casas[c] == simbolo for c in linha) for linha in tabuleiro.linhas)
+
+    rng = random.Random(3)
+    print(f"{'lado':>4} {'linhas':>7} {'incremental':>14} {'varredura':>14}")
+    for lado in (3, 4, 5, 6):
+        ordens = [rng.sample(range(lado ** 3), lado ** 3) for _ in range(300)]
+        jogadas = 0
+        inicio = time.perf_counter()
+        for ordem in ordens:
+            tabuleiro = TabuleiroCubo(lado)
+            for casa in ordem:
+                tabuleiro.jogar(casa)
+                jogadas += 1
+                if tabuleiro.vencedor is not None:
+                    break
+        incremental = (time.perf_counter() - inicio) / jogadas
+
+        jogadas = 0
+        inicio = time.perf_counter()
+        for ordem in ordens:
+            tabuleiro = TabuleiroCubo(lado)
+            for casa in ordem:
+                simbolo = tabuleiro.proximo_jogador()
+                tabuleiro.casas[casa] = simbolo
+                tabuleiro.historico.append(casa)
+                jogadas += 1
+                if varrer_linhas(tabuleiro, simbolo):
+                    break
+        varredura = (time.perf_counter() - inicio) / jogadas
+        print(f"{lado:>4} {len(tabelas(lado)[0]):>7} {incremental * 1e6:>11.2f} us "
+              f"{varredura * 1e6:>11.2f} us")
+
+    tabuleiro = criar_tabuleiro()
+    inicio = time.perf_counter()
+    jogada = melhor_jogada(tabuleiro, 3)
+    print(f"Alfa-beta profundidade 3 no cubo vazio: {jogada} em "
+          f"{(time.perf_counter() - inicio) * 1e3:.0f} ms")
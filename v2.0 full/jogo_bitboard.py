@@ -0,0 +1,247 @@
+# === jogo_bitboard.py ===
+# Motor alternativo do jogo da velha usando bitboards
+# Cada jogador é um inteiro de 9 bits (bit i = casa linha*3 + coluna ocupada).
+# Vitória, empate e validação de jogada viram operações de bits e consultas
+# a tabelas pré-calculadas, sem percorrer listas de strings.
+#
+# As funções criar_tabuleiro, exibir_tabuleiro, realizar_jogada,
+# verificar_vitoria, verificar_empate e empate_antecipado têm os mesmos nomes e assinaturas de
+# jogo.py, então servidor, IA e testes podem trocar de motor só no import.
+
+# === CONSTANTES DO TABULEIRO ===
+CASAS = 9
+TABULEIRO_CHEIO = (1 << CASAS) - 1  # 0b111111111
+
+# As 8 linhas vencedoras como máscaras de 9 bits
+LINHAS_VITORIA = (
+    0b000000111, 0b000111000, 0b111000000,  # Linhas horizontais
+    0b001001001, 0b010010010, 0b100100100,  # Colunas verticais
+    0b100010001, 0b001010100,               # Diagonais principal e secundária
+)
+
+# Linhas vencedoras que passam por cada casa (para checar só a última jogada)
+LINHAS_POR_CASA = tuple(
+    tuple(m for m in LINHAS_VITORIA if m & (1 << casa)) for casa in range(CASAS)
+)
+
+# TABELA_VITORIA[mascara] é True se a máscara contém alguma linha completa:
+# verificar vitória vira UMA indexação em uma tupla de 512 posições
+TABELA_VITORIA = tuple(
+    any(mascara & linha == linha for linha in LINHAS_VITORIA)
+    for mascara in range(1 << CASAS)
+)
+
+# LINHAS_TOCADAS[mascara]: bit k ligado se a máscara ocupa alguma casa da
+# linha vencedora k. Uma linha está morta quando X e O a tocam; com as 8
+# mortas (LINHAS_TOCADAS[x] & LINHAS_TOCADAS[o] == TODAS_LINHAS) ninguém
+# pode mais vencer e o empate é certo
+LINHAS_TOCADAS = tuple(
+    sum(1 << k for k, linha in enumerate(LINHAS_VITORIA) if mascara & linha)
+    for mascara in range(1 << CASAS)
+)
+TODAS_LINHAS = (1 << len(LINHAS_VITORIA)) - 1
+
+INDICE_JOGADOR = {'X': 0, 'O': 1}
+
+
+class TabuleiroBits:
+    """
+    Estado do jogo em dois bitboards.
+
+    Atributos:
+        bits: Lista [mascara_X, mascara_O] com 9 bits cada
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits_x=0, bits_o=0):
+        self.bits = [bits_x, bits_o]
+
+    @property
+    def ocupadas(self):
+        """Máscara das casas ocupadas por qualquer jogador."""
+        return self.bits[0] | self.bits[1]
+
+    def simbolo_em(self, linha, coluna):
+        """Retorna 'X', 'O' ou ' ' para a casa informada."""
+        bit = 1 << (linha * 3 + coluna)
+        if self.bits[0] & bit:
+            return 'X'
+        if self.bits[1] & bit:
+            return 'O'
+        return ' '
+
+    def copiar(self):
+        """Cópia independente do tabuleiro (dois inteiros)."""
+        return TabuleiroBits(self.bits[0], self.bits[1])
+
+    def __eq__(self, outro):
+        return isinstance(outro, TabuleiroBits) and self.bits == outro.bits
+
+    def __repr__(self):
+        return f"TabuleiroBits(X={self.bits[0]:09b}, O={self.bits[1]:09b})"
+
+
+# =====================================================================
+# OPERAÇÕES DE BAIXO NÍVEL (INTEIROS)
+# =====================================================================
+
+def venceu(mascara):
+    """True se a máscara de um jogador contém uma linha vencedora."""
+    return TABELA_VITORIA[mascara]
+
+
+def venceu_com(mascara, casa):
+    """
+    Verifica vitória olhando só as linhas que passam pela última casa jogada.
+
+    Args:
+        mascara (int): Bits do jogador (já incluindo a casa)
+        casa (int): Índice 0-8 da última jogada
+    """
+    for linha in LINHAS_POR_CASA[casa]:
+        if mascara & linha == linha:
+            return True
+    return False
+
+
+def casas_livres(tabuleiro):
+    """Máscara das casas vazias."""
+    return TABULEIRO_CHEIO & ~(tabuleiro.bits[0] | tabuleiro.bits[1])
+
+
+# =====================================================================
+# ADAPTADORES COM A MESMA INTERFACE DE jogo.py
+# =====================================================================
+
+def criar_tabuleiro():
+    """
+    Cria um tabuleiro vazio.
+
+    Returns:
+        TabuleiroBits: Tabuleiro com as duas máscaras zeradas
+    """
+    return TabuleiroBits()
+
+
+def exibir_tabuleiro(tabuleiro):
+    """
+    Exibe o tabuleiro no terminal no mesmo formato de jogo.exibir_tabuleiro.
+
+    Args:
+        tabuleiro (TabuleiroBits): Estado atual do jogo
+    """
+    print("\n    1   2   3")
+    print("  +---+---+---+")
+    for i in range(3):
+        linha = f"{i+1} |"
+        for j in range(3):
+            linha += f" {tabuleiro.simbolo_em(i, j)} |"
+        print(linha)
+        print("  +---+---+---+")
+
+
+def realizar_jogada(tabuleiro, linha, coluna, jogador):
+    """
+    Tenta realizar uma jogada.
+
+    Args:
+        tabuleiro (TabuleiroBits): Estado do jogo
+        linha (int): Linha desejada (0-2)
+        coluna (int): Coluna desejada (0-2)
+        jogador (str): 'X' ou 'O'
+
+    Returns:
+        bool: True se a jogada foi feita, False se posição inválida/ocupada
+    """
+    if not (0 <= linha < 3 and 0 <= coluna < 3):
+        return False
+    bit = 1 << (linha * 3 + coluna)
+    bits = tabuleiro.bits
+    if (bits[0] | bits[1]) & bit:
+        return False
+    bits[INDICE_JOGADOR[jogador]] |= bit
+    return True
+
+
+def verificar_vitoria(tabuleiro, jogador):
+    """
+    Verifica se o jogador venceu.
+
+    Returns:
+        bool: True se a máscara do jogador contém uma linha completa
+    """
+    return TABELA_VITORIA[tabuleiro.bits[INDICE_JOGADOR[jogador]]]
+
+
+def verificar_empate(tabuleiro):
+    """
+    Verifica se todas as casas estão ocupadas.
+
+    Deve ser chamada APÓS verificar se há vencedor, como em jogo.py.
+    """
+    return (tabuleiro.bits[0] | tabuleiro.bits[1]) == TABULEIRO_CHEIO
+
+
+def empate_antecipado(tabuleiro):
+    """
+    Verifica se nenhuma linha vencedora continua possível para X ou O.
+
+    Duas consultas a LINHAS_TOCADAS, sem percorrer as linhas. Também deve
+    ser chamada APÓS verificar se há vencedor.
+
+    Returns:
+        bool: True se a partida só pode terminar empatada
+    """
+    return LINHAS_TOCADAS[tabuleiro.bits[0]] & LINHAS_TOCADAS[tabuleiro.bits[1]] == TODAS_LINHAS
+
+
+# =====================================================================
+# CONVERSÃO ENTRE OS DOIS MOTORES
+# =====================================================================
+
+def de_lista(tabuleiro_lista):
+    """
+    Converte um tabuleiro de jogo.py (lista 3x3 de strings) em TabuleiroBits.
+
+    Casas com ' ' ou '' são consideradas vazias.
+    """
+    tabuleiro = TabuleiroBits()
+    for i in range(3):
+        for j in range(3):
+            simbolo = tabuleiro_lista[i][j]
+            if simbolo in INDICE_JOGADOR:
+                tabuleiro.bits[INDICE_JOGADOR[simbolo]] |= 1 << (i * 3 + j)
+    return tabuleiro
+
+
+def para_lista(tabuleiro):
+    """Converte TabuleiroBits em lista 3x3 de strings (formato de jogo.py)."""
+    return [[tabuleiro.simbolo_em(i, j) for j in range(3)] for i in range(3)]
+
+
+if __name__ == '__main__':
+    # Comparação de desempenho: validação de jogadas nos dois motores
+    import random
+    import sys
+    import time
+
+    import jogo
+
+    def medir(modulo, partidas):
+        inicio = time.perf_counter()
+        jogadas = 0
+        for ordem in partidas:
+            tabuleiro = modulo.criar_tabuleiro()
+            jogador = 'X'
+            for casa in ordem:
+                modulo.realizar_jogada(tabuleiro, casa // 3, casa % 3, jogador)
+                jogadas += 1
+                if modulo.verificar_vitoria(tabuleiro, jogador) or modulo.verificar_empate(tabuleiro):
+                    break
+                jogador = 'O' if jogador == 'X' else 'X'
+        return jogadas / (time.perf_counter() - inicio)
+
+    partidas = [random.sample(range(CASAS), CASAS) for _ in range(50_000)]
+    print(f"jogo.py (listas):   {medir(jogo, partidas):>12,.0f} jogadas/s")
+    print(f"jogo_bitboard.py:   {medir(sys.modules[__name__], partidas):>12,.0f} jogadas/s")
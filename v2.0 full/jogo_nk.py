@@ -0,0 +1,219 @@
+# === jogo_nk.py ===
+# Motor generalizado "K em linha" para tabuleiros de qualquer tamanho
+# jogo.py fixa o 3x3 em todo lugar (range(3), diagonais explícitas, limites).
+# Aqui largura, altura e K são parâmetros, permitindo variantes como Gomoku
+# (15x15 ou 19x19, K=5). A vitória é verificada apenas nas 4 direções que
+# passam pela última pedra colocada (custo O(K), independente do tamanho do
+# tabuleiro) e o empate é detectado por um contador de jogadas.
+
+VAZIO = ' '
+
+# Direções de verificação: horizontal, vertical, diagonal e antidiagonal
+DIRECOES = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class TabuleiroNK:
+    """
+    Tabuleiro largura x altura onde vence quem alinhar K símbolos.
+
+    Atributos:
+        largura, altura: Dimensões do tabuleiro
+        k: Quantidade de símbolos alinhados necessária para vencer
+        casas: Lista plana (linha * largura + coluna) com 'X', 'O' ou ' '
+        jogadas: Contador de jogadas realizadas (usado para detectar empate)
+        historico: Pilha de casas jogadas (permite desfazer)
+        vencedor: 'X', 'O' ou None, atualizado a cada jogada
+    """
+
+    def __init__(self, largura=3, altura=3, k=3):
+        if k > max(largura, altura):
+            raise ValueError("K maior que o tabuleiro: ninguém conseguiria vencer")
+        self.largura = largura
+        self.altura = altura
+        self.k = k
+        self.casas = [VAZIO] * (largura * altura)
+        self.jogadas = 0
+        self.historico = []
+        self.vencedor = None
+
+    @property
+    def total_casas(self):
+        return self.largura * self.altura
+
+    def proximo_jogador(self):
+        """Símbolo de quem joga agora ('X' sempre começa)."""
+        return 'X' if self.jogadas % 2 == 0 else 'O'
+
+    def simbolo_em(self, linha, coluna):
+        """Retorna 'X', 'O' ou ' ' para a casa informada."""
+        return self.casas[linha * self.largura + coluna]
+
+    def dentro(self, linha, coluna):
+        """True se (linha, coluna) está dentro do tabuleiro."""
+        return 0 <= linha < self.altura and 0 <= coluna < self.largura
+
+    # =====================================================================
+    # JOGADAS
+    # =====================================================================
+
+    def realizar_jogada(self, linha, coluna, jogador):
+        """
+        Tenta colocar o símbolo do jogador na casa indicada.
+
+        Args:
+            linha, coluna (int): Posição (indexação a partir de 0)
+            jogador (str): 'X' ou 'O'
+
+        Returns:
+            bool: True se a jogada foi feita, False se posição inválida/ocupada
+                  ou se a partida já terminou
+        """
+        if self.vencedor is not None or not self.dentro(linha, coluna):
+            return False
+        indice = linha * self.largura + coluna
+        if self.casas[indice] != VAZIO:
+            return False
+
+        self.casas[indice] = jogador
+        self.jogadas += 1
+        self.historico.append(indice)
+        if self.alinhou(linha, coluna, jogador):
+            self.vencedor = jogador
+        return True
+
+    def desfazer(self):
+        """
+        Desfaz a última jogada (usado por buscas e pela IA).
+
+        Returns:
+            tuple: (linha, coluna) da jogada desfeita
+        """
+        indice = self.historico.pop()
+        self.casas[indice] = VAZIO
+        self.jogadas -= 1
+        # Só a última jogada pode ter encerrado a partida
+        self.vencedor = None
+        return divmod(indice, self.largura)
+
+    def alinhou(self, linha, coluna, jogador):
+        """
+        Verifica se a pedra em (linha, coluna) formou K em linha.
+
+        Percorre apenas as 4 direções que passam pela casa, no máximo K-1
+        casas para cada lado: O(K) por jogada.
+        """
+        casas = self.casas
+        largura = self.largura
+        k = self.k
+        for dl, dc in DIRECOES:
+            contagem = 1
+            # Conta para frente e para trás na mesma direção
+            for sentido in (1, -1):
+                l = linha + dl * sentido
+                c = coluna + dc * sentido
+                while (contagem < k and 0 <= l < self.altura and 0 <= c < largura
+                       and casas[l * largura + c] == jogador):
+                    contagem += 1
+                    l += dl * sentido
+                    c += dc * sentido
+            if contagem >= k:
+                return True
+        return False
+
+    # =====================================================================
+    # ESTADO DA PARTIDA
+    # =====================================================================
+
+    def verificar_vitoria(self, jogador):
+        """True se `jogador` venceu (consulta O(1) do resultado da última jogada)."""
+        return self.vencedor == jogador
+
+    def verificar_empate(self):
+        """True se todas as casas foram preenchidas sem vencedor (contador)."""
+        return self.vencedor is None and self.jogadas == self.total_casas
+
+    def terminou(self):
+        """True se a partida acabou (vitória ou tabuleiro cheio)."""
+        return self.vencedor is not None or self.jogadas == self.total_casas
+
+    def jogadas_validas(self):
+        """Lista de (linha, coluna) vazias, em ordem de leitura."""
+        largura = self.largura
+        return [divmod(i, largura) for i, s in enumerate(self.casas) if s == VAZIO]
+
+    def copiar(self):
+        """Cópia independente do tabuleiro (para simulações)."""
+        novo = TabuleiroNK.__new__(TabuleiroNK)
+        novo.largura, novo.altura, novo.k = self.largura, self.altura, self.k
+        novo.casas = self.casas[:]
+        novo.jogadas = self.jogadas
+        novo.historico = self.historico[:]
+        novo.vencedor = self.vencedor
+        return novo
+
+
+# =====================================================================
+# FUNÇÕES COM A MESMA INTERFACE DE jogo.py
+# =====================================================================
+
+def criar_tabuleiro(largura=3, altura=3, k=3):
+    """Cria um TabuleiroNK vazio (padrão: 3x3, 3 em linha)."""
+    return TabuleiroNK(largura, altura, k)
+
+
+def de_lista(tabuleiro_lista, k=3):
+    """
+    Converte um tabuleiro de jogo.py (lista de listas de strings) em TabuleiroNK.
+
+    A vez é deduzida da quantidade de jogadas ('X' sempre começa); o
+    histórico fica em ordem de leitura, não na ordem real das jogadas.
+    """
+    if isinstance(tabuleiro_lista, TabuleiroNK):
+        return tabuleiro_lista
+    tabuleiro = TabuleiroNK(len(tabuleiro_lista[0]), len(tabuleiro_lista), k)
+    for linha, valores in enumerate(tabuleiro_lista):
+        for coluna, simbolo in enumerate(valores):
+            if simbolo in ('X', 'O'):
+                indice = linha * tabuleiro.largura + coluna
+                tabuleiro.casas[indice] = simbolo
+                tabuleiro.jogadas += 1
+                tabuleiro.historico.append(indice)
+                if tabuleiro.alinhou(linha, coluna, simbolo):
+                    tabuleiro.vencedor = simbolo
+    return tabuleiro
+
+
+def exibir_tabuleiro(tabuleiro):
+    """Exibe o tabuleiro no terminal com numeração 1-indexada."""
+    largura = tabuleiro.largura
+    cabecalho = "    " + "".join(f"{j+1:<4}" for j in range(largura))
+    separador = "  +" + "---+" * largura
+    print("\n" + cabecalho.rstrip())
+    print(separador)
+    for i in range(tabuleiro.altura):
+        linha = f"{i+1:<2}|"
+        for j in range(largura):
+            linha += f" {tabuleiro.simbolo_em(i, j)} |"
+        print(linha)
+        print(separador)
+
+
+def realizar_jogada(tabuleiro, linha, coluna, jogador):
+    """Mesma semântica de jogo.realizar_jogada para um TabuleiroNK."""
+    return tabuleiro.realizar_jogada(linha, coluna, jogador)
+
+
+def verificar_vitoria(tabuleiro, jogador):
+    """Mesma semântica de jogo.verificar_vitoria para um TabuleiroNK."""
+    return tabuleiro.verificar_vitoria(jogador)
+
+
+def verificar_empate(tabuleiro):
+    """
+    Mesma semântica de jogo.verificar_empate para um TabuleiroNK: True com
+    todas as casas ocupadas, mesmo que a última jogada tenha vencido.
+
+    Deve ser chamada APÓS verificar se há vencedor, como em jogo.py (o
+    método TabuleiroNK.verificar_empate já exclui o vencedor).
+    """
+    return tabuleiro.jogadas == tabuleiro.total_casas
@@ -0,0 +1,386 @@
+# === jogo_ultimate.py ===
+# Motor da variante "Ultimate" do jogo da velha (jogo da velha 9x9)
+# O tabuleiro tem 9 subtabuleiros 3x3. Vencer um subtabuleiro marca a casa
+# correspondente do tabuleiro "meta"; vence quem fizer linha no meta.
+# Regra do tabuleiro forçado: a casa jogada dentro do subtabuleiro indica em
+# qual subtabuleiro o adversário deve jogar. Se esse subtabuleiro já estiver
+# fechado (vencido ou cheio), o adversário joga em qualquer um aberto.
+#
+# Cada subtabuleiro é um par de máscaras de 9 bits, e o meta também: a
+# vitória usa a mesma lógica de jogo_bitboard (venceu_com / TABELA_VITORIA)
+# nos dois níveis. Jogadas são endereçadas por índice global
+# subtabuleiro * 9 + casa ou por (linha, coluna) no 9x9 da interface.
+#
+# As funções criar_tabuleiro, exibir_tabuleiro, realizar_jogada,
+# verificar_vitoria, verificar_empate e empate_antecipado têm os mesmos nomes
+# e assinaturas de jogo.py, então main.py e servidor_async.py trocam de motor
+# sem mudar o fluxo da partida.
+
+import random
+import time
+
+from jogo_bitboard import (LINHAS_TOCADAS, TABELA_VITORIA,
+                           TABULEIRO_CHEIO, TODAS_LINHAS, venceu_com)
+
+# === CONSTANTES DO TABULEIRO ===
+LADO = 9                 # Linhas/colunas do tabuleiro completo
+TOTAL_CASAS = LADO * LADO
+SIMBOLOS = ('X', 'O')
+
+# Casas ligadas de cada máscara de 9 bits (gera jogadas sem testar bit a bit)
+CASAS_DA_MASCARA = tuple(
+    tuple(casa for casa in range(9) if mascara >> casa & 1) for mascara in range(1 << 9)
+)
+
+# Conversão entre índice global (sub * 9 + casa) e (linha, coluna) no 9x9
+COORDENADAS = tuple(
+    ((sub // 3) * 3 + casa // 3, (sub % 3) * 3 + casa % 3)
+    for sub in range(9) for casa in range(9)
+)
+INDICE_GLOBAL = {coordenada: indice for indice, coordenada in enumerate(COORDENADAS)}
+
+# Prazo padrão do bot (segundos por jogada)
+TEMPO_LIMITE_PADRAO = 0.3
+
+
+class TabuleiroUltimate:
+    """
+    Estado de uma partida Ultimate.
+
+    Atributos:
+        sub: [máscaras do X, máscaras do O], 9 máscaras de 9 bits cada
+        meta: [máscara do X, máscara do O] dos subtabuleiros vencidos
+        fechados: Máscara dos subtabuleiros vencidos ou cheios
+        forcado: Subtabuleiro onde a próxima jogada é obrigatória (-1 = livre)
+        vencedor: 'X', 'O' ou None
+        historico: Pilha de estados anteriores para desfazer()
+    """
+
+    __slots__ = ('sub', 'meta', 'fechados', 'forcado', 'vencedor', 'historico')
+
+    def __init__(self):
+        self.sub = [[0] * 9, [0] * 9]
+        self.meta = [0, 0]
+        self.fechados = 0
+        self.forcado = -1
+        self.vencedor = None
+        self.historico = []
+
+    def proximo_jogador(self):
+        """Símbolo de quem joga agora ('X' sempre começa)."""
+        return SIMBOLOS[len(self.historico) & 1]
+
+    def simbolo_em(self, linha, coluna):
+        """Retorna 'X', 'O' ou ' ' para a casa (linha, coluna) do 9x9."""
+        sub, casa = divmod(INDICE_GLOBAL[linha, coluna], 9)
+        bit = 1 << casa
+        if self.sub[0][sub] & bit:
+            return 'X'
+        if self.sub[1][sub] & bit:
+            return 'O'
+        return ' '
+
+    def dono_subtabuleiro(self, sub):
+        """'X' ou 'O' se o subtabuleiro foi vencido, None caso contrário."""
+        bit = 1 << sub
+        if self.meta[0] & bit:
+            return 'X'
+        if self.meta[1] & bit:
+            return 'O'
+        return None
+
+    # =====================================================================
+    # GERAÇÃO DE JOGADAS
+    # =====================================================================
+
+    def subtabuleiros_livres(self):
+        """Máscara dos subtabuleiros onde a próxima jogada é permitida."""
+        if self.vencedor is not None:
+            return 0
+        if self.forcado >= 0:
+            return 1 << self.forcado
+        return TABULEIRO_CHEIO & ~self.fechados
+
+    def jogadas_legais(self):
+        """
+        Jogadas permitidas como máscara de 81 bits (bit sub * 9 + casa).
+
+        Returns:
+            int: 0 se a partida terminou
+        """
+        livres = self.subtabuleiros_livres()
+        bits_x, bits_o = self.sub
+        mascara = 0
+        for sub in CASAS_DA_MASCARA[livres]:
+            mascara |= (TABULEIRO_CHEIO & ~(bits_x[sub] | bits_o[sub])) << (sub * 9)
+        return mascara
+
+    def lista_jogadas(self):
+        """Jogadas permitidas como lista de índices globais."""
+        bits_x, bits_o = self.sub
+        jogadas = []
+        for sub in CASAS_DA_MASCARA[self.subtabuleiros_livres()]:
+            base = sub * 9
+            jogadas.extend(base + casa for casa in
+                           CASAS_DA_MASCARA[TABULEIRO_CHEIO & ~(bits_x[sub] | bits_o[sub])])
+        return jogadas
+
+    # =====================================================================
+    # JOGAR E DESFAZER
+    # =====================================================================
+
+    def jogar(self, indice):
+        """
+        Aplica a jogada global `indice` para quem está na vez (sem validar).
+
+        Use jogadas_legais() antes; realizar_jogada() faz a validação.
+        """
+        jogador = len(self.historico) & 1
+        sub, casa = divmod(indice, 9)
+        self.historico.append((indice, self.forcado, self.fechados, self.meta[jogador]))
+
+        mascaras = self.sub[jogador]
+        mascara = mascaras[sub] | (1 << casa)
+        mascaras[sub] = mascara
+        if venceu_com(mascara, casa):
+            # Subtabuleiro vencido: marca o meta e confere a linha no meta
+            self.meta[jogador] |= 1 << sub
+            self.fechados |= 1 << sub
+            if venceu_com(self.meta[jogador], sub):
+                self.vencedor = SIMBOLOS[jogador]
+        elif (mascara | self.sub[1 - jogador][sub]) == TABULEIRO_CHEIO:
+            self.fechados |= 1 << sub  # Subtabuleiro cheio e empatado
+
+        # A casa jogada manda o adversário para o subtabuleiro de mesmo número
+        self.forcado = -1 if self.fechados >> casa & 1 else casa
+
+    def desfazer(self):
+        """Desfaz a última jogada, restaurando o estado anterior."""
+        indice, self.forcado, self.fechados, meta = self.historico.pop()
+        jogador = len(self.historico) & 1
+        sub, casa = divmod(indice, 9)
+        self.sub[jogador][sub] &= ~(1 << casa)
+        self.meta[jogador] = meta
+        self.vencedor = None
+
+    def terminou(self):
+        """True se alguém venceu ou não há mais jogadas."""
+        return self.vencedor is not None or self.fechados == TABULEIRO_CHEIO
+
+    def copiar(self):
+        """Cópia independente do tabuleiro (inclui o histórico)."""
+        copia = TabuleiroUltimate()
+        copia.sub = [self.sub[0][:], self.sub[1][:]]
+        copia.meta = self.meta[:]
+        copia.fechados = self.fechados
+        copia.forcado = self.forcado
+        copia.vencedor = self.vencedor
+        copia.historico = self.historico[:]
+        return copia
+
+    def __repr__(self):
+        return (f"TabuleiroUltimate(jogadas={len(self.historico)}, "
+                f"meta_X={self.meta[0]:09b}, meta_O={self.meta[1]:09b}, "
+                f"forcado={self.forcado})")
+
+
+def vencedor_meta(tabuleiro):
+    """
+    Confere o tabuleiro meta inteiro (sem depender da última jogada).
+
+    Returns:
+        str: 'X', 'O' ou None
+    """
+    for indice, simbolo in enumerate(SIMBOLOS):
+        if TABELA_VITORIA[tabuleiro.meta[indice]]:
+            return simbolo
+    return None
+
+
+# =====================================================================
+# ADAPTADORES COM A MESMA INTERFACE DE jogo.py
+# =====================================================================
+
+def criar_tabuleiro():
+    """
+    Cria um tabuleiro Ultimate vazio.
+
+    Returns:
+        TabuleiroUltimate: 9 subtabuleiros vazios, jogada livre para o X
+    """
+    return TabuleiroUltimate()
+
+
+def exibir_tabuleiro(tabuleiro):
+    """Exibe o tabuleiro 9x9 no terminal, separando os subtabuleiros."""
+    print("\n     1 2 3   4 5 6   7 8 9")
+    for linha in range(LADO):
+        if linha % 3 == 0:
+            print("   +-------+-------+-------+")
+        celulas = [tabuleiro.simbolo_em(linha, coluna) for coluna in range(LADO)]
+        blocos = [' '.join(celulas[i:i + 3]) for i in range(0, LADO, 3)]
+        print(f" {linha + 1} | " + ' | '.join(blocos) + " |")
+    print("   +-------+-------+-------+")
+
+
+def realizar_jogada(tabuleiro, linha, coluna, jogador):
+    """
+    Tenta realizar uma jogada no 9x9.
+
+    Args:
+        tabuleiro (TabuleiroUltimate): Estado do jogo
+        linha, coluna (int): Coordenadas no 9x9 (0-8)
+        jogador (str): 'X' ou 'O' (precisa ser quem está na vez)
+
+    Returns:
+        bool: True se a jogada foi feita, False se fora da vez, fora do
+              subtabuleiro forçado, casa ocupada ou partida encerrada
+    """
+    indice = INDICE_GLOBAL.get((linha, coluna))
+    if indice is None or jogador != tabuleiro.proximo_jogador():
+        return False
+    if not tabuleiro.jogadas_legais() >> indice & 1:
+        return False
+    tabuleiro.jogar(indice)
+    return True
+
+
+def desfazer_jogada(tabuleiro):
+    """
+    Desfaz a última jogada.
+
+    Returns:
+        bool: False se não havia jogada para desfazer
+    """
+    if not tabuleiro.historico:
+        return False
+    tabuleiro.desfazer()
+    return True
+
+
+def verificar_vitoria(tabuleiro, jogador):
+    """True se o jogador fez linha no tabuleiro meta."""
+    return tabuleiro.vencedor == jogador
+
+
+def verificar_empate(tabuleiro):
+    """
+    True se todos os subtabuleiros estão fechados e ninguém venceu.
+
+    Deve ser chamada APÓS verificar se há vencedor, como em jogo.py.
+    """
+    return tabuleiro.vencedor is None and tabuleiro.fechados == TABULEIRO_CHEIO
+
+
+def empate_antecipado(tabuleiro):
+    """
+    True se nenhuma linha do meta ainda pode ser completada.
+
+    Um subtabuleiro empatado bloqueia as linhas dos dois jogadores; um
+    vencido bloqueia as linhas do adversário. Mesma consulta a
+    LINHAS_TOCADAS de jogo_bitboard.empate_antecipado.
+    """
+    meta_x, meta_o = tabuleiro.meta
+    empatados = tabuleiro.fechados & ~(meta_x | meta_o)
+    return (LINHAS_TOCADAS[meta_x | empatados] & LINHAS_TOCADAS[meta_o | empatados]
+            == TODAS_LINHAS)
+
+
+def casas_legais(tabuleiro):
+    """Jogadas permitidas como lista de (linha, coluna) no 9x9."""
+    return [COORDENADAS[indice] for indice in tabuleiro.lista_jogadas()]
+
+
+# =====================================================================
+# BOT (MONTE CARLO COM PRAZO)
+# =====================================================================
+
+def _playout(tabuleiro, rng):
+    """Termina a partida com jogadas aleatórias; retorna o vencedor ou None."""
+    while tabuleiro.vencedor is None:
+        jogadas = tabuleiro.lista_jogadas()
+        if not jogadas:
+            return None
+        tabuleiro.jogar(jogadas[rng.randrange(len(jogadas))])
+    return tabuleiro.vencedor
+
+
+def melhor_jogada(tabuleiro, jogador=None, tempo_limite=TEMPO_LIMITE_PADRAO, semente=None):
+    """
+    Jogada do bot: playouts aleatórios distribuídos entre as jogadas da raiz
+    até o prazo; vence a de maior pontuação média.
+
+    Args:
+        tabuleiro (TabuleiroUltimate): Posição atual (não é modificada)
+        jogador (str): Quem joga (padrão: quem está na vez)
+        tempo_limite (float): Segundos disponíveis
+        semente: Semente do gerador aleatório (testes)
+
+    Returns:
+        tuple: (linha, coluna) no 9x9, ou None se a partida já terminou
+    """
+    prazo = time.perf_counter() + tempo_limite
+    jogadas = tabuleiro.lista_jogadas()
+    if not jogadas:
+        return None
+    jogador = jogador or tabuleiro.proximo_jogador()
+
+    # Vitória imediata dispensa simulação
+    for indice in jogadas:
+        tabuleiro.jogar(indice)
+        venceu = tabuleiro.vencedor == jogador
+        tabuleiro.desfazer()
+        if venceu:
+            return COORDENADAS[indice]
+    if len(jogadas) == 1:
+        return COORDENADAS[jogadas[0]]
+
+    rng = random.Random(semente)
+    pontos = [0.0] * len(jogadas)
+    visitas = [0] * len(jogadas)
+    rodada = 0
+    while time.perf_counter() < prazo:
+        i = rodada % len(jogadas)
+        copia = tabuleiro.copiar()
+        copia.jogar(jogadas[i])
+        vencedor = _playout(copia, rng)
+        pontos[i] += 1.0 if vencedor == jogador else 0.5 if vencedor is None else 0.0
+        visitas[i] += 1
+        rodada += 1
+
+    melhor = max(range(len(jogadas)),
+                 key=lambda i: pontos[i] / visitas[i] if visitas[i] else 0.0)
+    return COORDENADAS[jogadas[melhor]]
+
+
+if __name__ == '__main__':
+    # Velocidade do motor: partidas aleatórias completas por segundo
+    rng = random.Random(1)
+    partidas = 2000
+    vitorias = {'X': 0, 'O': 0, None: 0}
+    jogadas = 0
+    inicio = time.perf_counter()
+    for _ in range(partidas):
+        tabuleiro = criar_tabuleiro()
+        vitorias[_playout(tabuleiro, rng)] += 1
+        jogadas += len(tabuleiro.historico)
+    duracao = time.perf_counter() - inicio
+    print(f"{partidas / duracao:,.0f} partidas/s, {jogadas / duracao:,.0f} jogadas/s "
+          f"(X {vitorias['X']}, O {vitorias['O']}, empates {vitorias[None]})")
+
+    # Bot com prazo contra jogadas aleatórias
+    placar = {'bot': 0, 'aleatorio': 0, 'empate': 0}
+    for partida in range(10):
+        tabuleiro = criar_tabuleiro()
+        bot = 'X' if partida % 2 == 0 else 'O'
+        while not tabuleiro.terminou():
+            if tabuleiro.proximo_jogador() == bot:
+                linha, coluna = melhor_jogada(tabuleiro, tempo_limite=0.05)
+            else:
+                linha, coluna = rng.choice(casas_legais(tabuleiro))
+            realizar_jogada(tabuleiro, linha, coluna, tabuleiro.proximo_jogador())
+        if tabuleiro.vencedor is None:
+            placar['empate'] += 1
+        else:
+            placar['bot' if tabuleiro.vencedor == bot else 'aleatorio'] += 1
+    print(f"Bot (50 ms por jogada) contra aleatório: {placar}")
@@ -1,10 +1,17 @@
 import tkinter as tk
 from tkinter import messagebox
 import threading
+import random
 
 # Importações do seu projeto original
-from jogo import criar_tabuleiro, exibir_tabuleiro, realizar_jogada, verificar_vitoria, verificar_empate
-from p2p import aguardar_conexao, conectar_cliente, enviar, receber, encerrar
+import jogo
+import jogo_ultimate  # Variante Ultimate: mesma interface de jogo.py em 9x9
+from p2p import aguardar_conexao, conectar_cliente, enviar, receber_mensagens, encerrar
+import protocolo as protocolo_app  # Protocolo de aplicação (texto/binário)
+import tabela_jogo  # Jogadas ótimas pré-calculadas (IA e dicas)
+from trabalhador_ia import TrabalhadorIA
+from especulacao import Especulador
+from sessao import Sessao, trocar_simbolo  # Série de partidas na mesma conexão
 
 class JogoDaVelhaGUI:
     """
@@ -15,10 +22,19 @@ class JogoDaVelhaGUI:
     
     Atributos:
         root: Janela principal do Tkinter
-        tabuleiro: Matriz 3x3 representando o estado do jogo
+        tabuleiro: Matriz 3x3 (ou TabuleiroUltimate) com o estado do jogo
         jogador_atual: Símbolo do jogador atual ('X' ou 'O')
-        modo_jogo: Tipo de jogo ('pvp', 'online')
+        modo_jogo: Tipo de jogo ('pvp', 'online', 'computador')
         botoes_tabuleiro: Matriz de botões da interface gráfica
+        variante: Variante escolhida (protocolo.VARIANTES)
+        motor: Módulo de regras da variante (jogo ou jogo_ultimate)
+        
+        # Variáveis do modo contra o computador e das dicas
+        simbolo_computador: Símbolo jogado pela IA ('O')
+        trabalhador_ia: Thread de fundo que calcula jogadas e dicas
+        dica_atual: Casa destacada pela última dica (ou None)
+        especulador: Respostas pré-calculadas enquanto o oponente pensa
+        dica_pronta: Dica já especulada para a posição atual (modo online)
         
         # Variáveis específicas do modo online
         sock: Socket de comunicação
@@ -26,6 +42,7 @@ class JogoDaVelhaGUI:
         jogador_local: Símbolo do jogador local ('X' ou 'O')
         minha_vez: Boolean indicando se é a vez do jogador local
         conexao_ativa: Boolean indicando se conexão está estabelecida
+        sessao: Placar e revanche (REINICIAR) das partidas na mesma conexão
     """
     
     def __init__(self):
@@ -50,6 +67,11 @@ class JogoDaVelhaGUI:
         self.modo_jogo = None
         self.botoes_tabuleiro = []
         
+        # Variante do jogo: clássica (jogo.py) ou Ultimate (jogo_ultimate.py)
+        self.variante = protocolo_app.VARIANTE_CLASSICA
+        self.motor = jogo
+        self.ultimate_var = None
+        
         # === VARIÁVEIS ESPECÍFICAS DO MODO ONLINE ===
         # Comunicação de rede
         self.sock = None
@@ -59,6 +81,8 @@ class JogoDaVelhaGUI:
         self.jogador_local = None    # 'X' para host, 'O' para cliente
         self.minha_vez = False       # Controla alternância de turnos
         self.conexao_ativa = False   # Flag de conexão estabelecida
+        self.protocolo_binario = False  # Oponente aceita mensagens binárias
+        self.sessao = None           # Sessão aberta em iniciar_jogo("online")
         
         # Widgets da interface de conexão
         self.protocolo_var = None
@@ -70,6 +94,17 @@ class JogoDaVelhaGUI:
         # Widgets do jogo
         self.label_jogador = None
         
+        # === VARIÁVEIS DO MODO CONTRA O COMPUTADOR ===
+        # A IA roda em thread própria; o resultado volta pela fila do Tkinter
+        self.simbolo_computador = 'O'
+        self.trabalhador_ia = TrabalhadorIA(lambda funcao: self.root.after(0, funcao))
+        self.dica_atual = None
+        
+        # Enquanto o oponente pensa, a IA já calcula a resposta para cada
+        # jogada possível dele (computador responde na hora; dica instantânea)
+        self.especulador = Especulador(tabela_jogo.melhor_jogada)
+        self.dica_pronta = None
+        
         # === INICIALIZAÇÃO ===
         self.mostrar_menu_principal()
         
@@ -93,11 +128,11 @@ class JogoDaVelhaGUI:
     
     def mostrar_menu_principal(self):
         """
-        Exibe menu principal com 3 opções: Offline, Online, Sair.
+        Exibe menu principal com 4 opções: Offline, Computador, Online, Sair.
         
         Layout:
         - Título centralizado
-        - 3 botões verticalmente alinhados
+        - 4 botões verticalmente alinhados
         - Cores diferenciadas para cada opção
         - Botão sair com cor de alerta
         """
@@ -116,6 +151,13 @@ class JogoDaVelhaGUI:
                            bg="lightgreen", activebackground="green")
         btn_pvp.pack(pady=10)
         
+        # Botão Contra o Computador - cor amarela suave
+        btn_computador = tk.Button(self.root, text="Contra o Computador", 
+                                  font=("Arial", 16), width=20, height=2,
+                                  command=lambda: self.iniciar_jogo("computador"),
+                                  bg="lightyellow", activebackground="gold")
+        btn_computador.pack(pady=10)
+        
         # Botão Modo Online - cor azul suave
         btn_online = tk.Button(self.root, text="Jogo 1v1 Online", 
                               font=("Arial", 16), width=20, height=2,
@@ -129,6 +171,31 @@ class JogoDaVelhaGUI:
                             command=self.sair_jogo,
                             bg="lightcoral", activebackground="red")
         btn_sair.pack(pady=10)
+        
+        # Seleção da variante (vale para os três modos de jogo)
+        self.ultimate_var = tk.BooleanVar(value=self.variante == protocolo_app.VARIANTE_ULTIMATE)
+        tk.Checkbutton(self.root, text="Variante Ultimate (9 tabuleiros)",
+                       variable=self.ultimate_var, font=("Arial", 11),
+                       command=self.alternar_variante).pack(pady=5)
+    
+    def alternar_variante(self):
+        """Aplica a variante marcada no menu principal."""
+        self.definir_variante(protocolo_app.VARIANTE_ULTIMATE if self.ultimate_var.get()
+                              else protocolo_app.VARIANTE_CLASSICA)
+    
+    def definir_variante(self, variante):
+        """
+        Troca a variante e o motor de regras usado nas próximas partidas.
+        
+        Args:
+            variante: protocolo.VARIANTE_CLASSICA ou protocolo.VARIANTE_ULTIMATE
+        """
+        self.variante = variante
+        self.motor = jogo_ultimate if variante == protocolo_app.VARIANTE_ULTIMATE else jogo
+    
+    def ultimate(self):
+        """True se a partida atual é da variante Ultimate."""
+        return self.motor is jogo_ultimate
     
     def mostrar_menu_online(self):
         """
@@ -235,42 +302,30 @@ class JogoDaVelhaGUI:
     def criar_msg_jogada(self, linha, coluna):
         """
         Cria mensagem padronizada para transmitir jogada.
-        Mantém compatibilidade com protocolo original.
+        Usa o formato binário se o oponente anunciou suporte (protocolo.py).
         """
-        return f"JOGADA|{linha}|{coluna}"
+        return protocolo_app.criar_msg_jogada(linha, coluna, self.protocolo_binario)
 
     def criar_msg_fim(self, vencedor):
         """
         Cria mensagem para indicar fim de jogo.
-        Mantém compatibilidade com protocolo original.
+        Usa o formato binário se o oponente anunciou suporte (protocolo.py).
         """
-        return f"FIM_DE_JOGO|{vencedor}"
+        return protocolo_app.criar_msg_fim(vencedor, self.protocolo_binario)
 
     def criar_msg_empate(self):
         """
         Cria mensagem para indicar empate.
-        Mantém compatibilidade com protocolo original.
+        Usa o formato binário se o oponente anunciou suporte (protocolo.py).
         """
-        return "EMPATE"
+        return protocolo_app.criar_msg_empate(self.protocolo_binario)
 
     def interpretar_msg(self, msg):
         """
         Interpreta mensagem recebida do oponente.
-        Código idêntico ao original para manter compatibilidade.
+        Aceita o formato texto original e o formato binário (protocolo.py).
         """
-        partes = msg.strip().split('|')
-        tipo = partes[0]
-
-        if tipo == "JOGADA":
-            linha = int(partes[1])
-            coluna = int(partes[2])
-            return tipo, linha, coluna
-        elif tipo == "FIM_DE_JOGO":
-            return tipo, partes[1]
-        elif tipo == "EMPATE":
-            return tipo,
-        else:
-            return "ERRO",
+        return protocolo_app.interpretar_msg(msg)
     
     # =====================================================================
     # MÉTODOS DE CONEXÃO DE REDE
@@ -378,6 +433,24 @@ class JogoDaVelhaGUI:
             else:
                 # Sucesso na conexão
                 self.conexao_ativa = True
+                
+                # Anuncia suporte ao formato binário; até o oponente responder
+                # com o mesmo anúncio, as mensagens seguem em texto
+                self.protocolo_binario = False
+                enviar(self.sock, protocolo_app.criar_msg_protocolo(), protocolo, self.endereco_remoto)
+                
+                # Variante: o host decide e anuncia (só se não for a clássica);
+                # o cliente joga a clássica até receber "VARIANTE|..."
+                if modo == "Host":
+                    if self.variante != protocolo_app.VARIANTE_CLASSICA:
+                        enviar(self.sock, protocolo_app.criar_msg_variante(self.variante),
+                               protocolo, self.endereco_remoto)
+                else:
+                    # Num servidor de partidas, pede adversário da variante
+                    # marcada (um host P2P ignora o pedido)
+                    enviar(self.sock, protocolo_app.criar_msg_fila(self.variante),
+                           protocolo, self.endereco_remoto)
+                    self.definir_variante(protocolo_app.VARIANTE_CLASSICA)
                 # Host é sempre X, Cliente é sempre O (conforme original)
                 self.jogador_local = 'X' if modo == "Host" else 'O'
                 self.minha_vez = modo == "Host"  # Host começa jogando
@@ -424,7 +497,7 @@ class JogoDaVelhaGUI:
         Inicializa novo jogo com modo especificado.
         
         Args:
-            modo: 'pvp' ou 'online'
+            modo: 'pvp', 'computador' ou 'online'
         
         Ações:
         1. Define modo de jogo
@@ -435,9 +508,13 @@ class JogoDaVelhaGUI:
         self.modo_jogo = modo
         self.resetar_jogo()
         self.criar_interface_jogo()
+        self.preparar_especulacao()
         
         # === CONFIGURAÇÃO ESPECÍFICA PARA MODO ONLINE ===
         if modo == "online" and self.conexao_ativa:
+            # A conexão vale para a sessão inteira: revanches não reconectam
+            self.sessao = Sessao()
+            
             # Inicia thread para receber mensagens do oponente
             thread_recepcao = threading.Thread(
                 target=self.thread_recepcao_online,
@@ -464,10 +541,14 @@ class JogoDaVelhaGUI:
         # === 1. TÍTULO COM MODO DE JOGO ===
         if self.modo_jogo == "pvp":
             titulo_texto = "Jogo 1v1 Local"
+        elif self.modo_jogo == "computador":
+            titulo_texto = f"Contra o Computador - Você é '{self.jogador_humano()}'"
         elif self.modo_jogo == "online":
             titulo_texto = f"Jogo 1v1 Online - Você é '{self.jogador_local}'"
         else:
             titulo_texto = "Jogo da Velha"
+        if self.ultimate():
+            titulo_texto = f"Ultimate - {titulo_texto}"
             
         titulo = tk.Label(self.root, text=titulo_texto, 
                          font=("Arial", 16, "bold"))
@@ -477,6 +558,9 @@ class JogoDaVelhaGUI:
         if self.modo_jogo == "online":
             # Para modo online, mostra se é sua vez ou do oponente
             texto_jogador = "Sua vez!" if self.minha_vez else "Vez do oponente..."
+        elif self.modo_jogo == "computador":
+            texto_jogador = ("Computador pensando..." if self.vez_do_computador()
+                             else "Sua vez!")
         else:
             # Para modo offline, mostra jogador atual
             texto_jogador = f"Vez do jogador: {self.jogador_atual}"
@@ -485,29 +569,38 @@ class JogoDaVelhaGUI:
                                      font=("Arial", 14))
         self.label_jogador.pack(pady=5)
         
-        # === 3. TABULEIRO (GRADE 3x3) ===
+        # === 3. TABULEIRO (GRADE 3x3 OU 9x9 NA ULTIMATE) ===
         # Frame para conter o tabuleiro
         frame_tabuleiro = tk.Frame(self.root)
         frame_tabuleiro.pack(pady=20)
         
-        # Criação dos botões em grade 3x3
+        # Ultimate: botões menores e espaço extra entre os subtabuleiros
+        if self.ultimate():
+            lado, fonte, largura, altura = jogo_ultimate.LADO, ("Arial", 12, "bold"), 2, 1
+        else:
+            lado, fonte, largura, altura = 3, ("Arial", 20, "bold"), 4, 2
+        
+        # Criação dos botões em grade
         self.botoes_tabuleiro = []
-        for i in range(3):
+        for i in range(lado):
             linha_botoes = []
-            for j in range(3):
+            for j in range(lado):
                 btn = tk.Button(
                     frame_tabuleiro, 
                     text="", 
-                    font=("Arial", 20, "bold"), 
-                    width=4, height=2,
+                    font=fonte, 
+                    width=largura, height=altura,
                     command=lambda r=i, c=j: self.processar_jogada_gui(r, c),
                     bg="white",
                     relief="raised",
                     borderwidth=2
                 )
-                btn.grid(row=i, column=j, padx=2, pady=2)
+                espaco_x = (6 if j and j % 3 == 0 else 2, 2) if self.ultimate() else 2
+                espaco_y = (6 if i and i % 3 == 0 else 2, 2) if self.ultimate() else 2
+                btn.grid(row=i, column=j, padx=espaco_x, pady=espaco_y)
                 linha_botoes.append(btn)
             self.botoes_tabuleiro.append(linha_botoes)
+        self.atualizar_destaques()
         
         # === 4. CONTROLES DO JOGO ===
         frame_controles = tk.Frame(self.root)
@@ -520,6 +613,13 @@ class JogoDaVelhaGUI:
                                  bg="lightgreen", activebackground="green")
         btn_reiniciar.pack(side=tk.LEFT, padx=5)
         
+        # Botão de dica (calculada em segundo plano pelo trabalhador_ia)
+        btn_dica = tk.Button(frame_controles, text="Dica", 
+                            font=("Arial", 12), width=8,
+                            command=self.pedir_dica,
+                            bg="lightyellow", activebackground="gold")
+        btn_dica.pack(side=tk.LEFT, padx=5)
+        
         # Botão voltar (dinâmico baseado no modo)
         btn_voltar = tk.Button(frame_controles, text="← Voltar", 
                               font=("Arial", 12), width=12,
@@ -551,18 +651,46 @@ class JogoDaVelhaGUI:
                 messagebox.showerror("Erro", "Conexão perdida!")
                 return
         
+        # === VALIDAÇÃO PARA MODO CONTRA O COMPUTADOR ===
+        if self.modo_jogo == "computador" and self.vez_do_computador():
+            # Computador ainda está pensando - ignora clique
+            return
+        
+        self.executar_jogada(linha, coluna)
+    
+    def executar_jogada(self, linha, coluna):
+        """
+        Aplica a jogada do jogador atual e trata fim de jogo ou troca de turno.
+        
+        Usada pelos cliques (processar_jogada_gui) e pela jogada do computador.
+        
+        Args:
+            linha, coluna: Coordenadas da jogada (0-2)
+        """
         # === EXECUÇÃO DA JOGADA ===
         # Usa função original do módulo jogo
-        if realizar_jogada(self.tabuleiro, linha, coluna, self.jogador_atual):
-            # Jogada válida - atualiza interface
+        # Usa o motor da variante (jogo.py ou jogo_ultimate.py, mesma interface)
+        if self.motor.realizar_jogada(self.tabuleiro, linha, coluna, self.jogador_atual):
+            # Jogada válida - tabuleiro mudou, cálculos pendentes ficam obsoletos
+            self.cancelar_calculos_ia()
             self.atualizar_botao_tabuleiro(linha, coluna, self.jogador_atual)
+            self.atualizar_destaques()
+            
+            # === ENVIO DA JOGADA (MODO ONLINE) ===
+            # Também a jogada final: o oponente (ou o servidor) confere o
+            # fim de jogo no próprio tabuleiro
+            if self.modo_jogo == "online" and not self.enviar_jogada_online(linha, coluna):
+                return
             
             # === VERIFICAÇÃO DE FIM DE JOGO ===
-            if verificar_vitoria(self.tabuleiro, self.jogador_atual):
+            if self.motor.verificar_vitoria(self.tabuleiro, self.jogador_atual):
                 self.processar_vitoria(self.jogador_atual)
                 return
                 
-            if verificar_empate(self.tabuleiro):
+            # Empate também quando nenhuma linha ainda pode ser completada:
+            # no modo online a partida termina sem as jogadas restantes
+            if (self.motor.verificar_empate(self.tabuleiro)
+                    or self.motor.empate_antecipado(self.tabuleiro)):
                 self.processar_empate()
                 return
             
@@ -572,42 +700,222 @@ class JogoDaVelhaGUI:
             else:
                 self.processar_jogada_offline()
     
-    def processar_jogada_online(self, linha, coluna):
+    def enviar_jogada_online(self, linha, coluna):
         """
-        Processa jogada no modo online.
-        
-        Ações:
-        1. Envia jogada para oponente
-        2. Atualiza interface (não é mais sua vez)
-        3. Em caso de vitória/empate, envia mensagem de fim
+        Envia a jogada local ao oponente (ou ao servidor).
         
         Args:
             linha, coluna: Coordenadas da jogada realizada
+        
+        Returns:
+            bool: False se o envio falhou (o erro já foi mostrado)
         """
-        # === ENVIO DA JOGADA ===
         mensagem = self.criar_msg_jogada(linha, coluna)
         if not enviar(self.sock, mensagem, self.protocolo_var.get(), self.endereco_remoto):
             messagebox.showerror("Erro", "Falha ao enviar jogada!")
-            return
+            return False
+        return True
+    
+    def processar_jogada_online(self, linha, coluna):
+        """
+        Processa jogada no modo online (já enviada por executar_jogada).
         
+        Ações:
+        1. Atualiza interface (não é mais sua vez)
+        2. Especula as respostas do oponente
+        
+        Args:
+            linha, coluna: Coordenadas da jogada realizada
+        """
         # === ATUALIZAÇÃO DE TURNO ===
         self.minha_vez = False
         self.label_jogador.config(text="Vez do oponente...")
         
+        # Enquanto o oponente pensa, prepara a dica para cada resposta dele
+        jogador_remoto = 'O' if self.jogador_local == 'X' else 'X'
+        self.especular_respostas(jogador_remoto, self.jogador_local)
+        
         # Nota: Verificação de fim de jogo já foi feita em processar_jogada_gui
     
     def processar_jogada_offline(self):
         """
-        Processa continuação do jogo no modo offline (PvP).
+        Processa continuação do jogo no modo offline (PvP ou computador).
         
         Alterna para próximo jogador.
+        Contra o computador, pede a jogada da IA em segundo plano.
         """
         # === ALTERNÂNCIA DE JOGADOR ===
         self.jogador_atual = 'O' if self.jogador_atual == 'X' else 'X'
         
+        if self.modo_jogo == "computador":
+            if self.vez_do_computador():
+                self.label_jogador.config(text="Computador pensando...")
+                jogada = self.resposta_especulada()
+                if jogada is not None:
+                    # Resposta já especulada: joga assim que a GUI redesenhar
+                    self.root.after(0, lambda: self.callback_jogada_computador(jogada))
+                else:
+                    self.solicitar_jogada_computador()
+            else:
+                self.label_jogador.config(text="Sua vez!")
+                # Humano pensando: especula a resposta para cada jogada dele
+                self.especular_respostas(self.jogador_humano(), self.simbolo_computador)
+            return
+        
         # PvP: Apenas atualiza indicador
         self.label_jogador.config(text=f"Vez do jogador: {self.jogador_atual}")
     
+    # =====================================================================
+    # IA EM SEGUNDO PLANO (MODO COMPUTADOR E DICAS)
+    # =====================================================================
+    
+    def jogador_humano(self):
+        """Símbolo do jogador humano no modo contra o computador."""
+        return 'X' if self.simbolo_computador == 'O' else 'O'
+    
+    def vez_do_computador(self):
+        """True se é a vez da IA no modo contra o computador."""
+        return self.modo_jogo == "computador" and self.jogador_atual == self.simbolo_computador
+    
+    @staticmethod
+    def calcular_jogada_computador(tabuleiro, jogador):
+        """
+        Escolhe a jogada da IA (executa na thread do trabalhador_ia).
+        
+        Sorteia entre as jogadas ótimas para variar as partidas.
+        Na Ultimate usa o bot com prazo de jogo_ultimate.
+        """
+        if isinstance(tabuleiro, jogo_ultimate.TabuleiroUltimate):
+            return jogo_ultimate.melhor_jogada(tabuleiro, jogador)
+        jogadas = tabela_jogo.melhores_jogadas(tabuleiro, jogador)
+        return random.choice(jogadas) if jogadas else None
+    
+    @staticmethod
+    def calcular_dica(tabuleiro, jogador):
+        """Melhor jogada para a dica (executa na thread do trabalhador_ia)."""
+        if isinstance(tabuleiro, jogo_ultimate.TabuleiroUltimate):
+            return jogo_ultimate.melhor_jogada(tabuleiro, jogador)
+        return tabela_jogo.melhor_jogada(tabuleiro, jogador)
+    
+    def copiar_tabuleiro(self):
+        """Cópia do tabuleiro atual para as threads de fundo."""
+        if self.ultimate():
+            return self.tabuleiro.copiar()
+        return [linha[:] for linha in self.tabuleiro]
+    
+    def solicitar_jogada_computador(self):
+        """
+        Pede a jogada do computador sem bloquear a interface.
+        
+        O tabuleiro vai como cópia: a thread de fundo nunca lê o estado da GUI.
+        """
+        copia = self.copiar_tabuleiro()
+        self.trabalhador_ia.solicitar(self.calcular_jogada_computador,
+                                      (copia, self.jogador_atual),
+                                      self.callback_jogada_computador)
+    
+    def callback_jogada_computador(self, jogada):
+        """
+        Recebe a jogada calculada pela IA.
+        
+        Thread-safe: chamado via self.root.after() e só se o pedido não foi
+        cancelado (reinício, volta ao menu) desde que foi feito.
+        """
+        if jogada is None or not self.vez_do_computador():
+            return
+        self.executar_jogada(*jogada)
+    
+    def pedir_dica(self):
+        """
+        Calcula em segundo plano a melhor jogada para quem está na vez.
+        
+        No modo online só vale na sua vez; contra o computador, só na sua vez.
+        """
+        if self.modo_jogo == "online" and not self.minha_vez:
+            return
+        if self.vez_do_computador():
+            return
+        if self.dica_pronta is not None:
+            # Especulada enquanto o oponente pensava - sem esperar a thread
+            self.callback_dica(self.dica_pronta)
+            return
+        self.trabalhador_ia.solicitar(self.calcular_dica,
+                                      (self.copiar_tabuleiro(), self.jogador_atual),
+                                      self.callback_dica)
+    
+    def callback_dica(self, jogada):
+        """
+        Destaca a casa sugerida pela dica.
+        
+        Thread-safe: chamado via self.root.after(). Dicas de um tabuleiro que
+        já mudou são descartadas pelo trabalhador_ia antes de chegar aqui.
+        """
+        if jogada is None:
+            return
+        self.limpar_dica()
+        linha, coluna = jogada
+        self.botoes_tabuleiro[linha][coluna].config(bg="lightyellow")
+        self.dica_atual = jogada
+    
+    def limpar_dica(self):
+        """Remove o destaque da dica anterior (se houver)."""
+        if self.dica_atual is not None:
+            linha, coluna = self.dica_atual
+            try:
+                self.botoes_tabuleiro[linha][coluna].config(bg=self.cor_casa(linha, coluna))
+            except tk.TclError:
+                pass  # Botão já destruído (interface recriada)
+            self.dica_atual = None
+    
+    def cancelar_calculos_ia(self):
+        """
+        Descarta jogadas e dicas pendentes: o tabuleiro mudou.
+        """
+        self.trabalhador_ia.cancelar()
+        self.limpar_dica()
+        self.dica_pronta = None
+    
+    def especular_respostas(self, oponente, meu_simbolo):
+        """
+        Calcula em segundo plano a resposta para cada jogada do oponente.
+        
+        O resultado só é instalado se o tabuleiro não mudar antes (mesma
+        regra de versão das jogadas e dicas do trabalhador_ia). Na Ultimate
+        não há especulação: o bot com prazo levaria uma jogada inteira para
+        cada resposta possível do oponente.
+        """
+        if self.ultimate():
+            return
+        copia = [linha[:] for linha in self.tabuleiro]
+        self.trabalhador_ia.solicitar(self.especulador.calcular,
+                                      (copia, oponente, meu_simbolo),
+                                      self.especulador.instalar)
+    
+    def resposta_especulada(self):
+        """Resposta pré-calculada para o tabuleiro atual (None se não houver)."""
+        if self.ultimate():
+            return None
+        return self.especulador.consultar(self.tabuleiro)
+    
+    def preparar_especulacao(self):
+        """
+        Escolhe o motor do especulador para o modo e especula a 1ª jogada.
+        
+        Contra o computador a IA responde com a própria escolha; nas dicas,
+        com a jogada ótima de tabela_jogo.
+        """
+        if self.modo_jogo == "computador":
+            self.especulador.motor = self.calcular_jogada_computador
+            if not self.vez_do_computador():
+                self.especular_respostas(self.jogador_humano(), self.simbolo_computador)
+        else:
+            self.especulador.motor = tabela_jogo.melhor_jogada
+    
+    def relatar_especulacao(self):
+        """Mostra no terminal a taxa de acerto da especulação (fim de partida)."""
+        if self.especulador.acertos or self.especulador.falhas:
+            print(f"Especulação: {self.especulador.estatisticas()}")
+    
     # =====================================================================
     # THREAD DE RECEPÇÃO PARA MODO ONLINE
     # =====================================================================
@@ -620,8 +928,8 @@ class JogoDaVelhaGUI:
         Usa callbacks thread-safe para atualizar GUI.
         
         Loop:
-        1. Recebe mensagem do oponente
-        2. Interpreta tipo de mensagem
+        1. Recebe todas as mensagens disponíveis do oponente
+        2. Interpreta cada mensagem (despachar_msg_recebida)
         3. Chama callback apropriado via self.root.after()
         4. Continua até conexão ser encerrada
         
@@ -629,14 +937,19 @@ class JogoDaVelhaGUI:
         - JOGADA: Oponente fez jogada
         - FIM_DE_JOGO: Oponente venceu
         - EMPATE: Jogo terminou em empate
+        - REINICIAR: Oponente pediu (ou aceitou) a revanche
+        
+        O fim de uma partida não encerra o loop: a sessão continua na mesma
+        conexão até alguém voltar ao menu.
         """
         while self.conexao_ativa:
             try:
-                # === RECEPÇÃO DE MENSAGEM ===
-                # Usa função original do módulo p2p
-                msg, addr = receber(self.sock, self.protocolo_var.get())
+                # === RECEPÇÃO DE MENSAGENS ===
+                # Uma leitura do socket pode trazer várias mensagens (rajada);
+                # todas são tratadas antes da próxima chamada ao sistema
+                mensagens, addr = receber_mensagens(self.sock, self.protocolo_var.get())
                 
-                if msg is None:
+                if mensagens is None:
                     # Erro na comunicação ou timeout
                     if self.conexao_ativa:  # Evita callback se conexão já encerrada
                         self.root.after(0, self.callback_erro_comunicacao)
@@ -647,37 +960,77 @@ class JogoDaVelhaGUI:
                 if self.protocolo_var.get() == 'UDP' and self.endereco_remoto is None:
                     self.endereco_remoto = addr
                 
-                # === INTERPRETAÇÃO DA MENSAGEM ===
-                dados = self.interpretar_msg(msg)
-                tipo = dados[0]
-                
-                # === CALLBACKS THREAD-SAFE ===
-                if tipo == "JOGADA":
-                    # Oponente fez jogada
-                    _, linha, coluna = dados
-                    self.root.after(0, lambda l=linha, c=coluna: self.callback_jogada_recebida(l, c))
-                    
-                elif tipo == "FIM_DE_JOGO":
-                    # Oponente venceu
-                    vencedor = dados[1]
-                    self.root.after(0, lambda v=vencedor: self.callback_fim_jogo_recebido(v))
-                    break
-                    
-                elif tipo == "EMPATE":
-                    # Empate declarado pelo oponente
-                    self.root.after(0, self.callback_empate_recebido)
+                if not all(self.despachar_msg_recebida(msg) for msg in mensagens):
                     break
                     
-                else:
-                    # Mensagem não reconhecida
-                    self.root.after(0, lambda m=msg: self.callback_mensagem_desconhecida(m))
-                    
             except Exception as e:
                 # Erro na thread de recepção
                 if self.conexao_ativa:
                     self.root.after(0, lambda erro=str(e): self.callback_erro_thread(erro))
                 break
     
+    def despachar_msg_recebida(self, msg):
+        """
+        Interpreta uma mensagem recebida e agenda o callback correspondente.
+        
+        Executa na thread de recepção; a GUI só é tocada via self.root.after().
+        
+        Args:
+            msg: Mensagem recebida do oponente
+        
+        Returns:
+            bool: False se a recepção deve parar (nenhuma mensagem do
+                  protocolo atual faz isso: a sessão sobrevive ao fim de jogo)
+        """
+        # === INTERPRETAÇÃO DA MENSAGEM ===
+        dados = self.interpretar_msg(msg)
+        tipo = dados[0]
+        
+        # === CALLBACKS THREAD-SAFE ===
+        if tipo == "JOGADA":
+            # Oponente fez jogada
+            _, linha, coluna = dados
+            self.root.after(0, lambda l=linha, c=coluna: self.callback_jogada_recebida(l, c))
+            
+        elif tipo == "FIM_DE_JOGO":
+            # Oponente venceu
+            vencedor = dados[1]
+            self.root.after(0, lambda v=vencedor: self.callback_fim_jogo_recebido(v))
+            
+        elif tipo == "EMPATE":
+            # Empate declarado pelo oponente
+            self.root.after(0, self.callback_empate_recebido)
+
+        elif tipo == "REINICIAR":
+            # Pedido de revanche do oponente (ou repassado pelo servidor)
+            numero = dados[1]
+            self.root.after(0, lambda n=numero: self.callback_reiniciar_recebido(n))
+
+        elif tipo == "INICIO":
+            # Servidor multi-partidas definiu nosso símbolo
+            simbolo = dados[1]
+            self.root.after(0, lambda s=simbolo: self.callback_inicio_recebido(s))
+
+        elif tipo == "VARIANTE":
+            # Host ou servidor definiu a variante (chega antes da 1ª jogada)
+            variante = dados[1]
+            self.root.after(0, lambda v=variante: self.callback_variante_recebida(v))
+
+        elif tipo == "FILA":
+            # Pedido de pareamento de um cliente: só servidores tratam
+            pass
+
+        elif tipo == "PROTOCOLO":
+            # Oponente aceita formato binário - próximos envios usam 4 bytes
+            # (flag simples, lida pela thread principal no próximo envio)
+            self.protocolo_binario = protocolo_app.suporta_versao(dados[1])
+            
+        else:
+            # Mensagem não reconhecida
+            self.root.after(0, lambda m=msg: self.callback_mensagem_desconhecida(m))
+        
+        return True
+    
     # =====================================================================
     # CALLBACKS THREAD-SAFE PARA MODO ONLINE
     # =====================================================================
@@ -701,9 +1054,13 @@ class JogoDaVelhaGUI:
         jogador_remoto = 'O' if self.jogador_local == 'X' else 'X'
         
         # === EXECUÇÃO DA JOGADA DO OPONENTE ===
-        if realizar_jogada(self.tabuleiro, linha, coluna, jogador_remoto):
-            # Jogada válida - atualiza interface
+        if self.motor.realizar_jogada(self.tabuleiro, linha, coluna, jogador_remoto):
+            # Jogada válida - dica pendente ficou obsoleta; atualiza interface
+            self.cancelar_calculos_ia()
             self.atualizar_botao_tabuleiro(linha, coluna, jogador_remoto)
+            self.atualizar_destaques()
+            # Resposta especulada enquanto o oponente pensava (dica instantânea)
+            self.dica_pronta = self.resposta_especulada()
             
             # === VERIFICAÇÃO DE FIM DE JOGO ===
             # Nota: Oponente já verificou e enviará mensagem de fim se necessário
@@ -718,6 +1075,34 @@ class JogoDaVelhaGUI:
             # Jogada inválida recebida (erro de protocolo)
             messagebox.showerror("Erro", "Jogada inválida recebida do oponente!")
     
+    def callback_inicio_recebido(self, simbolo):
+        """
+        Callback para mensagem INICIO do servidor multi-partidas.
+
+        Ao conectar em um servidor_async todos os clientes entram como 'O';
+        o servidor informa quem deve jogar com 'X' quando forma o par.
+
+        Args:
+            simbolo: Símbolo atribuído pelo servidor ('X' ou 'O')
+        """
+        self.jogador_local = simbolo
+        self.minha_vez = (simbolo == 'X')
+        # Tabuleiro ainda vazio - recria interface para atualizar título e turno
+        self.criar_interface_jogo()
+
+    def callback_variante_recebida(self, variante):
+        """
+        Callback para mensagem VARIANTE do host ou do servidor.
+        
+        Troca o motor de regras e recria a interface com o tabuleiro vazio.
+        
+        Args:
+            variante: Nome da variante (protocolo.VARIANTES)
+        """
+        self.definir_variante(variante)
+        self.tabuleiro = self.motor.criar_tabuleiro()
+        self.criar_interface_jogo()
+
     def callback_fim_jogo_recebido(self, vencedor):
         """
         Callback para mensagem de fim de jogo recebida.
@@ -725,28 +1110,47 @@ class JogoDaVelhaGUI:
         Args:
             vencedor: Símbolo do jogador vencedor
         """
-        self.conexao_ativa = False
-        if vencedor == self.jogador_local:
-            messagebox.showinfo("Fim de Jogo", "Você venceu!")
-        else:
-            messagebox.showinfo("Fim de Jogo", "Você perdeu!")
-        
-        # Desabilita tabuleiro
+        if self.sessao is not None and not self.sessao.em_andamento:
+            return  # Resultado já contado (servidor confirmando nossa jogada final)
+        # Desabilita tabuleiro antes do popup (a conexão continua aberta)
         self.desabilitar_tabuleiro()
+        messagebox.showinfo("Fim de Jogo", self.registrar_fim_online(vencedor))
     
     def callback_empate_recebido(self):
         """
         Callback para mensagem de empate recebida.
         """
-        self.conexao_ativa = False
-        messagebox.showinfo("Fim de Jogo", "Empate!")
+        if self.sessao is not None and not self.sessao.em_andamento:
+            return  # Resultado já contado (servidor confirmando nossa jogada final)
         self.desabilitar_tabuleiro()
+        messagebox.showinfo("Fim de Jogo", self.registrar_fim_online(None))
+    
+    def callback_reiniciar_recebido(self, numero):
+        """
+        Callback para pedido de revanche (REINICIAR|numero) do oponente.
+        
+        Se já tínhamos pedido a mesma partida, ela começa agora; senão o
+        pedido fica registrado até o jogador clicar em Reiniciar.
+        
+        Args:
+            numero: Número da partida pedida na sessão
+        """
+        if self.sessao is None:
+            return
+        if self.sessao.pedir('remoto', numero):
+            self.iniciar_revanche()
+        elif self.sessao.aguardando('remoto'):
+            self.label_jogador.config(text="Oponente pediu revanche - clique em Reiniciar")
     
     def callback_erro_comunicacao(self):
         """
         Callback para erro de comunicação.
         """
         self.conexao_ativa = False
+        if self.sessao is not None and not self.sessao.em_andamento:
+            # Entre partidas o oponente apenas encerrou a sessão
+            self.label_jogador.config(text="O oponente saiu da sessão")
+            return
         messagebox.showerror("Erro", "Erro na comunicação com oponente!")
     
     def callback_mensagem_desconhecida(self, msg):
@@ -790,12 +1194,38 @@ class JogoDaVelhaGUI:
             state="disabled"  # Previne cliques duplos
         )
     
+    def cor_casa(self, linha, coluna):
+        """
+        Cor de fundo de uma casa sem dica.
+        
+        Na Ultimate, subtabuleiros vencidos ficam com a cor do vencedor e os
+        subtabuleiros onde a próxima jogada é permitida ficam destacados.
+        """
+        if not self.ultimate():
+            return "white"
+        sub = (linha // 3) * 3 + coluna // 3
+        dono = self.tabuleiro.dono_subtabuleiro(sub)
+        if dono is not None:
+            return "mistyrose" if dono == "X" else "lightblue"
+        if self.tabuleiro.subtabuleiros_livres() >> sub & 1:
+            return "lightcyan"
+        return "white"
+    
+    def atualizar_destaques(self):
+        """Recolore as casas da Ultimate após cada jogada (nada no clássico)."""
+        if not self.ultimate():
+            return
+        for i, linha in enumerate(self.botoes_tabuleiro):
+            for j, btn in enumerate(linha):
+                btn.config(bg=self.cor_casa(i, j))
+    
     def desabilitar_tabuleiro(self):
         """
         Desabilita todos os botões do tabuleiro.
         
         Usado quando jogo termina para prevenir jogadas adicionais.
         """
+        self.relatar_especulacao()
         for linha in self.botoes_tabuleiro:
             for btn in linha:
                 btn.config(state="disabled")
@@ -820,13 +1250,17 @@ class JogoDaVelhaGUI:
             # Envia mensagem de fim para oponente
             enviar(self.sock, self.criar_msg_fim(vencedor), 
                   self.protocolo_var.get(), self.endereco_remoto)
-            self.conexao_ativa = False
             
-            # Determina mensagem baseada em quem venceu
-            if vencedor == self.jogador_local:
-                messagebox.showinfo("Fim de Jogo", "Você venceu!")
+            # Conexão segue aberta para a revanche; mostra resultado e placar
+            self.desabilitar_tabuleiro()
+            messagebox.showinfo("Fim de Jogo", self.registrar_fim_online(vencedor))
+            return
+        elif self.modo_jogo == "computador":
+            # === MODO CONTRA O COMPUTADOR ===
+            if vencedor == self.simbolo_computador:
+                messagebox.showinfo("Fim de Jogo", "O computador venceu!")
             else:
-                messagebox.showinfo("Fim de Jogo", "Você perdeu!")
+                messagebox.showinfo("Fim de Jogo", "Você venceu!")
         else:
             # === MODO OFFLINE ===
             messagebox.showinfo("Fim de Jogo", f"Jogador {vencedor} venceu!")
@@ -846,11 +1280,43 @@ class JogoDaVelhaGUI:
             # Envia mensagem de empate para oponente
             enviar(self.sock, self.criar_msg_empate(), 
                   self.protocolo_var.get(), self.endereco_remoto)
-            self.conexao_ativa = False
+            texto = self.registrar_fim_online(None)
+        else:
+            texto = "Empate!"
         
         # === EXIBIÇÃO DO RESULTADO ===
-        messagebox.showinfo("Fim de Jogo", "Empate!")
         self.desabilitar_tabuleiro()
+        messagebox.showinfo("Fim de Jogo", texto)
+    
+    def registrar_fim_online(self, vencedor):
+        """
+        Conta o resultado na sessão e monta o texto do fim de partida online.
+        
+        Args:
+            vencedor: Símbolo do vencedor ou None para empate
+        
+        Returns:
+            str: Resultado, placar da série e convite para a revanche
+        """
+        if vencedor is None:
+            lado, texto = None, "Empate!"
+        elif vencedor == self.jogador_local:
+            lado, texto = 'local', "Você venceu!"
+        else:
+            lado, texto = 'remoto', "Você perdeu!"
+        
+        if self.sessao is None:
+            return texto
+        if self.sessao.registrar_resultado(lado):
+            campeao = self.sessao.campeao()
+            if campeao == 'local':
+                texto += "\nVocê venceu a série!"
+            elif campeao == 'remoto':
+                texto += "\nO oponente venceu a série!"
+            else:
+                texto += "\nSérie empatada!"
+        return (f"{texto}\n{self.sessao.placar('local', 'remoto')}\n"
+                "Clique em Reiniciar para a revanche.")
     
     # =====================================================================
     # MÉTODOS DE CONTROLE DE ESTADO DO JOGO
@@ -863,10 +1329,16 @@ class JogoDaVelhaGUI:
         Ações:
         - Limpa tabuleiro
         - Reseta jogador atual para 'X'
+        - Descarta jogadas/dicas da IA ainda em cálculo
         - Mantém configurações de rede (modo online)
         """
-        # Usa função original para criar tabuleiro limpo
-        self.tabuleiro = criar_tabuleiro()
+        self.trabalhador_ia.cancelar()
+        self.dica_atual = None  # Interface será recriada
+        self.dica_pronta = None
+        self.especulador.limpar()
+        
+        # Usa o motor da variante para criar tabuleiro limpo
+        self.tabuleiro = self.motor.criar_tabuleiro()
         self.jogador_atual = "X"
         
         # Para modo online, reseta estado de turno
@@ -879,23 +1351,55 @@ class JogoDaVelhaGUI:
         Reinicia jogo atual mantendo mesmo modo.
         
         Para modo online:
-        - Apenas reseta tabuleiro local (não coordena com oponente)
-        - Funcionalidade limitada - idealmente requereria protocolo de reinício
+        - Pede a revanche ao oponente (pedir_revanche), na mesma conexão
         """
         if self.modo_jogo == "online":
-            # Aviso sobre limitação no modo online
-            resposta = messagebox.askyesno(
-                "Reiniciar Jogo Online",
-                "Reiniciar em modo online apenas limpa seu tabuleiro.\n"
-                "O oponente não será notificado.\n"
-                "Deseja continuar?"
-            )
-            if not resposta:
-                return
+            self.pedir_revanche()
+            return
         
         # Reseta e recria interface
         self.resetar_jogo()
         self.criar_interface_jogo()
+        self.preparar_especulacao()
+    
+    def pedir_revanche(self):
+        """
+        Envia REINICIAR|n ao oponente (ou ao servidor) pela conexão atual.
+        
+        Só vale depois do fim da partida. A próxima partida começa quando o
+        oponente também pedir: os dois tabuleiros são limpos no mesmo ponto
+        da conversa e os símbolos se invertem (quem começa alterna).
+        """
+        if not self.conexao_ativa or self.sessao is None:
+            messagebox.showerror("Erro", "Conexão perdida!")
+            return
+        if self.sessao.em_andamento:
+            messagebox.showinfo("Reiniciar Jogo Online",
+                                "A revanche pode ser pedida ao fim da partida.")
+            return
+        if self.sessao.aguardando('local'):
+            return  # Pedido já enviado
+        
+        numero = self.sessao.proxima()
+        if not enviar(self.sock, protocolo_app.criar_msg_reiniciar(numero),
+                      self.protocolo_var.get(), self.endereco_remoto):
+            messagebox.showerror("Erro", "Falha ao enviar pedido de revanche!")
+            return
+        if self.sessao.pedir('local', numero):
+            self.iniciar_revanche()
+        else:
+            self.label_jogador.config(text="Aguardando o oponente aceitar a revanche...")
+    
+    def iniciar_revanche(self):
+        """
+        Começa a próxima partida da sessão: símbolos invertidos, tabuleiro limpo.
+        
+        No servidor_async o INICIO que chega em seguida confirma o símbolo.
+        """
+        self.jogador_local = trocar_simbolo(self.jogador_local)
+        self.resetar_jogo()
+        self.criar_interface_jogo()
+        self.preparar_especulacao()
     
     def voltar_menu_anterior(self):
         """
@@ -903,10 +1407,14 @@ class JogoDaVelhaGUI:
         
         Para modo online, encerra conexão antes de voltar.
         """
+        # Jogada do computador pendente não deve chegar depois da troca de tela
+        self.trabalhador_ia.cancelar()
+        
         # === LIMPEZA PARA MODO ONLINE ===
         if self.modo_jogo == "online":
-            # Encerra conexão de forma segura
+            # Encerra conexão (e a sessão) de forma segura
             self.conexao_ativa = False
+            self.sessao = None
             if self.sock:
                 try:
                     encerrar(self.sock)  # Usa função original
@@ -934,6 +1442,8 @@ class JogoDaVelhaGUI:
             except:
                 pass  # Ignora erros durante encerramento
         
+        self.trabalhador_ia.encerrar()
+        
         # === ENCERRAMENTO DA APLICAÇÃO ===
         self.root.quit()
         self.root.destroy()
@@ -0,0 +1,319 @@
+# === mcts.py ===
+# IA por Busca em Árvore Monte Carlo (MCTS com seleção UCT)
+# O solver perfeito (solver.py) resolve o 3x3, mas não escala para variantes
+# maiores de jogo_nk (ex.: 7x7 com 4 em linha, Gomoku). O MCTS só precisa das
+# regras: seleciona jogadas pela fórmula UCT, expande um nó, termina a partida
+# com jogadas aleatórias (playout) e propaga o resultado até a raiz.
+#
+# Paralelismo na raiz: cada processo de um ProcessPoolExecutor constrói a sua
+# própria árvore a partir da mesma posição, com sementes diferentes, até o
+# prazo. No fim as visitas de cada jogada da raiz são somadas e vence a mais
+# visitada. Não há estado compartilhado entre processos durante a busca.
+#
+# Toda busca tem prazo (tempo_limite em segundos): a jogada do bot volta
+# dentro do tempo configurado independentemente do tamanho do tabuleiro.
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from jogo_nk import VAZIO, TabuleiroNK, de_lista
+
+# === PARÂMETROS ===
+EXPLORACAO_PADRAO = math.sqrt(2)  # Constante C da fórmula UCT
+TEMPO_LIMITE_PADRAO = 1.0
+# Reserva do prazo para enviar resultados entre processos e somar as árvores
+MARGEM_PARALELA = 0.05
+
+# Pontuação de um playout para quem fez a jogada do nó
+PONTOS_VITORIA = 1.0
+PONTOS_EMPATE = 0.5
+
+
+class No:
+    """
+    Nó da árvore de busca.
+
+    Atributos:
+        jogada: Índice da casa jogada para chegar aqui (None na raiz)
+        jogador: Quem fez essa jogada ('X' ou 'O')
+        pai: Nó pai (None na raiz)
+        filhos: Nós já expandidos
+        nao_expandidas: Casas ainda não experimentadas a partir deste nó
+        visitas: Playouts que passaram por este nó
+        pontos: Soma das pontuações do ponto de vista de `jogador`
+    """
+
+    __slots__ = ('jogada', 'jogador', 'pai', 'filhos', 'nao_expandidas', 'visitas', 'pontos')
+
+    def __init__(self, jogada, jogador, pai, nao_expandidas):
+        self.jogada = jogada
+        self.jogador = jogador
+        self.pai = pai
+        self.filhos = []
+        self.nao_expandidas = nao_expandidas
+        self.visitas = 0
+        self.pontos = 0.0
+
+    def selecionar_filho(self, exploracao):
+        """Filho com maior valor UCT: média + C * sqrt(ln(N) / n)."""
+        log_visitas = math.log(self.visitas)
+        return max(
+            self.filhos,
+            key=lambda filho: filho.pontos / filho.visitas
+            + exploracao * math.sqrt(log_visitas / filho.visitas),
+        )
+
+
+class ResultadoBusca:
+    """
+    Resultado de uma busca MCTS (simples ou paralela).
+
+    Atributos:
+        jogada: (linha, coluna) escolhida, ou None se não há jogadas
+        visitas: {(linha, coluna): visitas} dos filhos da raiz
+        playouts: Total de playouts realizados
+        nos: Tamanho da(s) árvore(s) em nós
+        segundos: Duração da busca
+    """
+
+    def __init__(self, jogada, visitas, playouts, nos, segundos):
+        self.jogada = jogada
+        self.visitas = visitas
+        self.playouts = playouts
+        self.nos = nos
+        self.segundos = segundos
+
+    @property
+    def playouts_por_segundo(self):
+        return self.playouts / self.segundos if self.segundos else 0.0
+
+    def __repr__(self):
+        return (f"ResultadoBusca(jogada={self.jogada}, playouts={self.playouts}, "
+                f"nos={self.nos}, {self.playouts_por_segundo:,.0f} playouts/s)")
+
+
+def _casas_livres(tabuleiro):
+    return [i for i, simbolo in enumerate(tabuleiro.casas) if simbolo == VAZIO]
+
+
+# =====================================================================
+# BUSCA EM UM PROCESSO
+# =====================================================================
+
+class MCTS:
+    """
+    Busca UCT com prazo em um único processo.
+
+    Atributos:
+        exploracao: Constante C da fórmula UCT
+        rng: Gerador aleatório dos playouts
+    """
+
+    def __init__(self, exploracao=EXPLORACAO_PADRAO, semente=None):
+        self.exploracao = exploracao
+        self.rng = random.Random(semente)
+
+    def _playout(self, tabuleiro):
+        """Termina a partida com jogadas aleatórias; retorna o vencedor ou None."""
+        livres = _casas_livres(tabuleiro)
+        self.rng.shuffle(livres)
+        largura = tabuleiro.largura
+        for indice in livres:
+            if tabuleiro.vencedor is not None:
+                break
+            linha, coluna = divmod(indice, largura)
+            tabuleiro.realizar_jogada(linha, coluna, tabuleiro.proximo_jogador())
+        return tabuleiro.vencedor
+
+    def construir_arvore(self, tabuleiro, tempo_limite=TEMPO_LIMITE_PADRAO, max_playouts=None):
+        """
+        Executa iterações de MCTS até o prazo (ou até `max_playouts`).
+
+        Args:
+            tabuleiro (TabuleiroNK): Posição da raiz (não é modificada)
+            tempo_limite (float): Segundos disponíveis
+            max_playouts (int): Limite opcional de iterações
+
+        Returns:
+            tuple: (raiz, playouts, nos)
+        """
+        prazo = time.perf_counter() + tempo_limite
+        jogador_raiz = tabuleiro.proximo_jogador()
+        oponente_raiz = 'O' if jogador_raiz == 'X' else 'X'
+        raiz = No(None, oponente_raiz, None, _casas_livres(tabuleiro))
+        if tabuleiro.terminou():
+            return raiz, 0, 1
+
+        rng = self.rng
+        exploracao = self.exploracao
+        largura = tabuleiro.largura
+        playouts = 0
+        nos = 1
+        while playouts != max_playouts:
+            # Checar o relógio a cada 16 iterações custa pouco e respeita o prazo
+            if playouts & 15 == 0 and time.perf_counter() >= prazo:
+                break
+
+            # 1. Seleção: desce pelos nós totalmente expandidos
+            no = raiz
+            atual = tabuleiro.copiar()
+            while not no.nao_expandidas and no.filhos:
+                no = no.selecionar_filho(exploracao)
+                atual.realizar_jogada(*divmod(no.jogada, largura), no.jogador)
+
+            # 2. Expansão: experimenta uma jogada nova (se a partida não acabou)
+            if no.nao_expandidas and atual.vencedor is None:
+                nao_expandidas = no.nao_expandidas
+                escolha = rng.randrange(len(nao_expandidas))
+                nao_expandidas[escolha], nao_expandidas[-1] = nao_expandidas[-1], nao_expandidas[escolha]
+                casa = nao_expandidas.pop()
+                jogador = atual.proximo_jogador()
+                atual.realizar_jogada(*divmod(casa, largura), jogador)
+                filho = No(casa, jogador, no,
+                           [] if atual.vencedor is not None else _casas_livres(atual))
+                no.filhos.append(filho)
+                no = filho
+                nos += 1
+
+            # 3. Playout aleatório até o fim
+            vencedor = self._playout(atual)
+            playouts += 1
+
+            # 4. Retropropagação: cada nó pontua do ponto de vista de quem jogou
+            while no is not None:
+                no.visitas += 1
+                if vencedor is None:
+                    no.pontos += PONTOS_EMPATE
+                elif vencedor == no.jogador:
+                    no.pontos += PONTOS_VITORIA
+                no = no.pai
+        return raiz, playouts, nos
+
+    def buscar(self, tabuleiro, tempo_limite=TEMPO_LIMITE_PADRAO, max_playouts=None):
+        """
+        Escolhe uma jogada para quem está na vez.
+
+        Args:
+            tabuleiro: TabuleiroNK ou tabuleiro 3x3 de jogo.py
+            tempo_limite (float): Segundos disponíveis
+            max_playouts (int): Limite opcional de iterações
+
+        Returns:
+            ResultadoBusca: Jogada mais visitada e estatísticas
+        """
+        inicio = time.perf_counter()
+        tabuleiro = de_lista(tabuleiro)
+        raiz, playouts, nos = self.construir_arvore(tabuleiro, tempo_limite, max_playouts)
+        visitas = _visitas_da_raiz(raiz, tabuleiro.largura)
+        return ResultadoBusca(_mais_visitada(visitas), visitas, playouts, nos,
+                              time.perf_counter() - inicio)
+
+
+def _visitas_da_raiz(raiz, largura):
+    return {divmod(filho.jogada, largura): filho.visitas for filho in raiz.filhos}
+
+
+def _mais_visitada(visitas):
+    if not visitas:
+        return None
+    return max(visitas, key=visitas.get)
+
+
+# =====================================================================
+# BUSCA PARALELA NA RAIZ (PROCESS POOL)
+# =====================================================================
+
+def _buscar_no_processo(tabuleiro, tempo_limite, semente, exploracao):
+    """Executado em cada processo do pool: árvore independente até o prazo."""
+    busca = MCTS(exploracao, semente)
+    raiz, playouts, nos = busca.construir_arvore(tabuleiro, tempo_limite)
+    return _visitas_da_raiz(raiz, tabuleiro.largura), playouts, nos
+
+
+def buscar_paralelo(tabuleiro, tempo_limite=TEMPO_LIMITE_PADRAO, processos=None,
+                    executor=None, exploracao=EXPLORACAO_PADRAO):
+    """
+    MCTS paralelo na raiz: uma árvore por processo, visitas somadas no fim.
+
+    Criar processos custa dezenas de milissegundos; bots que jogam várias
+    vezes devem criar um ProcessPoolExecutor e reaproveitá-lo em `executor`.
+
+    Args:
+        tabuleiro: TabuleiroNK ou tabuleiro 3x3 de jogo.py
+        tempo_limite (float): Prazo total da jogada em segundos
+        processos (int): Árvores paralelas (padrão: núcleos disponíveis)
+        executor (ProcessPoolExecutor): Pool já existente (opcional)
+        exploracao (float): Constante C da fórmula UCT
+
+    Returns:
+        ResultadoBusca: Jogada com mais visitas somadas e estatísticas totais
+    """
+    inicio = time.perf_counter()
+    tabuleiro = de_lista(tabuleiro)
+    if processos is None:
+        processos = getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+    tempo_busca = max(0.0, tempo_limite - MARGEM_PARALELA)
+
+    proprio = executor is None
+    if proprio:
+        executor = ProcessPoolExecutor(processos)
+    try:
+        futuros = [
+            executor.submit(_buscar_no_processo, tabuleiro, tempo_busca,
+                            random.randrange(1 << 32), exploracao)
+            for _ in range(processos)
+        ]
+        # Árvores que não voltaram até o prazo ficam de fora da soma
+        restante = inicio + tempo_limite - time.perf_counter()
+        prontos, atrasados = wait(futuros, timeout=max(0.0, restante))
+        for futuro in atrasados:
+            futuro.cancel()
+    finally:
+        if proprio:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    visitas = {}
+    playouts = nos = 0
+    for futuro in prontos:
+        visitas_processo, playouts_processo, nos_processo = futuro.result()
+        for jogada, quantidade in visitas_processo.items():
+            visitas[jogada] = visitas.get(jogada, 0) + quantidade
+        playouts += playouts_processo
+        nos += nos_processo
+
+    if not visitas and not tabuleiro.terminou():
+        # Nenhum processo respondeu a tempo: joga algo válido mesmo assim
+        visitas = {jogada: 0 for jogada in tabuleiro.jogadas_validas()}
+    return ResultadoBusca(_mais_visitada(visitas), visitas, playouts, nos,
+                          time.perf_counter() - inicio)
+
+
+def melhor_jogada(tabuleiro, tempo_limite=TEMPO_LIMITE_PADRAO, processos=1):
+    """
+    Jogada do bot MCTS dentro do prazo.
+
+    Returns:
+        tuple: (linha, coluna) ou None se a partida já terminou
+    """
+    if processos == 1:
+        return MCTS().buscar(tabuleiro, tempo_limite).jogada
+    return buscar_paralelo(tabuleiro, tempo_limite, processos).jogada
+
+
+if __name__ == '__main__':
+    # Estatísticas de uma busca em 3x3 e em uma variante maior
+    import sys
+
+    processos = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    with ProcessPoolExecutor(processos) as pool:
+        for largura, altura, k in ((3, 3, 3), (7, 7, 4), (15, 15, 5)):
+            tabuleiro = TabuleiroNK(largura, altura, k)
+            tabuleiro.realizar_jogada(altura // 2, largura // 2, 'X')
+            simples = MCTS().buscar(tabuleiro, 1.0)
+            paralelo = buscar_paralelo(tabuleiro, 1.0, executor=pool)
+            print(f"{largura}x{altura} K={k}")
+            print(f"  1 processo:   {simples}")
+            print(f"  {processos} processos: {paralelo} em {paralelo.segundos:.2f} s")
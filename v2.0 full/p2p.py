@@ -4,6 +4,23 @@
 # de rede entre dois peers (jogadores) usando diferentes protocolos de transporte
 
 import socket
+import struct
+import time
+import weakref
+from collections import deque
+
+from udp_confiavel import TransporteConfiavel, RTO_INICIAL, RTO_MAXIMO
+from protocolo import eh_binaria
+
+# === FRAMING TCP ===
+# TCP é um fluxo de bytes: um recv() pode trazer meia mensagem ou várias
+# mensagens grudadas (algoritmo de Nagle, leituras curtas). Cada mensagem TCP
+# é enviada como um frame: 2 bytes de tamanho (big-endian) + conteúdo.
+CABECALHO_FRAME = struct.Struct('!H')
+TAMANHO_MAXIMO_FRAME = 0xFFFF
+
+# Tamanho inicial do buffer de recepção de cada socket (cresce se necessário)
+TAMANHO_BUFFER_INICIAL = 4096
 
 def criar_socket(ip, protocolo):
     """
@@ -158,18 +175,38 @@ def conectar_cliente(protocolo, ip, porta):
             # Como UDP não tem conexão, implementamos handshake manual
             
             # 1. Envia pacote inicial para servidor saber nosso endereço
-            s.sendto("CONEXAO_UDP".encode(), endereco_servidor)
-            print("Pacote inicial UDP enviado, aguardando confirmação...")
-            
-            # 2. Aguarda confirmação do servidor (timeout de 10 segundos)
-            s.settimeout(10.0)
-            data, addr = s.recvfrom(1024)
+            # 2. Aguarda confirmação (até 10 segundos no total), reenviando o
+            #    pacote inicial com backoff caso ele ou a resposta se percam
+            limite = time.monotonic() + 10.0
+            espera = RTO_INICIAL
+            tentativas = 0
+            while True:
+                enviado_em = time.monotonic()
+                s.sendto("CONEXAO_UDP".encode(), endereco_servidor)
+                tentativas += 1
+                print("Pacote inicial UDP enviado, aguardando confirmação...")
+                
+                restante = limite - enviado_em
+                if restante <= 0:
+                    raise socket.timeout("timed out")
+                s.settimeout(min(espera, restante))
+                try:
+                    data, addr = s.recvfrom(1024)
+                    break
+                except socket.timeout:
+                    espera = min(RTO_MAXIMO, espera * 2)
             
             # 3. Verifica se recebeu confirmação esperada
             if data.decode() == "CONEXAO_CONFIRMADA":
                 print(f"Conexão UDP confirmada com {addr}")
                 # Remove timeout para comunicação normal
                 s.settimeout(None)
+                # Usa o endereço de onde a resposta veio (nome já resolvido)
+                endereco_servidor = addr
+                if tentativas == 1:
+                    # Handshake sem retransmissão: primeira amostra de RTT
+                    rtt = time.monotonic() - enviado_em
+                    _transporte_do_socket(s).canal(endereco_servidor).rtt.registrar_amostra(rtt)
             else:
                 print(f"Resposta inesperada do servidor: {data.decode()}")
                 
@@ -185,13 +222,141 @@ def conectar_cliente(protocolo, ip, porta):
         # Retorna socket e endereço do servidor para comunicação futura
         return s, endereco_servidor
 
+def codificar_frame(dados):
+    """
+    Monta um frame TCP: prefixo de 2 bytes com o tamanho + conteúdo.
+
+    Args:
+        dados (bytes): Conteúdo da mensagem já codificado
+
+    Returns:
+        bytes: Frame pronto para sendall()
+
+    Raises:
+        ValueError: Se a mensagem não couber no prefixo de 16 bits
+    """
+    if len(dados) > TAMANHO_MAXIMO_FRAME:
+        raise ValueError(f"Mensagem grande demais para um frame ({len(dados)} bytes)")
+    return CABECALHO_FRAME.pack(len(dados)) + dados
+
+class BufferFrames:
+    """
+    Decodificador de frames TCP com buffer de recepção reutilizável.
+
+    Os bytes recebidos são acumulados em um único bytearray (sem criar um
+    objeto bytes por recv) e todos os frames completos são extraídos de uma
+    vez. Bytes de um frame incompleto permanecem no buffer até a próxima leitura.
+
+    Atributos:
+        buffer: bytearray reutilizado entre leituras
+        inicio: Posição do primeiro byte ainda não consumido
+        fim: Posição após o último byte recebido
+        pendentes: Mensagens já extraídas e ainda não entregues por receber()
+    """
+
+    def __init__(self, capacidade=TAMANHO_BUFFER_INICIAL):
+        self.buffer = bytearray(capacidade)
+        self.inicio = 0
+        self.fim = 0
+        self.pendentes = deque()
+
+    def _reservar_espaco(self, quantidade=1):
+        """Garante espaço livre no fim do buffer (compacta ou aumenta)."""
+        if len(self.buffer) - self.fim >= quantidade:
+            return
+        restante = self.fim - self.inicio
+        if self.inicio > 0:
+            # Move os bytes não consumidos para o começo (mesmo tamanho, sem realocar)
+            self.buffer[:restante] = self.buffer[self.inicio:self.fim]
+            self.inicio, self.fim = 0, restante
+        if len(self.buffer) - self.fim < quantidade:
+            # Frame maior que o buffer atual - dobra a capacidade
+            nova = max(len(self.buffer) * 2, self.fim + quantidade)
+            self.buffer.extend(bytes(nova - len(self.buffer)))
+
+    def receber_de(self, sock):
+        """
+        Faz UMA chamada recv_into no socket e extrai os frames completos.
+
+        Args:
+            sock (socket): Socket TCP conectado
+
+        Returns:
+            list: Mensagens (bytes) completas recebidas (pode ser vazia),
+                  ou None se a conexão foi fechada pelo peer
+        """
+        self._reservar_espaco()
+        n = sock.recv_into(memoryview(self.buffer)[self.fim:])
+        if n == 0:
+            return None
+        self.fim += n
+        return self.extrair()
+
+    def alimentar(self, dados):
+        """
+        Acrescenta bytes já lidos (ex.: asyncio) e extrai os frames completos.
+
+        Args:
+            dados (bytes): Bytes recebidos do fluxo
+
+        Returns:
+            list: Mensagens (bytes) completas
+        """
+        self._reservar_espaco(len(dados))
+        self.buffer[self.fim:self.fim + len(dados)] = dados
+        self.fim += len(dados)
+        return self.extrair()
+
+    def extrair(self):
+        """Extrai todos os frames completos presentes no buffer."""
+        mensagens = []
+        tamanho_cabecalho = CABECALHO_FRAME.size
+        while self.fim - self.inicio >= tamanho_cabecalho:
+            (tamanho,) = CABECALHO_FRAME.unpack_from(self.buffer, self.inicio)
+            comeco = self.inicio + tamanho_cabecalho
+            if self.fim - comeco < tamanho:
+                # Frame incompleto - garante espaço para ele chegar inteiro
+                self._reservar_espaco(comeco + tamanho - self.fim)
+                break
+            mensagens.append(bytes(self.buffer[comeco:comeco + tamanho]))
+            self.inicio = comeco + tamanho
+
+        # Buffer totalmente consumido - volta ao início sem copiar nada
+        if self.inicio == self.fim:
+            self.inicio = self.fim = 0
+        return mensagens
+
+# Um BufferFrames por socket TCP (liberado junto com o socket)
+_buffers_tcp = weakref.WeakKeyDictionary()
+
+def _buffer_do_socket(sock):
+    """Retorna (criando se necessário) o BufferFrames associado ao socket."""
+    buffer = _buffers_tcp.get(sock)
+    if buffer is None:
+        buffer = _buffers_tcp[sock] = BufferFrames()
+    return buffer
+
+# Um TransporteConfiavel por socket UDP (sequências, ACKs e retransmissões)
+_transportes_udp = weakref.WeakKeyDictionary()
+
+def _transporte_do_socket(sock):
+    """Retorna (criando se necessário) o TransporteConfiavel associado ao socket."""
+    transporte = _transportes_udp.get(sock)
+    if transporte is None:
+        transporte = _transportes_udp[sock] = TransporteConfiavel(sock)
+    return transporte
+
+def _decodificar_conteudo(dados):
+    """Converte o conteúdo recebido em str, exceto mensagens binárias (ficam em bytes)."""
+    return dados if eh_binaria(dados) else dados.decode()
+
 def enviar(sock, msg, protocolo, endereco=None):
     """
     Envia uma mensagem através do socket usando o protocolo especificado.
     
     Args:
         sock (socket): Socket para envio
-        msg (str): Mensagem a ser enviada
+        msg (str ou bytes): Mensagem a ser enviada (bytes = formato binário)
         protocolo (str): 'TCP' ou 'UDP'
         endereco (tuple, optional): Endereço destino (obrigatório para UDP)
     
@@ -199,21 +364,26 @@ def enviar(sock, msg, protocolo, endereco=None):
         bool: True se envio foi bem-sucedido, False em caso de erro
     
     Diferenças por protocolo:
-        TCP: Usa send() - endereço já conhecido pela conexão
-        UDP: Usa sendto() - precisa especificar endereço a cada envio
+        TCP: Usa sendall() com frame de tamanho - nunca envia mensagem pela metade
+        UDP: Usa sendto() com entrega confiável (sequência + ACK + retransmissão)
     """
     try:
+        # Mensagens binárias (protocolo.py) já estão em bytes
+        dados = msg if isinstance(msg, bytes) else msg.encode()
+        
         if protocolo == 'TCP':
-            # TCP: Send simples (conexão já estabelecida conhece o destino)
-            # Codifica string para bytes antes do envio
-            sock.send(msg.encode())
+            # TCP: frame com prefixo de tamanho para o receptor separar mensagens
+            # sendall() repete o envio até todos os bytes saírem (send() pode
+            # enviar só parte do buffer)
+            sock.sendall(codificar_frame(dados))
         else:
             # UDP: SendTo com endereço específico (necessário a cada envio)
             if endereco is None:
                 print("ERRO: Endereço necessário para UDP")
                 return False
-            # Envia para endereço específico codificando mensagem para bytes
-            sock.sendto(msg.encode(), endereco)
+            # Envia com número de sequência; sem ACK, a mensagem é retransmitida
+            # pela thread que estiver em receber() (ver udp_confiavel.py)
+            _transporte_do_socket(sock).enviar(dados, endereco)
             
         return True
         
@@ -221,6 +391,57 @@ def enviar(sock, msg, protocolo, endereco=None):
         print(f"Erro ao enviar mensagem: {e}")
         return False
 
+def receber_mensagens(sock, protocolo):
+    """
+    Recebe TODAS as mensagens disponíveis com uma única leitura do socket.
+    
+    Args:
+        sock (socket): Socket para recebimento
+        protocolo (str): 'TCP' ou 'UDP'
+    
+    Returns:
+        tuple: (lista_de_mensagens, endereco_remetente) ou (None, None) em caso de erro
+    
+    Diferenças por protocolo:
+        TCP: Um recv_into() no buffer do socket pode trazer vários frames;
+             todos os completos são devolvidos. Se a leitura trouxe só parte
+             de um frame, continua lendo até completar pelo menos uma mensagem.
+        UDP: Mensagens entregues em ordem e sem duplicatas pela camada confiável
+    
+    Timeout: 30 segundos para UDP, sem timeout para TCP
+    """
+    try:
+        if protocolo == 'TCP':
+            buffer = _buffer_do_socket(sock)
+            
+            # Mensagens que sobraram de uma leitura anterior feita por receber()
+            if buffer.pendentes:
+                mensagens = [_decodificar_conteudo(m) for m in buffer.pendentes]
+                buffer.pendentes.clear()
+                return mensagens, None
+            
+            while True:
+                dados = buffer.receber_de(sock)
+                
+                # Verifica se conexão foi fechada pelo peer
+                if dados is None:
+                    return None, None  # Conexão fechada
+                if dados:
+                    return [_decodificar_conteudo(m) for m in dados], None
+                # Frame incompleto - aguarda o restante
+            
+        else:
+            # UDP: todas as mensagens já liberadas em ordem pela camada confiável
+            mensagens, addr = _transporte_do_socket(sock).receber(30.0)
+            return [_decodificar_conteudo(m) for m in mensagens], addr
+            
+    except socket.timeout:
+        print("Timeout recebendo dados")
+        return None, None
+    except Exception as e:
+        print(f"Erro ao receber mensagem: {e}")
+        return None, None
+
 def receber(sock, protocolo):
     """
     Recebe uma mensagem através do socket usando o protocolo especificado.
@@ -231,36 +452,40 @@ def receber(sock, protocolo):
     
     Returns:
         tuple: (mensagem_decodificada, endereco_remetente) ou (None, None) em caso de erro
+               (mensagens no formato binário são devolvidas como bytes)
     
     Diferenças por protocolo:
-        TCP: Usa recv() - retorna apenas dados (endereço já conhecido)
+        TCP: Retorna um frame por chamada; frames extras recebidos na mesma
+             leitura ficam guardados para as próximas chamadas
         UDP: Usa recvfrom() - retorna dados E endereço do remetente
+             (mensagens confirmadas com ACK e retransmitidas se perdidas)
     
     Timeout: 30 segundos para UDP, sem timeout para TCP
     """
     try:
         if protocolo == 'TCP':
-            # TCP: Recebe dados da conexão estabelecida
-            data = sock.recv(1024)  # Buffer de 1024 bytes
+            buffer = _buffer_do_socket(sock)
             
-            # Verifica se conexão foi fechada pelo peer
-            if not data:
-                return None, None  # Conexão fechada
+            # Lê do socket apenas quando não há mensagens já extraídas
+            while not buffer.pendentes:
+                dados = buffer.receber_de(sock)
+                
+                # Verifica se conexão foi fechada pelo peer
+                if dados is None:
+                    return None, None  # Conexão fechada
+                buffer.pendentes.extend(dados)
                 
             # Decodifica bytes para string e retorna
-            return data.decode(), None
+            return _decodificar_conteudo(buffer.pendentes.popleft()), None
             
         else:
             # UDP: Recebe dados com informação do remetente
-            
-            # Timeout de 30 segundos para evitar travamento infinito
-            sock.settimeout(30.0)
-            
-            # RecvFrom retorna dados E endereço do remetente
-            data, addr = sock.recvfrom(1024)
+            # Enquanto espera (até 30 segundos), a camada confiável envia ACKs,
+            # descarta duplicatas e retransmite mensagens não confirmadas
+            mensagens, addr = _transporte_do_socket(sock).receber(30.0, todas=False)
             
             # Decodifica e retorna mensagem com endereço do remetente
-            return data.decode(), addr
+            return _decodificar_conteudo(mensagens[0]), addr
             
     except socket.timeout:
         print("Timeout recebendo dados")
@@ -287,6 +512,13 @@ def encerrar(sock):
     """
     try:
         if sock:  # Verifica se socket existe e não é None
+            try:
+                # Acorda a thread de recepção bloqueada em recv() (a sessão a
+                # mantém viva entre partidas) e envia o FIN ao peer; sem isso o
+                # close() não libera o socket enquanto o recv() estiver pendente
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # UDP ou socket já desconectado
             sock.close()  # Fecha socket e libera recursos
     except:
         # Ignora qualquer erro (socket pode já estar fechado)
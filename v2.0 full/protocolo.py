@@ -0,0 +1,252 @@
+# === protocolo.py ===
+# Protocolo de aplicação do jogo: formato texto original + formato binário compacto
+#
+# Formato texto (original, sempre aceito):
+#   "JOGADA|linha|coluna", "FIM_DE_JOGO|vencedor", "EMPATE", "INICIO|simbolo"
+#   "VARIANTE|nome" - enviada por quem define a partida (host P2P ou servidor)
+#   antes da primeira jogada quando a variante não é a clássica (VARIANTES)
+#   "FILA|variante|rating" - cliente pede ao servidor um adversário daquela
+#   variante e faixa de rating (rating opcional: "FILA|variante")
+#   "ASSISTIR|id_partida" - cliente pede para assistir a uma partida do
+#   servidor (id 0 = a mais recente); recebe "ESTADO|l,c;l,c;..." com as
+#   jogadas já feitas e depois cada jogada ao vivo
+#   "REINICIAR|n" - fim de partida: pede a revanche (partida n da sessão) sem
+#   reconectar; começa quando os dois lados pediram o mesmo n (sessao.py)
+#
+# Formato binário versão 1 (4 bytes fixos, sem passar por str):
+#   [opcode: 1 byte][argumento: 1 byte][id_partida: 2 bytes big-endian]
+#   JOGADA       -> argumento = índice da casa (linha * 3 + coluna, 0-8)
+#   JOGADA_9X9   -> argumento = linha * 9 + coluna (0-80), variante Ultimate;
+#                   jogadas com linha e coluna < 3 continuam usando JOGADA
+#   FIM_DE_JOGO  -> argumento = vencedor (0 = 'X', 1 = 'O')
+#   EMPATE       -> argumento = 0
+#   INICIO       -> argumento = símbolo atribuído (0 = 'X', 1 = 'O')
+#
+# Negociação: cada lado anuncia "PROTOCOLO|BIN|1" (em texto) logo após conectar.
+# Só depois de RECEBER o anúncio do peer um lado passa a enviar binário, então
+# um peer antigo nunca recebe mensagens binárias. A recepção detecta o formato
+# pelo primeiro byte: opcodes binários são < 0x20, texto começa com letra.
+
+import struct
+
+# === VERSÃO E OPCODES ===
+VERSAO_BINARIA = 1
+OP_JOGADA = 0x01
+OP_FIM_DE_JOGO = 0x02
+OP_EMPATE = 0x03
+OP_INICIO = 0x04
+OP_JOGADA_9X9 = 0x05
+
+# Variantes de jogo anunciadas com "VARIANTE|nome" (CLASSICO é o padrão)
+VARIANTE_CLASSICA = 'CLASSICO'
+VARIANTE_ULTIMATE = 'ULTIMATE'
+VARIANTES = (VARIANTE_CLASSICA, VARIANTE_ULTIMATE)
+
+FORMATO_BINARIO = struct.Struct('!BBH')
+SIMBOLOS = ('X', 'O')
+INDICE_SIMBOLO = {'X': 0, 'O': 1}
+
+# Tuplas de retorno pré-montadas: decodificar uma jogada é uma indexação
+_JOGADAS = tuple(("JOGADA", celula // 3, celula % 3) for celula in range(9))
+_JOGADAS_9X9 = tuple(("JOGADA", celula // 9, celula % 9) for celula in range(81))
+_FINS = tuple(("FIM_DE_JOGO", simbolo) for simbolo in SIMBOLOS)
+_INICIOS = tuple(("INICIO", simbolo) for simbolo in SIMBOLOS)
+_EMPATE = ("EMPATE",)
+_ERRO = ("ERRO",)
+
+
+def eh_binaria(dados):
+    """
+    Indica se uma mensagem recebida está no formato binário.
+
+    Args:
+        dados: Mensagem recebida (str, bytes ou memoryview)
+
+    Returns:
+        bool: True se o primeiro byte é um opcode binário (< 0x20)
+    """
+    return not isinstance(dados, str) and len(dados) > 0 and dados[0] < 0x20
+
+
+# =====================================================================
+# CRIAÇÃO DE MENSAGENS
+# =====================================================================
+
+def criar_msg_jogada(linha, coluna, binario=False, id_partida=0):
+    """
+    Cria mensagem de jogada.
+
+    Args:
+        linha, coluna (int): Coordenadas da jogada (0-2, ou 0-8 no Ultimate)
+        binario (bool): True se o peer anunciou suporte ao formato binário
+        id_partida (int): Identificador da partida (servidor multi-partidas)
+
+    Returns:
+        str ou bytes: "JOGADA|linha|coluna" ou 4 bytes no formato binário
+    """
+    if binario:
+        if linha > 2 or coluna > 2:
+            return FORMATO_BINARIO.pack(OP_JOGADA_9X9, linha * 9 + coluna, id_partida & 0xFFFF)
+        return FORMATO_BINARIO.pack(OP_JOGADA, linha * 3 + coluna, id_partida & 0xFFFF)
+    return f"JOGADA|{linha}|{coluna}"
+
+
+def criar_msg_fim(vencedor, binario=False, id_partida=0):
+    """Cria mensagem de fim de jogo (vencedor 'X' ou 'O')."""
+    if binario:
+        return FORMATO_BINARIO.pack(OP_FIM_DE_JOGO, INDICE_SIMBOLO[vencedor], id_partida & 0xFFFF)
+    return f"FIM_DE_JOGO|{vencedor}"
+
+
+def criar_msg_empate(binario=False, id_partida=0):
+    """Cria mensagem de empate."""
+    if binario:
+        return FORMATO_BINARIO.pack(OP_EMPATE, 0, id_partida & 0xFFFF)
+    return "EMPATE"
+
+
+def criar_msg_inicio(simbolo, binario=False, id_partida=0):
+    """Cria mensagem de início de partida com o símbolo atribuído."""
+    if binario:
+        return FORMATO_BINARIO.pack(OP_INICIO, INDICE_SIMBOLO[simbolo], id_partida & 0xFFFF)
+    return f"INICIO|{simbolo}"
+
+
+def criar_msg_variante(variante):
+    """Cria o anúncio da variante da partida (sempre em texto, é rara)."""
+    return f"VARIANTE|{variante}"
+
+
+def criar_msg_fila(variante, rating=None):
+    """Cria o pedido de pareamento por variante (e rating, se informado)."""
+    if rating is None:
+        return f"FILA|{variante}"
+    return f"FILA|{variante}|{int(rating)}"
+
+
+def criar_msg_assistir(id_partida=0):
+    """Cria o pedido para assistir a uma partida (0 = a mais recente)."""
+    return f"ASSISTIR|{id_partida}"
+
+
+def criar_msg_estado(jogadas):
+    """Cria o retrato de uma partida: jogadas (linha, coluna) em ordem."""
+    return "ESTADO|" + ";".join(f"{linha},{coluna}" for linha, coluna in jogadas)
+
+
+def criar_msg_reiniciar(numero):
+    """Cria o pedido de revanche para a partida `numero` da sessão."""
+    return f"REINICIAR|{numero}"
+
+
+def criar_msg_protocolo():
+    """Cria o anúncio de suporte ao formato binário (sempre em texto)."""
+    return f"PROTOCOLO|BIN|{VERSAO_BINARIA}"
+
+
+# =====================================================================
+# INTERPRETAÇÃO DE MENSAGENS
+# =====================================================================
+
+def decodificar_binario(dados):
+    """
+    Decodifica uma mensagem binária direto dos bytes (sem str/split/int).
+
+    Args:
+        dados (bytes ou memoryview): Mensagem com 4 bytes
+
+    Returns:
+        tuple: Mesmo formato de interpretar_msg (ex.: ("JOGADA", 1, 2))
+    """
+    if len(dados) < FORMATO_BINARIO.size:
+        return _ERRO
+    opcode = dados[0]
+    argumento = dados[1]
+
+    if opcode == OP_JOGADA:
+        return _JOGADAS[argumento] if argumento < 9 else _ERRO
+    if opcode == OP_JOGADA_9X9:
+        return _JOGADAS_9X9[argumento] if argumento < 81 else _ERRO
+    if opcode == OP_FIM_DE_JOGO:
+        return _FINS[argumento] if argumento < 2 else _ERRO
+    if opcode == OP_EMPATE:
+        return _EMPATE
+    if opcode == OP_INICIO:
+        return _INICIOS[argumento] if argumento < 2 else _ERRO
+    return _ERRO
+
+
+def id_partida(dados):
+    """Retorna o id de partida de uma mensagem binária (0 para texto)."""
+    if not eh_binaria(dados) or len(dados) < FORMATO_BINARIO.size:
+        return 0
+    return FORMATO_BINARIO.unpack_from(dados)[2]
+
+
+def interpretar_msg(msg):
+    """
+    Interpreta mensagem recebida em qualquer um dos formatos.
+
+    Args:
+        msg: str (texto), bytes de texto ou bytes binários
+
+    Returns:
+        tuple: ("JOGADA", linha, coluna), ("FIM_DE_JOGO", vencedor),
+               ("EMPATE",), ("INICIO", simbolo), ("PROTOCOLO", versao),
+               ("VARIANTE", nome), ("FILA", variante, rating ou None),
+               ("ASSISTIR", id_partida), ("ESTADO", jogadas),
+               ("REINICIAR", numero) ou ("ERRO",)
+    """
+    if eh_binaria(msg):
+        return decodificar_binario(msg)
+    if not isinstance(msg, str):
+        msg = bytes(msg).decode(errors='replace')
+
+    partes = msg.strip().split('|')
+    tipo = partes[0]
+
+    try:
+        if tipo == "JOGADA":
+            linha = int(partes[1])
+            coluna = int(partes[2])
+            return tipo, linha, coluna
+        elif tipo == "FIM_DE_JOGO":
+            return tipo, partes[1]
+        elif tipo == "EMPATE":
+            return tipo,
+        elif tipo == "INICIO":
+            return tipo, partes[1]
+        elif tipo == "PROTOCOLO" and partes[1] == "BIN":
+            return tipo, int(partes[2])
+        elif tipo == "VARIANTE" and partes[1] in VARIANTES:
+            return tipo, partes[1]
+        elif tipo == "FILA" and partes[1] in VARIANTES:
+            return tipo, partes[1], int(partes[2]) if len(partes) > 2 else None
+        elif tipo == "ASSISTIR":
+            return tipo, int(partes[1]) if len(partes) > 1 else 0
+        elif tipo == "ESTADO":
+            return tipo, tuple(tuple(int(v) for v in jogada.split(','))
+                               for jogada in partes[1].split(';') if jogada)
+        elif tipo == "REINICIAR":
+            return tipo, int(partes[1])
+    except (IndexError, ValueError):
+        pass
+    return _ERRO
+
+
+def suporta_versao(versao):
+    """True se a versão binária anunciada pelo peer é compatível com a nossa."""
+    return versao == VERSAO_BINARIA
+
+
+if __name__ == '__main__':
+    # Comparação rápida do custo de interpretação dos dois formatos
+    import timeit
+
+    texto = "JOGADA|1|2".encode()
+    binario = criar_msg_jogada(1, 2, binario=True, id_partida=7)
+    n = 1_000_000
+    t_texto = timeit.timeit(lambda: interpretar_msg(texto.decode()), number=n)
+    t_binario = timeit.timeit(lambda: interpretar_msg(binario), number=n)
+    print(f"Texto:   {len(texto)} bytes, {t_texto / n * 1e9:.0f} ns por mensagem")
+    print(f"Binário: {len(binario)} bytes, {t_binario / n * 1e9:.0f} ns por mensagem")
@@ -0,0 +1,380 @@
+# === retransmissor.py ===
+# Retransmissor de partidas em uma única thread (selectors / epoll)
+# No main.py cada partida online usa uma thread para estabelecer_conexao e
+# outra para thread_recepcao_online; um servidor nesse modelo precisaria de
+# duas threads do sistema por partida. Aqui todos os sockets ficam em modo
+# não bloqueante em um único selectors.DefaultSelector (epoll no Linux): a
+# thread só acorda quando algum socket tem dados ou espaço para escrita, então
+# partidas ociosas não custam CPU e custam apenas alguns objetos de memória.
+#
+# O retransmissor não arbitra: pareia clientes TCP por ordem de chegada, envia
+# "INICIO|X" / "INICIO|O" (mesma mensagem de servidor_async.py) e repassa cada
+# frame (framing de p2p.py) de um jogador para o outro. Cada conexão tem um
+# buffer de saída próprio: o envio é tentado na hora e só o que o kernel não
+# aceitou fica guardado, com interesse de escrita registrado até esvaziar.
+
+import selectors
+import socket
+
+from p2p import BufferFrames, codificar_frame
+from protocolo import criar_msg_inicio
+
+# Buffer de recepção inicial por conexão (cresce sob demanda em BufferFrames)
+# Pequeno de propósito: com milhares de partidas ociosas ele domina a memória
+TAMANHO_BUFFER_CONEXAO = 64
+# Bytes pendentes no buffer de saída antes de derrubar um leitor lento
+LIMITE_SAIDA = 64 * 1024
+# Bytes lidos por chamada recv
+TAMANHO_LEITURA = 4096
+# Conexões aceitas por evento do listener (evita monopolizar o loop)
+ACEITES_POR_EVENTO = 256
+
+
+class ConexaoRetransmitida:
+    """
+    Estado de um socket de jogador no retransmissor.
+
+    Atributos:
+        sock: Socket TCP não bloqueante
+        frames: BufferFrames com os bytes recebidos ainda incompletos
+        saida: bytearray com bytes aceitos para envio e ainda não escritos
+        par: Conexão do adversário (None enquanto aguarda)
+        eventos: Máscara registrada no seletor (leitura e, se preciso, escrita)
+    """
+
+    __slots__ = ('sock', 'frames', 'saida', 'par', 'eventos')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.frames = BufferFrames(TAMANHO_BUFFER_CONEXAO)
+        self.saida = bytearray()
+        self.par = None
+        self.eventos = selectors.EVENT_READ
+
+
+class Retransmissor:
+    """
+    Loop de eventos que multiplexa todas as partidas em uma thread.
+
+    Args:
+        ip (str): IP local para bind ('0.0.0.0' ou '::')
+        porta (int): Porta TCP (0 = escolhida pelo sistema)
+
+    Atributos:
+        seletor: selectors.DefaultSelector (epoll no Linux)
+        aguardando: Conexão esperando adversário
+        conexoes: Conexões abertas
+        partidas_ativas / partidas_concluidas: Contadores de partidas
+        frames_repassados: Frames entregues ao adversário
+        derrubadas: Conexões fechadas por excesso no buffer de saída
+    """
+
+    def __init__(self, ip='0.0.0.0', porta=5555):
+        self.seletor = selectors.DefaultSelector()
+        familia = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        self.listener = socket.socket(familia, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((ip, porta))
+        self.listener.listen(1024)
+        self.listener.setblocking(False)
+        self.porta = self.listener.getsockname()[1]
+        self.seletor.register(self.listener, selectors.EVENT_READ, None)
+
+        # Par de sockets para acordar o loop a partir de outra thread (parar)
+        self._despertador, self._campainha = socket.socketpair()
+        self._despertador.setblocking(False)
+        self.seletor.register(self._despertador, selectors.EVENT_READ, self._despertador)
+
+        self.ativo = False
+        self.aguardando = None
+        self.conexoes = set()
+        self.partidas_ativas = 0
+        self.partidas_concluidas = 0
+        self.frames_repassados = 0
+        self.derrubadas = 0
+
+    # =====================================================================
+    # LOOP DE EVENTOS
+    # =====================================================================
+
+    def executar(self):
+        """Atende eventos até parar() ser chamado (bloqueia a thread)."""
+        self.ativo = True
+        while self.ativo:
+            # Sem timeout: com todas as partidas ociosas a thread dorme no epoll
+            for chave, mascara in self.seletor.select():
+                dados = chave.data
+                if dados is None:
+                    self._aceitar()
+                elif dados is self._despertador:
+                    self._despertador.recv(64)
+                elif dados.sock is not None:  # Pode ter sido fechada neste mesmo lote
+                    if mascara & selectors.EVENT_WRITE:
+                        self._escrever(dados)
+                    if mascara & selectors.EVENT_READ and dados.sock is not None:
+                        self._ler(dados)
+        self._fechar_tudo()
+
+    def parar(self):
+        """Pede o encerramento do loop (seguro a partir de outra thread)."""
+        self.ativo = False
+        try:
+            self._campainha.send(b'\0')
+        except OSError:
+            pass
+
+    def _fechar_tudo(self):
+        for conexao in list(self.conexoes):
+            self._fechar(conexao)
+        for sock in (self.listener, self._despertador, self._campainha):
+            try:
+                self.seletor.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+            sock.close()
+        self.seletor.close()
+
+    # =====================================================================
+    # CONEXÕES
+    # =====================================================================
+
+    def _aceitar(self):
+        """Aceita as conexões pendentes e pareia por ordem de chegada."""
+        for _ in range(ACEITES_POR_EVENTO):
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return  # Ex.: limite de descritores atingido; tenta no próximo evento
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conexao = ConexaoRetransmitida(sock)
+            self.conexoes.add(conexao)
+            self.seletor.register(sock, selectors.EVENT_READ, conexao)
+            self._registrar(conexao)
+
+    def _registrar(self, conexao):
+        if self.aguardando is None:
+            self.aguardando = conexao
+            return
+        conexao_x, self.aguardando = self.aguardando, None
+        conexao_x.par, conexao.par = conexao, conexao_x
+        self.partidas_ativas += 1
+        self._enviar(conexao_x, codificar_frame(criar_msg_inicio('X').encode()))
+        self._enviar(conexao, codificar_frame(criar_msg_inicio('O').encode()))
+
+    def _fechar(self, conexao):
+        """Fecha a conexão; o adversário (se houver) é desconectado junto."""
+        if conexao.sock is None:
+            return
+        self.seletor.unregister(conexao.sock)
+        conexao.sock.close()
+        conexao.sock = None
+        self.conexoes.discard(conexao)
+        if self.aguardando is conexao:
+            self.aguardando = None
+        par = conexao.par
+        if par is not None:
+            conexao.par = par.par = None
+            self.partidas_ativas -= 1
+            self.partidas_concluidas += 1
+            self._fechar(par)
+
+    # =====================================================================
+    # LEITURA E ESCRITA NÃO BLOQUEANTES
+    # =====================================================================
+
+    def _ler(self, conexao):
+        try:
+            dados = conexao.sock.recv(TAMANHO_LEITURA)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            dados = b''
+        if not dados:
+            self._fechar(conexao)
+            return
+        par = conexao.par
+        mensagens = conexao.frames.alimentar(dados)
+        if par is None:
+            return  # Ainda sem adversário: nada a repassar
+        if mensagens:
+            self.frames_repassados += len(mensagens)
+            self._enviar(par, b''.join(codificar_frame(msg) for msg in mensagens))
+
+    def _enviar(self, conexao, dados):
+        """
+        Envia imediatamente o que o kernel aceitar; o resto vai para o buffer.
+
+        Com o buffer de saída já ocupado os dados só são acrescentados (a
+        ordem é preservada) e a escrita fica para o evento EVENT_WRITE.
+        """
+        if conexao.sock is None:
+            return
+        if not conexao.saida:
+            try:
+                enviados = conexao.sock.send(dados)
+            except (BlockingIOError, InterruptedError):
+                enviados = 0
+            except OSError:
+                self._fechar(conexao)
+                return
+            if enviados == len(dados):
+                return
+            dados = memoryview(dados)[enviados:]
+        conexao.saida += dados
+        if len(conexao.saida) > LIMITE_SAIDA:
+            self.derrubadas += 1
+            self._fechar(conexao)
+            return
+        self._interesse(conexao, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+    def _escrever(self, conexao):
+        try:
+            enviados = conexao.sock.send(conexao.saida)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._fechar(conexao)
+            return
+        del conexao.saida[:enviados]
+        if not conexao.saida:
+            self._interesse(conexao, selectors.EVENT_READ)
+
+    def _interesse(self, conexao, eventos):
+        if conexao.eventos != eventos:
+            conexao.eventos = eventos
+            self.seletor.modify(conexao.sock, eventos, conexao)
+
+    def estatisticas(self):
+        """
+        Returns:
+            dict: conexoes, partidas_ativas, partidas_concluidas,
+                  frames_repassados e derrubadas
+        """
+        return {
+            'conexoes': len(self.conexoes),
+            'partidas_ativas': self.partidas_ativas,
+            'partidas_concluidas': self.partidas_concluidas,
+            'frames_repassados': self.frames_repassados,
+            'derrubadas': self.derrubadas,
+        }
+
+
+# =====================================================================
+# MEDIÇÃO COM PARTIDAS OCIOSAS
+# =====================================================================
+
+def _clientes_ociosos(porta, partidas, canal):
+    """Processo filho: abre 2 * partidas clientes, espera o INICIO e os mantém parados."""
+    import p2p
+
+    socks = []
+    for _ in range(2 * partidas):
+        sock = socket.create_connection(('127.0.0.1', porta))
+        socks.append(sock)
+    for sock in socks:
+        p2p.receber(sock, 'TCP')  # INICIO|X ou INICIO|O
+    canal.send(len(socks))
+
+    # Ida e volta em algumas partidas enquanto as demais seguem ociosas
+    canal.recv()
+    import time
+    amostras = []
+    for i in range(0, min(len(socks), 200), 2):
+        inicio = time.perf_counter()
+        p2p.enviar(socks[i], b'JOGADA|1|1', 'TCP')
+        p2p.receber(socks[i + 1], 'TCP')
+        amostras.append(time.perf_counter() - inicio)
+    canal.send(sorted(amostras))
+    canal.recv()
+    for sock in socks:
+        sock.close()
+
+
+def _memoria_residente():
+    """RSS do processo atual em bytes (Linux)."""
+    with open('/proc/self/statm') as arquivo:
+        paginas = int(arquivo.read().split()[1])
+    import os
+    return paginas * os.sysconf('SC_PAGE_SIZE')
+
+
+def medir_partidas_ociosas(partidas=10_000):
+    """
+    Mantém `partidas` partidas ociosas e mede memória, CPU e latência.
+
+    Os clientes rodam em outro processo; o retransmissor usa 2 descritores
+    por partida, então o número é limitado por RLIMIT_NOFILE.
+    """
+    import multiprocessing
+    import resource
+    import threading
+    import time
+
+    suave, rigido = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if suave < rigido:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (rigido, rigido))
+        suave = rigido
+    maximo = (suave - 64) // 2
+    if partidas > maximo:
+        print(f"Limite de descritores ({suave}): medindo {maximo} partidas")
+        partidas = maximo
+
+    retransmissor = Retransmissor('127.0.0.1', 0)
+    thread = threading.Thread(target=retransmissor.executar, daemon=True)
+    thread.start()
+    memoria_inicial = _memoria_residente()
+
+    canal, canal_filho = multiprocessing.Pipe()
+    processo = multiprocessing.Process(target=_clientes_ociosos,
+                                       args=(retransmissor.porta, partidas, canal_filho))
+    inicio = time.perf_counter()
+    processo.start()
+    canal.recv()
+    print(f"{partidas} partidas abertas em {time.perf_counter() - inicio:.2f} s: "
+          f"{retransmissor.estatisticas()}")
+    memoria = _memoria_residente() - memoria_inicial
+    print(f"Memória adicional: {memoria / 2**20:.1f} MiB "
+          f"({memoria / partidas:.0f} bytes por partida)")
+
+    cpu = time.process_time()
+    time.sleep(2.0)
+    print(f"CPU em 2 s com todas ociosas: {(time.process_time() - cpu) * 1e3:.1f} ms")
+
+    canal.send(None)
+    amostras = canal.recv()
+    print(f"Ida e volta (mediana de {len(amostras)}): {amostras[len(amostras) // 2] * 1e6:.0f} us")
+    canal.send(None)
+    processo.join()
+    retransmissor.parar()
+    thread.join()
+
+
+def main():
+    """
+    Ponto de entrada em linha de comando.
+
+    Uso:
+        python retransmissor.py [ip] [porta]
+        python retransmissor.py medir [partidas]
+    """
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'medir':
+        medir_partidas_ociosas(int(sys.argv[2]) if len(sys.argv) > 2 else 10_000)
+        return
+
+    ip = sys.argv[1] if len(sys.argv) > 1 else '0.0.0.0'
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 5555
+    retransmissor = Retransmissor(ip, porta)
+    print(f"Retransmissor aguardando partidas em {ip}:{retransmissor.porta}...")
+    try:
+        retransmissor.executar()
+    except KeyboardInterrupt:
+        print(f"Retransmissor encerrado: {retransmissor.estatisticas()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,957 @@
+# === servidor_async.py ===
+# Modo servidor assíncrono (asyncio) para hospedar várias partidas ao mesmo tempo
+# Diferente de p2p.aguardar_conexao (que aceita um único peer e fecha o socket
+# de escuta), este servidor mantém o listener aberto e roda milhares de partidas
+# TCP e UDP em um único event loop, sem criar uma thread por partida.
+#
+# Reaproveita as regras de jogo.py (via jogo_bitboard) e o mesmo protocolo de mensagens do main.py:
+#   "JOGADA|linha|coluna", "FIM_DE_JOGO|vencedor", "EMPATE"
+# Acrescenta apenas a mensagem "INICIO|simbolo", enviada quando dois clientes
+# são pareados, para informar quem joga com 'X' (começa) e quem joga com 'O'.
+# Clientes que negociam o formato binário (protocolo.py) recebem mensagens de
+# 4 bytes com o id da partida; os demais continuam recebendo texto.
+#
+# Opcionalmente (espera_bot), um cliente que espera adversário por muito tempo
+# é pareado com um bot do próprio servidor. O bot especula (especulacao.py):
+# enquanto o cliente pensa, já calcula a resposta para cada jogada possível.
+#
+# Cada servidor tem uma variante padrão (protocolo.VARIANTES). Na Ultimate os
+# dois clientes recebem "VARIANTE|ULTIMATE" antes do INICIO e as jogadas são
+# validadas por jogo_ultimate, que tem a mesma interface do motor bitboard.
+#
+# O pareamento usa fila_pareamento.FilaPareamento: um cliente que envia
+# "FILA|variante|rating" entra no balde daquela variante e faixa de rating;
+# um cliente antigo, que nunca envia FILA, entra no balde geral da variante
+# padrão após ESPERA_FILA. Pares são formados em O(1) com quem espera há mais
+# tempo. Terminada a partida, a mesma conexão pode enviar FILA de novo.
+#
+# Clientes TCP que enviam "ASSISTIR|id" viram espectadores da partida
+# (espectadores.py): recebem o ESTADO e depois cada jogada, codificada uma
+# vez para todos, com fila limitada por espectador.
+#
+# Os dois jogadores de uma partida encerrada formam uma sessão (sessao.py):
+# "REINICIAR|n" de um é repassado ao outro e, com os dois pedidos, a partida
+# seguinte começa na mesma conexão, com os símbolos invertidos e sem passar
+# pela fila. Quem envia FILA deixa a sessão.
+
+import asyncio
+import time
+
+from p2p import BufferFrames, codificar_frame
+from protocolo import (VARIANTE_CLASSICA, VARIANTE_ULTIMATE, criar_msg_empate,
+                       criar_msg_fim, criar_msg_inicio, criar_msg_jogada,
+                       criar_msg_protocolo, criar_msg_reiniciar, criar_msg_variante,
+                       interpretar_msg, suporta_versao)
+from udp_confiavel import (CanalConfiavel, FalhaEntrega, TIPO_ACK, TIPO_DADOS,
+                           codificar_ack, decodificar_pacote)
+# Motor bitboard: mesma interface de jogo.py, validação muito mais barata
+import jogo_bitboard
+import jogo_ultimate
+from especulacao import Especulador
+from espectadores import Transmissao
+from fila_pareamento import FilaPareamento
+from sessao import Sessao
+import tabela_jogo
+
+# Motor de regras (módulo com a interface de jogo.py) e bot padrão por variante
+MOTORES = {
+    VARIANTE_CLASSICA: jogo_bitboard,
+    VARIANTE_ULTIMATE: jogo_ultimate,
+}
+MOTORES_BOT = {
+    VARIANTE_CLASSICA: tabela_jogo.melhor_jogada,
+    VARIANTE_ULTIMATE: jogo_ultimate.melhor_jogada,
+}
+
+# Tempo máximo (segundos) sem atividade antes de descartar um jogador UDP
+# UDP não tem "fim de conexão", então a limpeza precisa ser feita por inatividade
+TIMEOUT_UDP = 300.0
+
+# Segundos que um cliente recém-conectado tem para enviar "FILA|..." antes de
+# entrar no balde geral (sem essa espera ele poderia ser pareado na variante
+# padrão antes de o pedido chegar)
+ESPERA_FILA = 0.2
+
+# Segundos sozinho na fila antes de um cliente TCP ser repassado a outro
+# processo (servidor_multiprocesso); só vale com `repassar` definido
+ESPERA_REPASSE = 0.3
+
+
+class Partida:
+    """
+    Estado de uma partida hospedada pelo servidor.
+
+    Atributos:
+        id: Número sequencial da partida
+        motor: Módulo de regras (jogo_bitboard ou jogo_ultimate)
+        tabuleiro: Tabuleiro criado por motor.criar_tabuleiro()
+        jogadores: Dicionário símbolo -> conexão ('X' e 'O')
+        jogador_atual: Símbolo de quem deve jogar agora
+        encerrada: True quando a partida terminou (vitória, empate ou queda)
+        variante: Variante jogada (protocolo.VARIANTES)
+        jogadas: (linha, coluna) em ordem, para o ESTADO dos espectadores
+        transmissao: Transmissao para os espectadores
+    """
+
+    def __init__(self, id_partida, conexao_x, conexao_o, motor=jogo_bitboard,
+                 variante=VARIANTE_CLASSICA):
+        self.id = id_partida
+        self.motor = motor
+        self.variante = variante
+        self.jogadas = []
+        self.transmissao = Transmissao(self)
+        self.tabuleiro = motor.criar_tabuleiro()
+        self.jogadores = {'X': conexao_x, 'O': conexao_o}
+        self.jogador_atual = 'X'
+        self.encerrada = False
+
+    def oponente(self, conexao):
+        """Retorna a conexão do adversário de `conexao`."""
+        return self.jogadores['O'] if self.jogadores['X'] is conexao else self.jogadores['X']
+
+    def simbolo(self, conexao):
+        """Retorna o símbolo ('X' ou 'O') associado a `conexao`."""
+        return 'X' if self.jogadores['X'] is conexao else 'O'
+
+
+class ConexaoTCP:
+    """
+    Adaptador de um cliente TCP (asyncio StreamWriter) para o servidor.
+
+    Expõe a mesma interface de ConexaoUDP: enviar(msg) e fechar().
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.endereco = writer.get_extra_info('peername')
+        self.partida = None
+        self.binario = False  # Cliente negociou o formato binário
+        self.assistindo = None  # Transmissao assinada como espectador
+        self.sessao = None  # Sessao com o adversário da última partida
+
+    def enviar(self, msg):
+        """Escreve o frame no buffer de saída do transporte (não bloqueia)."""
+        if not self.writer.is_closing():
+            dados = msg if isinstance(msg, bytes) else msg.encode()
+            self.writer.write(codificar_frame(dados))
+
+    def fechar(self):
+        """Fecha o transporte TCP."""
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class ConexaoUDP:
+    """
+    Adaptador de um cliente UDP identificado pelo seu endereço remoto.
+
+    Todos os clientes UDP compartilham o mesmo transporte (um único socket).
+    As mensagens usam a entrega confiável de udp_confiavel (sequência, ACK e
+    retransmissão), a mesma usada por p2p.enviar/receber no cliente.
+    """
+
+    def __init__(self, protocolo, endereco):
+        self.protocolo = protocolo
+        self.endereco = endereco
+        self.partida = None
+        self.binario = False  # Cliente negociou o formato binário
+        self.assistindo = None  # Espectadores só por TCP: sempre None
+        self.sessao = None  # Sessao com o adversário da última partida
+        self.ultima_atividade = time.monotonic()
+        self.canal = CanalConfiavel()
+        self.timer = None  # Retransmissão agendada no event loop
+
+    def enviar(self, msg):
+        """Envia um datagrama DADOS e agenda sua retransmissão."""
+        dados = msg if isinstance(msg, bytes) else msg.encode()
+        pacote = self.canal.preparar_envio(dados, self.protocolo.agora())
+        self.protocolo.transporte.sendto(pacote, self.endereco)
+        self.protocolo.agendar_retransmissao(self)
+
+    def fechar(self):
+        """UDP não tem conexão: nada a fechar além de esquecer o cliente."""
+        pass
+
+
+class ConexaoBot:
+    """
+    Jogador controlado pelo servidor, com a mesma interface das conexões.
+
+    Recebe as mensagens do servidor em enviar() e responde chamando
+    servidor.mensagem(), sempre em um callback separado do event loop (nunca
+    dentro da mensagem do cliente que está sendo processada). Depois de cada
+    jogada, especula em uma thread do executor padrão a resposta para cada
+    jogada possível do cliente.
+
+    Motores lentos (com prazo, como o da Ultimate) não especulam: cada jogada
+    é calculada no executor padrão para não travar o event loop.
+
+    Atributos:
+        servidor: ServidorPartidas que hospeda o bot
+        motor: Função (tabuleiro, jogador) -> jogada
+        especulador: Especulador com o motor do bot (None sem especulação)
+        simbolo: 'X' ou 'O', recebido na mensagem INICIO
+    """
+
+    def __init__(self, servidor, motor, especular=True):
+        self.servidor = servidor
+        self.motor = motor
+        self.especulador = Especulador(motor) if especular else None
+        self.endereco = ('bot', id(self))
+        self.partida = None
+        self.binario = False
+        self.sessao = None
+        self.simbolo = None
+
+    def enviar(self, msg):
+        """Trata uma mensagem do servidor como se tivesse chegado pela rede."""
+        dados = interpretar_msg(msg)
+        tipo = dados[0]
+        loop = asyncio.get_running_loop()
+        if tipo == "INICIO":
+            self.simbolo = dados[1]
+            if self.simbolo == 'X':
+                loop.call_soon(self.jogar)
+            elif self.especulador is not None:
+                self.especular()
+        elif tipo == "JOGADA":
+            loop.call_soon(self.jogar)
+        elif tipo == "REINICIAR":
+            # O bot sempre aceita a revanche
+            loop.call_soon(self.servidor.mensagem, self,
+                           criar_msg_reiniciar(dados[1]).encode())
+
+    def jogar(self):
+        """Faz a jogada do bot (do cache especulativo, se possível)."""
+        partida = self.partida
+        if partida is None or partida.encerrada or partida.jogador_atual != self.simbolo:
+            return
+        if self.especulador is None:
+            futuro = asyncio.get_running_loop().run_in_executor(
+                None, self.motor, partida.tabuleiro.copiar(), self.simbolo
+            )
+            futuro.add_done_callback(lambda f, p=partida: self._jogada_calculada(p, f))
+            return
+        jogada = self.especulador.responder(partida.tabuleiro, self.simbolo)
+        if jogada is None:
+            return
+        self.servidor.mensagem(self, criar_msg_jogada(*jogada).encode())
+        if not partida.encerrada:
+            self.especular()
+
+    def _jogada_calculada(self, partida, futuro):
+        """Jogada vinda do executor: só vale se a partida continua a mesma."""
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        jogada = futuro.result()
+        if jogada is None or partida is not self.partida or partida.encerrada:
+            return
+        self.servidor.mensagem(self, criar_msg_jogada(*jogada).encode())
+
+    def especular(self):
+        """Calcula em segundo plano as respostas para cada jogada do cliente."""
+        partida = self.partida
+        oponente = 'O' if self.simbolo == 'X' else 'X'
+        futuro = asyncio.get_running_loop().run_in_executor(
+            None, self.especulador.calcular, partida.tabuleiro.copiar(), oponente, self.simbolo
+        )
+        futuro.add_done_callback(self._especulacao_pronta)
+
+    def _especulacao_pronta(self, futuro):
+        if not futuro.cancelled() and futuro.exception() is None:
+            self.especulador.instalar(futuro.result())
+
+    def fechar(self):
+        """Nada a fechar: o bot só existe dentro do servidor."""
+        if self.especulador is not None:
+            self.especulador.limpar()
+
+
+class ServidorPartidas:
+    """
+    Núcleo do servidor: pareia clientes e arbitra as partidas.
+
+    É independente de transporte - recebe eventos (registrar, mensagem,
+    desconectar) das camadas TCP e UDP e responde via conexao.enviar().
+
+    Fluxo de uma partida:
+        1. Cliente envia "FILA|variante|rating" e entra no balde pedido
+           (sem FILA em ESPERA_FILA segundos: balde geral da variante padrão)
+        2. Ao chegar um adversário no mesmo balde, cria-se uma Partida
+        3. Quem esperava mais recebe "INICIO|X", o outro recebe "INICIO|O"
+        4. Jogadas são validadas com realizar_jogada() e repassadas ao oponente
+        5. A jogada que vence ou empata encerra a partida: o servidor envia
+           FIM_DE_JOGO/EMPATE aos dois e libera as conexões
+        6. "REINICIAR|n" dos dois jogadores inicia a revanche na mesma sessão
+
+    Args:
+        espera_bot (float): Segundos de espera até parear com um bot
+                            (None desativa os bots)
+        motor_bot: Função (tabuleiro, jogador) -> jogada usada pelos bots
+                   da variante padrão (padrão: MOTORES_BOT da variante)
+        variante (str): Variante padrão (protocolo.VARIANTES)
+        repassar: Função (conexao, variante, rating) -> bool que entrega um
+                  cliente TCP sozinho na fila a outro processo; com ela o
+                  cliente é repassado após ESPERA_REPASSE em vez de esperar
+                  um bot (quem recebe é que pareia com bots)
+    """
+
+    def __init__(self, espera_bot=None, motor_bot=None, variante=VARIANTE_CLASSICA,
+                 repassar=None):
+        self.variante = variante
+        self.repassar = repassar
+        self.repassados = 0             # Clientes entregues a outro processo
+        self.fila = FilaPareamento()    # Conexões esperando adversário
+        self.proximo_id = 1             # Contador de partidas
+        self.partidas = {}              # id -> Partida em andamento
+        self.partidas_ativas = 0
+        self.partidas_concluidas = 0
+        self.revanches = 0              # Partidas iniciadas por REINICIAR
+
+        # === ESPECTADORES (partidas já encerradas) ===
+        self.entregas_espectadores = 0
+        self.ressincronizacoes_espectadores = 0
+        self.espectadores_derrubados = 0
+
+        # === BOTS DO SERVIDOR ===
+        self.espera_bot = espera_bot
+        self.motores_bot = dict(MOTORES_BOT)
+        if motor_bot is not None:
+            self.motores_bot[variante] = motor_bot
+        self.timers_espera = {}         # Conexão -> bot ou repasse agendado
+        self.timers_fila = {}           # Conexão -> entrada no balde geral agendada
+        self.partidas_com_bot = 0
+        self.acertos_especulacao = 0
+        self.falhas_especulacao = 0
+
+    # =====================================================================
+    # EVENTOS DE CONEXÃO
+    # =====================================================================
+
+    def registrar(self, conexao):
+        """
+        Registra um novo cliente: aguarda o pedido FILA por ESPERA_FILA
+        segundos e, sem ele, coloca o cliente no balde geral.
+
+        Args:
+            conexao: ConexaoTCP ou ConexaoUDP recém-chegada
+        """
+        loop = asyncio.get_running_loop()
+        self.timers_fila[conexao] = loop.call_later(ESPERA_FILA, self.entrada_padrao, conexao)
+
+    def entrada_padrao(self, conexao):
+        """Timer de ESPERA_FILA: cliente sem pedido FILA vai para o balde geral."""
+        del self.timers_fila[conexao]
+        self.entrar_na_fila(conexao, self.variante)
+
+    def entrar_na_fila(self, conexao, variante, rating=None):
+        """Coloca o cliente na fila; se já houver adversário, inicia a partida."""
+        par = self.fila.entrar(conexao, variante, rating)
+        if par is None:
+            self.cancelar_timer_espera(conexao)
+            loop = asyncio.get_running_loop()
+            if self.repassar is not None and isinstance(conexao, ConexaoTCP):
+                self.timers_espera[conexao] = loop.call_later(
+                    ESPERA_REPASSE, self.repassar_conexao, conexao, variante, rating
+                )
+            elif self.espera_bot is not None:
+                self.timers_espera[conexao] = loop.call_later(
+                    self.espera_bot, self.parear_com_bot, conexao, variante, rating
+                )
+            return
+        # Pareamento: o cliente mais antigo joga com 'X' (começa)
+        conexao_x, variante = par
+        self.cancelar_timer_espera(conexao_x)
+        self.cancelar_timer_espera(conexao)
+        self.iniciar_partida(conexao_x, conexao, variante)
+
+    def iniciar_partida(self, conexao_x, conexao, variante, sessao=None):
+        """
+        Cria a Partida e avisa os dois jogadores (variante e símbolo).
+
+        Sem `sessao` (pareamento pela fila), os dois abrem uma sessão nova.
+        """
+        partida = Partida(self.proximo_id, conexao_x, conexao, MOTORES[variante], variante)
+        self.partidas[partida.id] = partida
+        self.proximo_id += 1
+        self.partidas_ativas += 1
+        conexao_x.partida = partida
+        conexao.partida = partida
+        if sessao is None:
+            sessao = Sessao((conexao_x, conexao), variante=variante)
+        conexao_x.sessao = sessao
+        conexao.sessao = sessao
+
+        if variante != VARIANTE_CLASSICA:
+            # Clientes antigos só conhecem a clássica: anúncio só quando muda
+            for jogador in (conexao_x, conexao):
+                jogador.enviar(criar_msg_variante(variante))
+        conexao_x.enviar(criar_msg_inicio('X', conexao_x.binario, partida.id))
+        conexao.enviar(criar_msg_inicio('O', conexao.binario, partida.id))
+
+    def desconectar(self, conexao):
+        """
+        Trata a saída de um cliente (queda de conexão ou timeout).
+
+        Se estava em partida, o oponente também é desconectado: o protocolo
+        original não tem mensagem de abandono, e o main.py trata o fechamento
+        do socket como erro de comunicação. Entre partidas, quem ainda está
+        na sessão também é desconectado (a revanche não pode mais acontecer).
+        """
+        if conexao.assistindo is not None:
+            conexao.assistindo.cancelar(conexao)
+        sessao = conexao.sessao
+        conexao.sessao = None
+        timer = self.timers_fila.pop(conexao, None)
+        if timer is not None:
+            timer.cancel()
+            return
+        if self.fila.sair(conexao):
+            self.cancelar_timer_espera(conexao)
+            return
+
+        partida = conexao.partida
+        if partida is not None and not partida.encerrada:
+            oponente = partida.oponente(conexao)
+            self.encerrar_partida(partida)
+            partida.transmissao.encerrar()  # Sem mensagem de abandono: fecha
+            oponente.fechar()
+        elif sessao is not None:
+            oponente = sessao.outro(conexao)
+            if oponente.sessao is sessao and oponente.partida is None:
+                oponente.sessao = None
+                oponente.fechar()
+
+    def encerrar_partida(self, partida, vencedor=None):
+        """
+        Marca a partida como encerrada e atualiza as estatísticas.
+
+        Args:
+            partida: Partida que terminou
+            vencedor: Símbolo do vencedor (None para empate ou abandono)
+        """
+        if partida.encerrada:
+            return
+        partida.encerrada = True
+        sessao = partida.jogadores['X'].sessao
+        if sessao is not None:
+            sessao.registrar_resultado(None if vencedor is None else partida.jogadores[vencedor])
+        del self.partidas[partida.id]
+        self.partidas_ativas -= 1
+        self.partidas_concluidas += 1
+        transmissao = partida.transmissao
+        self.entregas_espectadores += transmissao.entregas
+        self.ressincronizacoes_espectadores += transmissao.ressincronizacoes
+        self.espectadores_derrubados += transmissao.derrubados
+        for conexao in partida.jogadores.values():
+            conexao.partida = None
+            if isinstance(conexao, ConexaoBot) and conexao.especulador is not None:
+                # Zera os contadores: o mesmo bot pode jogar a revanche
+                self.acertos_especulacao += conexao.especulador.acertos
+                self.falhas_especulacao += conexao.especulador.falhas
+                conexao.especulador.acertos = conexao.especulador.falhas = 0
+
+    # =====================================================================
+    # BOTS
+    # =====================================================================
+
+    def parear_com_bot(self, conexao, variante, rating):
+        """Timer de espera_bot: o cliente ainda está sozinho, entra um bot."""
+        self.timers_espera.pop(conexao, None)
+        if conexao in self.fila:
+            self.partidas_com_bot += 1
+            self.entrar_na_fila(ConexaoBot(self, self.motores_bot[variante],
+                                           especular=variante == VARIANTE_CLASSICA),
+                                variante, rating)
+
+    def cancelar_timer_espera(self, conexao):
+        timer = self.timers_espera.pop(conexao, None)
+        if timer is not None:
+            timer.cancel()
+
+    # =====================================================================
+    # REPASSE ENTRE PROCESSOS
+    # =====================================================================
+
+    def repassar_conexao(self, conexao, variante, rating):
+        """
+        Timer de ESPERA_REPASSE: o cliente continua sozinho, então o socket
+        vai para o processo que concentra quem sobrou (servidor_multiprocesso).
+
+        Só repassa com o buffer de saída vazio (nada nosso chega depois do
+        que o outro processo enviar); se não der agora, tenta de novo.
+        """
+        self.timers_espera.pop(conexao, None)
+        if conexao not in self.fila:
+            return
+        transporte = conexao.writer.transport
+        if transporte.get_write_buffer_size() == 0 and self.repassar(conexao, variante, rating):
+            self.fila.sair(conexao)
+            self.repassados += 1
+            conexao.fechar()  # O outro processo tem uma cópia do socket: sem FIN
+            return
+        loop = asyncio.get_running_loop()
+        self.timers_espera[conexao] = loop.call_later(
+            ESPERA_REPASSE, self.repassar_conexao, conexao, variante, rating
+        )
+
+    # =====================================================================
+    # SESSÕES (REVANCHE NA MESMA CONEXÃO)
+    # =====================================================================
+
+    def reiniciar(self, conexao, numero):
+        """
+        Pedido de revanche (REINICIAR|numero) de um jogador entre partidas.
+
+        O primeiro pedido é repassado ao adversário da sessão; quando os dois
+        pediram, a partida `numero` começa com os símbolos invertidos (INICIO
+        de novo para os dois), sem fila e sem nova conexão.
+        """
+        sessao = conexao.sessao
+        if sessao is None or conexao.partida is not None or sessao.aguardando(conexao):
+            return  # Sem sessão, ainda jogando ou pedido repetido
+        oponente = sessao.outro(conexao)
+        if oponente.sessao is not sessao:
+            return  # Adversário voltou para a fila
+        comecou = sessao.pedir(conexao, numero)
+        if not comecou and not sessao.aguardando(conexao):
+            return  # Número fora de ordem
+        oponente.enviar(criar_msg_reiniciar(numero))
+        if comecou:
+            self.revanches += 1
+            conexao_x = sessao.lado_x()
+            self.iniciar_partida(conexao_x, sessao.outro(conexao_x), sessao.variante, sessao)
+
+    # =====================================================================
+    # ESPECTADORES
+    # =====================================================================
+
+    def assistir(self, conexao, id_partida):
+        """
+        Torna `conexao` espectadora da partida `id_partida` (0 = a mais recente).
+
+        Quem está jogando não pode assistir. Para os demais o pedido tira a
+        conexão da fila (e da sessão) antes de tudo: quem pediu ASSISTIR
+        nunca é pareado. Sem a partida pedida, ou por UDP (a fila limitada
+        depende do TCP), a conexão é fechada - o protocolo não tem mensagem
+        de erro e o cliente de espectadores.py trata o fechamento como fim.
+        """
+        if conexao.partida is not None and not conexao.partida.encerrada:
+            return
+        timer = self.timers_fila.pop(conexao, None)
+        if timer is not None:
+            timer.cancel()
+        if self.fila.sair(conexao):
+            self.cancelar_timer_espera(conexao)
+        conexao.sessao = None
+        if conexao.assistindo is not None:
+            conexao.assistindo.cancelar(conexao)
+
+        if id_partida == 0 and self.partidas:
+            id_partida = next(reversed(self.partidas))
+        partida = self.partidas.get(id_partida)
+        if partida is None or not isinstance(conexao, ConexaoTCP):
+            conexao.fechar()  # UDP: sem fila nem partida, sai na próxima limpeza
+            return
+        partida.transmissao.assinar(conexao)
+
+    # =====================================================================
+    # PROCESSAMENTO DE MENSAGENS
+    # =====================================================================
+
+    def mensagem(self, conexao, msg):
+        """
+        Processa uma mensagem recebida de um cliente.
+
+        Args:
+            conexao: Conexão que enviou a mensagem
+            msg (bytes): Mensagem em texto ou no formato binário (protocolo.py)
+        """
+        dados = interpretar_msg(msg)
+        tipo = dados[0]
+
+        if tipo == "PROTOCOLO":
+            # Negociação: cliente aceita binário - responde com nosso anúncio
+            if suporta_versao(dados[1]) and not conexao.binario:
+                conexao.binario = True
+                conexao.enviar(criar_msg_protocolo())
+            return
+
+        if tipo == "FILA":
+            # Vale para quem não está jogando: recém-chegado, já na fila
+            # (troca de balde) ou com a partida anterior encerrada
+            if conexao.partida is None or conexao.partida.encerrada:
+                timer = self.timers_fila.pop(conexao, None)
+                if timer is not None:
+                    timer.cancel()
+                conexao.sessao = None  # Troca a revanche por um novo adversário
+                self.entrar_na_fila(conexao, dados[1], dados[2])
+            return
+
+        if tipo == "REINICIAR":
+            self.reiniciar(conexao, dados[1])
+            return
+
+        if tipo == "ASSISTIR":
+            self.assistir(conexao, dados[1])
+            return
+
+        partida = conexao.partida
+        if partida is None or partida.encerrada:
+            # Cliente ainda sem adversário (ou partida já acabou) - ignora
+            return
+
+        simbolo = partida.simbolo(conexao)
+        oponente = partida.oponente(conexao)
+
+        if tipo == "JOGADA":
+            # === VALIDAÇÃO DA JOGADA COM AS REGRAS DE jogo.py ===
+            _, linha, coluna = dados
+            if simbolo != partida.jogador_atual:
+                return  # Fora da vez - descarta
+            motor = partida.motor
+            if not motor.realizar_jogada(partida.tabuleiro, linha, coluna, simbolo):
+                return  # Casa ocupada ou fora do tabuleiro - descarta
+
+            # Cada destino recebe no formato que negociou
+            oponente.enviar(criar_msg_jogada(linha, coluna, oponente.binario, partida.id))
+            partida.jogador_atual = 'O' if simbolo == 'X' else 'X'
+            partida.jogadas.append((linha, coluna))
+            partida.transmissao.publicar(criar_msg_jogada(linha, coluna))
+
+            # O resultado sai do tabuleiro do servidor, nunca do cliente
+            if motor.verificar_vitoria(partida.tabuleiro, simbolo):
+                for jogador in (conexao, oponente):
+                    jogador.enviar(criar_msg_fim(simbolo, jogador.binario, partida.id))
+                partida.transmissao.publicar(criar_msg_fim(simbolo), final=True)
+                self.encerrar_partida(partida, simbolo)
+            elif (motor.verificar_empate(partida.tabuleiro)
+                  or motor.empate_antecipado(partida.tabuleiro)):
+                # Sem linha possível para ninguém: encerra sem as jogadas restantes
+                for jogador in (conexao, oponente):
+                    jogador.enviar(criar_msg_empate(jogador.binario, partida.id))
+                partida.transmissao.publicar(criar_msg_empate(), final=True)
+                self.encerrar_partida(partida)
+
+        elif tipo in ("FIM_DE_JOGO", "EMPATE"):
+            # Fim declarado pelo cliente: só vale se o tabuleiro confirma. A
+            # jogada final (JOGADA) já encerra a partida acima, então numa
+            # partida em andamento a declaração é falsa e é descartada
+            motor = partida.motor
+            if tipo == "FIM_DE_JOGO":
+                if not motor.verificar_vitoria(partida.tabuleiro, simbolo):
+                    return
+                oponente.enviar(criar_msg_fim(simbolo, oponente.binario, partida.id))
+                partida.transmissao.publicar(criar_msg_fim(simbolo), final=True)
+                self.encerrar_partida(partida, simbolo)
+            elif (motor.verificar_empate(partida.tabuleiro)
+                  or motor.empate_antecipado(partida.tabuleiro)):
+                oponente.enviar(criar_msg_empate(oponente.binario, partida.id))
+                partida.transmissao.publicar(criar_msg_empate(), final=True)
+                self.encerrar_partida(partida)
+
+    def estatisticas(self):
+        """
+        Retorna contadores do servidor.
+
+        Returns:
+            dict: partidas_ativas, partidas_concluidas, partidas_com_bot,
+                  revanches (partidas sem nova conexão), repassados (a
+                  outro processo), a taxa de acerto da especulação dos bots (partidas
+                  encerradas), as métricas da fila (aguardando, pareamentos,
+                  pareamentos_por_segundo e percentis do tempo de espera) e
+                  dos espectadores (atuais, entregas, ressincronizações e
+                  derrubados)
+        """
+        especuladas = self.acertos_especulacao + self.falhas_especulacao
+        transmissoes = [partida.transmissao for partida in self.partidas.values()]
+        estatisticas = {
+            'partidas_ativas': self.partidas_ativas,
+            'partidas_concluidas': self.partidas_concluidas,
+            'partidas_com_bot': self.partidas_com_bot,
+            'revanches': self.revanches,
+            'repassados': self.repassados,
+            'taxa_acerto_especulacao': (self.acertos_especulacao / especuladas
+                                        if especuladas else 0.0),
+            'espectadores': sum(len(t) for t in transmissoes),
+            'entregas_espectadores': (self.entregas_espectadores
+                                      + sum(t.entregas for t in transmissoes)),
+            'ressincronizacoes_espectadores': (self.ressincronizacoes_espectadores
+                                               + sum(t.ressincronizacoes for t in transmissoes)),
+            'espectadores_derrubados': (self.espectadores_derrubados
+                                        + sum(t.derrubados for t in transmissoes)),
+        }
+        estatisticas.update(self.fila.estatisticas())
+        return estatisticas
+
+
+# =====================================================================
+# CAMADA TCP
+# =====================================================================
+
+async def tratar_cliente_tcp(servidor, reader, writer, adotada=None):
+    """
+    Corrotina executada para cada cliente TCP aceito.
+
+    Usa o mesmo framing de p2p.enviar/receber (prefixo de 2 bytes com o
+    tamanho); todos os frames completos de uma leitura são processados.
+
+    Args:
+        adotada (tuple, optional): (variante, rating, binario) de um cliente
+            repassado por outro processo: entra direto na fila
+    """
+    conexao = ConexaoTCP(writer)
+    frames = BufferFrames()
+    if adotada is None:
+        servidor.registrar(conexao)
+    else:
+        variante, rating, conexao.binario = adotada
+        servidor.entrar_na_fila(conexao, variante, rating)
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break  # Conexão fechada pelo cliente
+            for msg in frames.alimentar(data):
+                servidor.mensagem(conexao, msg)
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        servidor.desconectar(conexao)
+        conexao.fechar()
+
+
+# =====================================================================
+# CAMADA UDP
+# =====================================================================
+
+class ProtocoloUDP(asyncio.DatagramProtocol):
+    """
+    Protocolo asyncio que atende todos os clientes UDP em um único socket.
+
+    Reproduz o handshake de p2p.conectar_cliente:
+        Cliente -> "CONEXAO_UDP"
+        Servidor -> "CONEXAO_CONFIRMADA"
+
+    Depois dele, os datagramas seguem o formato de udp_confiavel; as
+    retransmissões são timers do próprio event loop (loop.call_at).
+    """
+
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.transporte = None
+        self.clientes = {}  # endereço -> ConexaoUDP
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+
+    def agora(self):
+        """Relógio monotônico do event loop (base dos prazos de retransmissão)."""
+        return asyncio.get_running_loop().time()
+
+    def datagram_received(self, data, endereco):
+        conexao = self.clientes.get(endereco)
+        pacote = decodificar_pacote(data)
+
+        if pacote is None:
+            if data == b"CONEXAO_UDP":
+                # Handshake (ou retransmissão dele): confirma sempre
+                self.transporte.sendto("CONEXAO_CONFIRMADA".encode(), endereco)
+                if conexao is None:
+                    conexao = ConexaoUDP(self, endereco)
+                    self.clientes[endereco] = conexao
+                    self.servidor.registrar(conexao)
+            return
+
+        tipo, seq, conteudo = pacote
+        if conexao is None:
+            if tipo == TIPO_DADOS:
+                # Retransmissão tardia de cliente já removido - só confirma
+                self.transporte.sendto(codificar_ack(seq), endereco)
+            return
+
+        conexao.ultima_atividade = time.monotonic()
+        if tipo == TIPO_ACK:
+            conexao.canal.processar_ack(seq, self.agora())
+            self.remover_se_encerrado(conexao)
+            return
+
+        ack, novos = conexao.canal.processar_dados(seq, conteudo)
+        self.transporte.sendto(ack, endereco)
+        for msg in novos:
+            partida = conexao.partida
+            self.servidor.mensagem(conexao, msg)
+            if partida is not None and partida.encerrada:
+                # Partida encerrada - esquece os clientes sem envios pendentes
+                # (quem ainda está na sessão fica para a revanche)
+                for jogador in partida.jogadores.values():
+                    self.remover_se_encerrado(jogador)
+
+    # =====================================================================
+    # RETRANSMISSÃO
+    # =====================================================================
+
+    def agendar_retransmissao(self, conexao):
+        """Agenda (se ainda não houver) o timer do próximo prazo da conexão."""
+        prazo = conexao.canal.proximo_prazo()
+        if prazo is None or conexao.timer is not None:
+            return
+        loop = asyncio.get_running_loop()
+        conexao.timer = loop.call_at(prazo, self.retransmitir, conexao)
+
+    def retransmitir(self, conexao):
+        """Reenvia os pacotes vencidos da conexão e reagenda o timer."""
+        conexao.timer = None
+        try:
+            pacotes = conexao.canal.vencidos(self.agora())
+        except FalhaEntrega:
+            # Cliente sumiu - trata como queda de conexão
+            conexao.canal.pendentes.clear()
+            self.servidor.desconectar(conexao)
+            self.clientes.pop(conexao.endereco, None)
+            return
+        for pacote in pacotes:
+            self.transporte.sendto(pacote, conexao.endereco)
+        self.agendar_retransmissao(conexao)
+
+    # =====================================================================
+    # LIMPEZA DE CLIENTES
+    # =====================================================================
+
+    def encerrado(self, conexao):
+        """
+        True se o cliente não joga, não aguarda, não tem envios pendentes e
+        não está numa sessão (o REINICIAR dela ainda pode chegar).
+        """
+        return (conexao.partida is None
+                and conexao.sessao is None
+                and conexao not in self.servidor.fila
+                and conexao not in self.servidor.timers_fila
+                and not conexao.canal.pendentes)
+
+    def remover_se_encerrado(self, conexao):
+        """Esquece o cliente quando ele não tem mais nada a fazer no servidor."""
+        if isinstance(conexao, ConexaoUDP) and self.encerrado(conexao):
+            self.clientes.pop(conexao.endereco, None)
+
+    def remover_encerrados(self):
+        """Remove clientes UDP que não estão mais aguardando nem jogando."""
+        for endereco, conexao in list(self.clientes.items()):
+            if self.encerrado(conexao):
+                del self.clientes[endereco]
+
+    def remover_inativos(self):
+        """Descarta clientes sem atividade há mais de TIMEOUT_UDP segundos."""
+        limite = time.monotonic() - TIMEOUT_UDP
+        for endereco, conexao in list(self.clientes.items()):
+            if conexao.ultima_atividade < limite:
+                self.servidor.desconectar(conexao)
+                conexao.sessao = None
+                if conexao.timer is not None:
+                    conexao.timer.cancel()
+                del self.clientes[endereco]
+        self.remover_encerrados()
+
+
+async def limpar_udp_periodicamente(protocolo):
+    """Tarefa de fundo que executa a limpeza de clientes UDP inativos."""
+    while True:
+        await asyncio.sleep(TIMEOUT_UDP / 10)
+        protocolo.remover_inativos()
+
+
+# =====================================================================
+# INICIALIZAÇÃO DO SERVIDOR
+# =====================================================================
+
+async def iniciar_servidor(ip, porta, protocolos=('TCP', 'UDP'), servidor=None, reuse_port=False):
+    """
+    Abre os listeners TCP e/ou UDP e começa a atender clientes.
+
+    Args:
+        ip (str): IP local para bind ('0.0.0.0' ou '::' para qualquer IP)
+        porta (int): Porta local (a mesma para TCP e UDP)
+        protocolos (tuple): Protocolos a atender ('TCP', 'UDP' ou ambos)
+        servidor (ServidorPartidas, optional): Núcleo a usar (cria um novo se None)
+        reuse_port (bool): Liga SO_REUSEPORT para vários processos dividirem
+                           a mesma porta (ver servidor_multiprocesso.py)
+
+    Returns:
+        tuple: (servidor, lista_de_recursos) - os recursos devem ser fechados
+               ao encerrar (servidor TCP, transporte UDP e tarefas de fundo)
+    """
+    servidor = servidor or ServidorPartidas()
+    loop = asyncio.get_running_loop()
+    recursos = []
+
+    if 'TCP' in protocolos:
+        # Listener TCP permanece aberto - backlog grande para rajadas de conexões
+        servidor_tcp = await asyncio.start_server(
+            lambda r, w: tratar_cliente_tcp(servidor, r, w),
+            ip, porta, backlog=1024, reuse_port=reuse_port or None
+        )
+        recursos.append(servidor_tcp)
+        print(f"Servidor TCP aguardando partidas em {ip}:{porta}...")
+
+    if 'UDP' in protocolos:
+        transporte, protocolo = await loop.create_datagram_endpoint(
+            lambda: ProtocoloUDP(servidor), local_addr=(ip, porta),
+            reuse_port=reuse_port or None
+        )
+        recursos.append(transporte)
+        recursos.append(asyncio.create_task(limpar_udp_periodicamente(protocolo)))
+        print(f"Servidor UDP aguardando partidas em {ip}:{porta}...")
+
+    return servidor, recursos
+
+
+def encerrar_recursos(recursos):
+    """Fecha listeners, transportes e cancela tarefas criadas por iniciar_servidor."""
+    for recurso in recursos:
+        if isinstance(recurso, asyncio.Task):
+            recurso.cancel()
+        else:
+            recurso.close()
+
+
+async def executar_servidor(ip, porta, protocolos=('TCP', 'UDP'), espera_bot=None,
+                            variante=VARIANTE_CLASSICA):
+    """Executa o servidor até ser interrompido (Ctrl+C)."""
+    servidor, recursos = await iniciar_servidor(ip, porta, protocolos,
+                                                ServidorPartidas(espera_bot, variante=variante))
+    try:
+        while True:
+            await asyncio.sleep(60)
+            print(f"Estatísticas: {servidor.estatisticas()}")
+    finally:
+        encerrar_recursos(recursos)
+
+
+def main():
+    """
+    Ponto de entrada em linha de comando.
+
+    Uso:
+        python servidor_async.py [ip] [porta] [TCP|UDP|AMBOS] [espera_bot] [variante]
+
+    espera_bot: segundos até um cliente sem adversário jogar contra um bot
+    (omitido ou "-" = sem bots)
+    variante: CLASSICO (padrão) ou ULTIMATE
+    """
+    import sys
+
+    ip = sys.argv[1] if len(sys.argv) > 1 else '0.0.0.0'
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 5555
+    modo = sys.argv[3].upper() if len(sys.argv) > 3 else 'AMBOS'
+    protocolos = ('TCP', 'UDP') if modo == 'AMBOS' else (modo,)
+    espera_bot = float(sys.argv[4]) if len(sys.argv) > 4 and sys.argv[4] != '-' else None
+    variante = sys.argv[5].upper() if len(sys.argv) > 5 else VARIANTE_CLASSICA
+
+    try:
+        asyncio.run(executar_servidor(ip, porta, protocolos, espera_bot, variante))
+    except KeyboardInterrupt:
+        print("Servidor encerrado.")
+
+
+if __name__ == '__main__':
+    main()
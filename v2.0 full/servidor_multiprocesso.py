@@ -0,0 +1,475 @@
+# === servidor_multiprocesso.py ===
+# Servidor pré-fork: vários processos de servidor_async na mesma porta
+# Um único event loop (servidor_async.py) fica preso a um núcleo por causa do
+# GIL. Aqui um supervisor cria N processos trabalhadores; cada um abre seus
+# próprios listeners TCP e UDP na MESMA porta com SO_REUSEPORT, e o kernel
+# distribui as conexões (TCP) e os datagramas (UDP, por hash do endereço de
+# origem, então um cliente fala sempre com o mesmo processo) entre eles.
+#
+# Cada trabalhador é um servidor completo: o pareamento acontece primeiro
+# dentro do processo que recebeu a conexão. Um cliente TCP que fica sozinho na
+# fila por ESPERA_REPASSE é repassado ao trabalhador central (índice 0): o
+# socket viaja por um socketpair AF_UNIX (SCM_RIGHTS) junto com a variante, o
+# rating e o formato negociado, e o central o coloca na própria fila. Assim
+# dois clientes que o kernel mandou para processos diferentes ainda se
+# encontram, e os bots (espera_bot) só rodam no central.
+#
+# UDP não tem socket por cliente para repassar, e o SO_REUSEPORT prende cada
+# endereço de origem a um processo; por isso só o central atende UDP.
+#
+# O supervisor reinicia trabalhadores que morrerem (com espera crescente se
+# morrerem logo ao iniciar) e soma as estatísticas que cada um envia
+# periodicamente.
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import queue
+import socket
+import time
+from collections import deque
+
+from fila_pareamento import AMOSTRAS_TEMPO, percentis_tempo
+from protocolo import VARIANTE_CLASSICA
+import servidor_async
+
+# Segundos entre envios de estatísticas de cada trabalhador ao supervisor
+INTERVALO_ESTATISTICAS = 1.0
+# Trabalhador que morre antes disso é considerado instável (espera cresce)
+VIDA_MINIMA = 5.0
+ESPERA_REINICIO_INICIAL = 0.5
+ESPERA_REINICIO_MAXIMA = 30.0
+# Contadores históricos preservados quando um trabalhador morre
+CAMPOS_ACUMULADOS = ('partidas_concluidas', 'partidas_com_bot', 'pareamentos', 'revanches',
+                     'repassados')
+# Prefixos de campos que não somam entre trabalhadores (média). Os percentis
+# de tempo_pareamento_* são recalculados das amostras de todos
+CAMPOS_MEDIA = ('taxa_',)
+# Trabalhador que recebe os clientes repassados e atende UDP
+TRABALHADOR_CENTRAL = 0
+
+
+# =====================================================================
+# PROCESSO TRABALHADOR
+# =====================================================================
+
+def repassar_socket(canal, conexao, variante, rating):
+    """
+    Envia ao trabalhador central uma cópia do socket de um cliente sozinho
+    na fila, com a variante, o rating e o formato negociado.
+
+    Returns:
+        bool: False se o canal não aceitou agora (central lento ou reiniciando)
+    """
+    sock = conexao.writer.get_extra_info('socket')
+    dados = f"{variante}|{'' if rating is None else int(rating)}|{int(conexao.binario)}"
+    try:
+        socket.send_fds(canal, [dados.encode()], [sock.fileno()])
+    except OSError:
+        return False
+    return True
+
+
+def _adotar_repassados(servidor, canal, tarefas):
+    """Leitor do canal no trabalhador central: adota cada socket recebido."""
+    while True:
+        try:
+            dados, fds, _, _ = socket.recv_fds(canal, 256, 1)
+        except (BlockingIOError, InterruptedError):
+            return
+        if not fds:
+            continue
+        sock = socket.socket(fileno=fds[0])
+        variante, rating, binario = dados.decode().split('|')
+        if variante not in servidor_async.MOTORES:
+            sock.close()
+            continue
+        adotada = (variante, int(rating) if rating else None, binario == '1')
+        tarefa = asyncio.ensure_future(_atender_adotado(servidor, sock, adotada))
+        tarefas.add(tarefa)
+        tarefa.add_done_callback(tarefas.discard)
+
+
+async def _atender_adotado(servidor, sock, adotada):
+    reader, writer = await asyncio.open_connection(sock=sock)
+    await servidor_async.tratar_cliente_tcp(servidor, reader, writer, adotada)
+
+
+async def _executar_trabalhador(indice, ip, porta, protocolos, espera_bot, variante, fila,
+                                canal=None):
+    central = indice == TRABALHADOR_CENTRAL
+    repassar = (functools.partial(repassar_socket, canal)
+                if canal is not None and not central else None)
+    if canal is not None:
+        canal.setblocking(False)
+    if not central:
+        protocolos = tuple(p for p in protocolos if p == 'TCP')
+    servidor, recursos = await servidor_async.iniciar_servidor(
+        ip, porta, protocolos,
+        servidor_async.ServidorPartidas(espera_bot, variante=variante, repassar=repassar),
+        reuse_port=True,
+    )
+    if central and canal is not None:
+        tarefas = set()
+        loop = asyncio.get_running_loop()
+        loop.add_reader(canal.fileno(), _adotar_repassados, servidor, canal, tarefas)
+    try:
+        vistos = 0  # Pareamentos cujos tempos de espera já foram enviados
+        while True:
+            amostras = servidor.fila.amostras_novas(vistos)
+            vistos = servidor.fila.pareamentos
+            fila.put((indice, os.getpid(), servidor.estatisticas(), amostras))
+            await asyncio.sleep(INTERVALO_ESTATISTICAS)
+    finally:
+        servidor_async.encerrar_recursos(recursos)
+
+
+def trabalhador(indice, ip, porta, protocolos, espera_bot, variante, fila, canal=None):
+    """
+    Ponto de entrada de cada processo trabalhador.
+
+    `canal` é a ponta do socketpair de repasse: o central lê dela, os demais
+    escrevem nela (None com um único trabalhador).
+    """
+    try:
+        asyncio.run(_executar_trabalhador(indice, ip, porta, protocolos,
+                                          espera_bot, variante, fila, canal))
+    except KeyboardInterrupt:
+        pass  # Ctrl+C chega a todo o grupo; quem encerra é o supervisor
+
+
+# =====================================================================
+# SUPERVISOR
+# =====================================================================
+
+class Supervisor:
+    """
+    Cria, vigia e reinicia os processos trabalhadores.
+
+    Args:
+        ip (str): IP local para bind
+        porta (int): Porta compartilhada por todos os trabalhadores
+        processos (int): Número de trabalhadores (padrão: núcleos da máquina)
+        protocolos (tuple): 'TCP', 'UDP' ou ambos
+        espera_bot (float): Repassado a ServidorPartidas (None = sem bots)
+        variante (str): Variante hospedada
+
+    Atributos:
+        trabalhadores: Lista de multiprocessing.Process (índice fixo por vaga)
+        ultimas: Últimas estatísticas recebidas de cada vaga
+        reinicios: Quantas vezes algum trabalhador foi reiniciado
+        herdadas: CAMPOS_ACUMULADOS de trabalhadores que já morreram
+        tempos: Últimos tempos de espera até o pareamento, de todos os
+                trabalhadores (base dos percentis)
+        canais: (ponta do central, ponta dos demais) do socketpair de
+                repasse, mantido aqui para sobreviver aos reinícios
+    """
+
+    def __init__(self, ip, porta, processos=None, protocolos=('TCP', 'UDP'),
+                 espera_bot=None, variante=VARIANTE_CLASSICA):
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise OSError("SO_REUSEPORT não disponível neste sistema; use servidor_async.py")
+        self.argumentos = (ip, porta, protocolos, espera_bot, variante)
+        self.processos = processos or os.cpu_count() or 1
+        if 'TCP' not in protocolos and self.processos > 1:
+            # Só o central atende UDP: os outros trabalhadores ficariam ociosos
+            print("Somente UDP: usando um único trabalhador")
+            self.processos = 1
+        self.canais = (None, None)
+        if self.processos > 1:
+            if not hasattr(socket, 'send_fds'):
+                raise OSError("Repasse de sockets exige Python 3.9+; use um único processo")
+            self.canais = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.fila = multiprocessing.Queue()
+        self.trabalhadores = [None] * self.processos
+        self.iniciado_em = [0.0] * self.processos
+        self.espera = [ESPERA_REINICIO_INICIAL] * self.processos
+        self.reiniciar_em = [None] * self.processos
+        self.ultimas = [None] * self.processos
+        self.reinicios = 0
+        self.herdadas = dict.fromkeys(CAMPOS_ACUMULADOS, 0)
+        self.tempos = deque(maxlen=AMOSTRAS_TEMPO)
+
+    def _iniciar(self, indice):
+        canal = self.canais[0] if indice == TRABALHADOR_CENTRAL else self.canais[1]
+        processo = multiprocessing.Process(
+            target=trabalhador, args=(indice, *self.argumentos, self.fila, canal), daemon=True
+        )
+        processo.start()
+        self.trabalhadores[indice] = processo
+        self.iniciado_em[indice] = time.monotonic()
+        self.reiniciar_em[indice] = None
+
+    def iniciar(self):
+        """Cria todos os trabalhadores."""
+        for indice in range(self.processos):
+            self._iniciar(indice)
+
+    def verificar(self, espera=0.0):
+        """
+        Recebe estatísticas e reinicia trabalhadores mortos.
+
+        Args:
+            espera (float): Tempo máximo esperando a primeira estatística
+        """
+        try:
+            while True:
+                indice, pid, estatisticas, amostras = self.fila.get(timeout=espera)
+                if self.trabalhadores[indice] is not None and self.trabalhadores[indice].pid == pid:
+                    self.ultimas[indice] = estatisticas
+                    self.tempos.extend(amostras)
+                espera = 0.0
+        except queue.Empty:
+            pass
+
+        agora = time.monotonic()
+        for indice, processo in enumerate(self.trabalhadores):
+            if processo.is_alive():
+                continue
+            if self.reiniciar_em[indice] is None:
+                # Acabou de morrer: morte precoce dobra a espera antes do reinício
+                if agora - self.iniciado_em[indice] < VIDA_MINIMA:
+                    self.espera[indice] = min(self.espera[indice] * 2, ESPERA_REINICIO_MAXIMA)
+                else:
+                    self.espera[indice] = ESPERA_REINICIO_INICIAL
+                self.reiniciar_em[indice] = agora + self.espera[indice]
+                if self.ultimas[indice] is not None:
+                    # Partidas em andamento se perderam; as concluídas continuam contando
+                    for campo in CAMPOS_ACUMULADOS:
+                        self.herdadas[campo] += self.ultimas[indice].get(campo, 0)
+                self.ultimas[indice] = None
+                print(f"Trabalhador {indice} (pid {processo.pid}) terminou com código "
+                      f"{processo.exitcode}; reinício em {self.espera[indice]:.1f} s")
+            elif agora >= self.reiniciar_em[indice]:
+                self.reinicios += 1
+                self._iniciar(indice)
+
+    def estatisticas(self):
+        """
+        Soma as últimas estatísticas dos trabalhadores.
+
+        Contadores e vazões são somados; taxas (campos taxa_*) viram a média
+        dos trabalhadores que informaram e os percentis de tempo_pareamento_*
+        saem das amostras juntadas em `tempos`.
+
+        Returns:
+            dict: Campos de ServidorPartidas.estatisticas() + trabalhadores_ativos
+                  e reinicios
+        """
+        informadas = [e for e in self.ultimas if e is not None]
+        total = dict(self.herdadas)
+        for estatisticas in informadas:
+            for campo, valor in estatisticas.items():
+                total[campo] = total.get(campo, 0) + valor
+        for campo, valor in total.items():
+            if campo.startswith(CAMPOS_MEDIA):
+                total[campo] = valor / len(informadas)  # Só existe se alguém informou
+        if informadas:
+            total.update(percentis_tempo(self.tempos))
+        total['trabalhadores_ativos'] = sum(1 for p in self.trabalhadores if p.is_alive())
+        total['reinicios'] = self.reinicios
+        return total
+
+    def executar(self, intervalo_relatorio=60.0):
+        """Vigia os trabalhadores até Ctrl+C, imprimindo o total periodicamente."""
+        self.iniciar()
+        proximo_relatorio = time.monotonic() + intervalo_relatorio
+        try:
+            while True:
+                self.verificar(espera=INTERVALO_ESTATISTICAS)
+                if time.monotonic() >= proximo_relatorio:
+                    print(f"Estatísticas: {self.estatisticas()}")
+                    proximo_relatorio += intervalo_relatorio
+        finally:
+            self.encerrar()
+
+    def encerrar(self):
+        """Termina todos os trabalhadores."""
+        for processo in self.trabalhadores:
+            if processo is not None and processo.is_alive():
+                processo.terminate()
+        for processo in self.trabalhadores:
+            if processo is not None:
+                processo.join(timeout=5)
+        for canal in self.canais:
+            if canal is not None:
+                canal.close()
+
+
+# =====================================================================
+# MEDIÇÃO DE VAZÃO
+# =====================================================================
+
+async def _jogador_de_carga(ip, porta, prazo, concluidas):
+    """Cliente sintético: joga na primeira casa livre, partida após partida."""
+    from p2p import BufferFrames, codificar_frame
+    from protocolo import criar_msg_fila, criar_msg_jogada, interpretar_msg
+
+    while time.monotonic() < prazo:
+        reader, writer = await asyncio.open_connection(ip, porta)
+        writer.write(codificar_frame(criar_msg_fila(VARIANTE_CLASSICA).encode()))
+        frames = BufferFrames()
+        tabuleiro = [' '] * 9
+        vez = terminou = False
+        try:
+            while not terminou:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    return
+                try:
+                    dados = await asyncio.wait_for(reader.read(4096), restante)
+                except asyncio.TimeoutError:
+                    return
+                if not dados:
+                    break
+                for msg in frames.alimentar(dados):
+                    tipo, *campos = interpretar_msg(msg)
+                    if tipo == "INICIO":
+                        vez = campos[0] == 'X'
+                    elif tipo == "JOGADA":
+                        tabuleiro[campos[0] * 3 + campos[1]] = '*'
+                        vez = True
+                    elif tipo in ("FIM_DE_JOGO", "EMPATE"):
+                        concluidas[0] += 1
+                        terminou = True
+                if vez and not terminou:
+                    casa = tabuleiro.index(' ')
+                    tabuleiro[casa] = '*'
+                    writer.write(codificar_frame(criar_msg_jogada(casa // 3, casa % 3).encode()))
+                    vez = False
+        finally:
+            writer.close()
+
+
+def _gerador_de_carga(ip, porta, jogadores, duracao, resultado):
+    """Processo de carga: `jogadores` clientes simultâneos por `duracao` segundos."""
+    async def rodar():
+        prazo = time.monotonic() + duracao
+        concluidas = [0]
+        await asyncio.gather(*(_jogador_de_carga(ip, porta, prazo, concluidas)
+                               for _ in range(jogadores)), return_exceptions=True)
+        resultado.put(concluidas[0])
+    asyncio.run(rodar())
+
+
+def medir_vazao(lista_processos=None, jogadores=200, duracao=5.0):
+    """
+    Partidas por segundo com 1..N trabalhadores (carga em processos separados).
+
+    A carga usa tantos processos geradores quanto trabalhadores, para que
+    o cliente não seja o gargalo. Cada partida conta para os dois jogadores.
+    """
+    nucleos = os.cpu_count() or 1
+    lista_processos = lista_processos or sorted({1, max(1, nucleos // 2), nucleos})
+    print(f"{nucleos} núcleo(s) disponível(is)")
+    for processos in lista_processos:
+        with socket.socket() as provisorio:
+            provisorio.bind(('127.0.0.1', 0))
+            porta = provisorio.getsockname()[1]
+        supervisor = Supervisor('127.0.0.1', porta, processos, protocolos=('TCP',))
+        supervisor.iniciar()
+        time.sleep(0.5)  # Trabalhadores abrindo os listeners
+
+        resultado = multiprocessing.Queue()
+        geradores = [multiprocessing.Process(
+            target=_gerador_de_carga,
+            args=('127.0.0.1', porta, jogadores, duracao, resultado)
+        ) for _ in range(processos)]
+        for gerador in geradores:
+            gerador.start()
+        concluidas = sum(resultado.get() for _ in geradores) // 2
+        for gerador in geradores:
+            gerador.join()
+        supervisor.verificar(espera=INTERVALO_ESTATISTICAS)
+        time.sleep(INTERVALO_ESTATISTICAS)
+        supervisor.verificar()
+        print(f"{processos} trabalhador(es): {concluidas / duracao:,.0f} partidas/s "
+              f"(servidor: {supervisor.estatisticas()})")
+        supervisor.encerrar()
+
+
+def verificar_pareamento(processos=4, tentativas=10, prazo=3.0):
+    """
+    Quantos pares de clientes que chegam juntos recebem INICIO (sem bots).
+
+    Cada tentativa abre dois clientes TCP com FILA da variante clássica; o
+    kernel pode entregá-los a trabalhadores diferentes, e só o repasse ao
+    trabalhador central faz esses dois se encontrarem.
+    """
+    from p2p import codificar_frame
+    from protocolo import criar_msg_fila
+
+    with socket.socket() as provisorio:
+        provisorio.bind(('127.0.0.1', 0))
+        porta = provisorio.getsockname()[1]
+    supervisor = Supervisor('127.0.0.1', porta, processos, protocolos=('TCP',))
+    supervisor.iniciar()
+    time.sleep(0.5)  # Trabalhadores abrindo os listeners
+
+    pareados = 0
+    inicio = time.monotonic()
+    for _ in range(tentativas):
+        clientes = [socket.create_connection(('127.0.0.1', porta)) for _ in range(2)]
+        recebidos = 0
+        for cliente in clientes:
+            cliente.sendall(codificar_frame(criar_msg_fila(VARIANTE_CLASSICA).encode()))
+        for cliente in clientes:
+            cliente.settimeout(prazo)
+            try:
+                recebidos += b"INICIO" in cliente.recv(4096)
+            except socket.timeout:
+                pass
+        pareados += recebidos == 2
+        for cliente in clientes:
+            cliente.close()
+    duracao = time.monotonic() - inicio
+    supervisor.verificar(espera=INTERVALO_ESTATISTICAS)
+    time.sleep(INTERVALO_ESTATISTICAS)
+    supervisor.verificar()
+    repassados = supervisor.estatisticas().get('repassados', 0)
+    supervisor.encerrar()
+    print(f"{processos} trabalhador(es): {pareados}/{tentativas} pares receberam INICIO "
+          f"({repassados} clientes repassados ao central, {duracao / tentativas * 1e3:.0f} ms "
+          f"por tentativa)")
+    return pareados
+
+
+def main():
+    """
+    Ponto de entrada em linha de comando.
+
+    Uso:
+        python servidor_multiprocesso.py [ip] [porta] [TCP|UDP|AMBOS] [processos] [espera_bot] [variante]
+        python servidor_multiprocesso.py medir [processos ...]
+        python servidor_multiprocesso.py parear [processos] [tentativas]
+
+    processos: trabalhadores (omitido ou "-" = um por núcleo)
+    """
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'medir':
+        medir_vazao([int(n) for n in sys.argv[2:]] or None)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'parear':
+        verificar_pareamento(*(int(n) for n in sys.argv[2:4]))
+        return
+
+    ip = sys.argv[1] if len(sys.argv) > 1 else '0.0.0.0'
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 5555
+    modo = sys.argv[3].upper() if len(sys.argv) > 3 else 'AMBOS'
+    protocolos = ('TCP', 'UDP') if modo == 'AMBOS' else (modo,)
+    processos = int(sys.argv[4]) if len(sys.argv) > 4 and sys.argv[4] != '-' else None
+    espera_bot = float(sys.argv[5]) if len(sys.argv) > 5 and sys.argv[5] != '-' else None
+    variante = sys.argv[6].upper() if len(sys.argv) > 6 else VARIANTE_CLASSICA
+
+    supervisor = Supervisor(ip, porta, processos, protocolos, espera_bot, variante)
+    print(f"Supervisor: {supervisor.processos} trabalhadores em {ip}:{porta} ({modo})")
+    try:
+        supervisor.executar()
+    except KeyboardInterrupt:
+        print(f"Servidor encerrado: {supervisor.estatisticas()}")
+
+
+if __name__ == '__main__':
+    main()
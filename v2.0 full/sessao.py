@@ -0,0 +1,266 @@
+# === sessao.py ===
+# Sessão de várias partidas sobre a mesma conexão (série melhor-de-N)
+# Antes, o fim da partida encerrava a conexão: FIM_DE_JOGO/EMPATE paravam a
+# thread de recepção do main.py e "Voltar" fechava o socket, então jogar de
+# novo custava outro handshake TCP (ou a troca CONEXAO_UDP/CONEXAO_CONFIRMADA)
+# e, no servidor, outra passagem pela fila.
+#
+# A revanche é sincronizada com "REINICIAR|n": ao fim de uma partida, cada
+# lado que quer jogar de novo envia o número da próxima partida da sessão. A
+# partida n começa quando os dois pedidos para n se encontram - a ordem não
+# importa e pedidos cruzados também fecham; pedidos com outro número (atrasados
+# ou repetidos) são ignorados. A cada partida os símbolos se invertem, então
+# quem começa (X) alterna.
+#
+# A mesma classe serve ao main.py (lados 'local' e 'remoto') e ao
+# servidor_async (lados = as duas conexões da partida).
+
+# Partidas de uma série (ímpar: vence quem fizer a maioria)
+MELHOR_DE = 3
+
+LADOS_CLIENTE = ('local', 'remoto')
+
+
+def trocar_simbolo(simbolo):
+    """Símbolo do mesmo jogador na partida seguinte da sessão."""
+    return 'O' if simbolo == 'X' else 'X'
+
+
+class Sessao:
+    """
+    Placar de uma série melhor-de-N e sincronização da revanche.
+
+    Quando uma série termina, o próximo REINICIAR aceito começa outra com o
+    placar zerado (a contagem de séries vencidas continua).
+
+    Args:
+        lados (tuple): Identificadores dos dois participantes
+        melhor_de (int): Partidas por série
+        variante (str): Variante das partidas (o servidor repete a mesma
+                        nas revanches; None = definida fora da sessão)
+
+    Atributos:
+        numero: Número da partida atual na sessão (1, 2, ...)
+        em_andamento: False entre o fim de uma partida e o início da próxima
+        partidas_serie: Partidas concluídas na série atual
+        vitorias: lado -> vitórias na série atual
+        series: lado -> séries vencidas na sessão
+        pedidos: Lados que já pediram a partida numero + 1
+        revanches: Partidas iniciadas por REINICIAR (sem nova conexão)
+    """
+
+    def __init__(self, lados=LADOS_CLIENTE, melhor_de=MELHOR_DE, variante=None):
+        self.lados = tuple(lados)
+        self.melhor_de = melhor_de
+        self.variante = variante
+        self.numero = 1
+        self.em_andamento = True
+        self.partidas_serie = 0
+        self.vitorias = dict.fromkeys(self.lados, 0)
+        self.series = dict.fromkeys(self.lados, 0)
+        self.pedidos = set()
+        self.revanches = 0
+
+    def proxima(self):
+        """Número a enviar em REINICIAR para pedir a revanche."""
+        return self.numero + 1
+
+    def campeao(self):
+        """
+        Returns:
+            Lado com maioria na série, ou None (série aberta ou empatada)
+        """
+        lider = max(self.lados, key=self.vitorias.__getitem__)
+        segundo, primeiro = sorted(self.vitorias.values())[-2:]
+        if primeiro > self.melhor_de // 2:
+            return lider
+        if self.partidas_serie >= self.melhor_de and primeiro > segundo:
+            return lider  # Empates na série: maioria simples das vitórias
+        return None
+
+    def serie_encerrada(self):
+        """True se alguém já tem maioria ou as partidas da série acabaram."""
+        return (max(self.vitorias.values()) > self.melhor_de // 2
+                or self.partidas_serie >= self.melhor_de)
+
+    def registrar_resultado(self, vencedor=None):
+        """
+        Conta o resultado da partida atual (uma única vez por partida).
+
+        Args:
+            vencedor: Lado vencedor ou None para empate
+
+        Returns:
+            bool: True se este resultado encerrou a série
+        """
+        if not self.em_andamento:
+            return False
+        self.em_andamento = False
+        self.partidas_serie += 1
+        if vencedor is not None:
+            self.vitorias[vencedor] += 1
+        if not self.serie_encerrada():
+            return False
+        campeao = self.campeao()
+        if campeao is not None:
+            self.series[campeao] += 1
+        return True
+
+    def pedir(self, lado, numero):
+        """
+        Registra o pedido de revanche de `lado` para a partida `numero`.
+
+        Returns:
+            bool: True se os dois lados pediram e a partida `numero` começou
+        """
+        if self.em_andamento or numero != self.proxima():
+            return False  # Partida em curso, pedido atrasado ou repetido
+        self.pedidos.add(lado)
+        if len(self.pedidos) < len(self.lados):
+            return False
+        self.pedidos.clear()
+        if self.serie_encerrada():
+            self.partidas_serie = 0
+            self.vitorias = dict.fromkeys(self.lados, 0)
+        self.numero = numero
+        self.em_andamento = True
+        self.revanches += 1
+        return True
+
+    def lado_x(self, numero=None):
+        """Lado que joga com 'X' na partida `numero` (padrão: a atual)."""
+        numero = self.numero if numero is None else numero
+        return self.lados[(numero - 1) % 2]
+
+    def outro(self, lado):
+        """O adversário de `lado` na sessão."""
+        return self.lados[1] if self.lados[0] == lado else self.lados[0]
+
+    def aguardando(self, lado):
+        """True se `lado` já pediu a revanche e espera o outro."""
+        return lado in self.pedidos
+
+    def placar(self, lado, outro):
+        """Texto curto do placar da série do ponto de vista de `lado`."""
+        return (f"Partida {self.numero} (melhor de {self.melhor_de}) - "
+                f"placar {self.vitorias[lado]} x {self.vitorias[outro]}")
+
+
+if __name__ == '__main__':
+    # Custo para os mesmos dois jogadores começarem outra partida num
+    # servidor_async local: reconectar (TCP: conexão + FILA + pareamento;
+    # UDP: handshake CONEXAO_UDP + FILA + pareamento) contra REINICIAR na
+    # conexão aberta. Cada rodada joga uma partida curta (X vence na primeira
+    # linha) e só o tempo até os dois INICIO é medido. A rodada UDP também
+    # confere que a revanche acontece (o servidor não esquece os jogadores
+    # da sessão quando a partida termina).
+    import asyncio
+    import sys
+    import time
+    from collections import deque
+
+    import p2p
+    import servidor_async
+    from p2p import BufferFrames, codificar_frame
+    from protocolo import (VARIANTE_CLASSICA, criar_msg_fila, criar_msg_jogada,
+                           criar_msg_reiniciar)
+
+    PORTA = 6020
+    JOGADAS = ((0, 0), (1, 0), (0, 1), (1, 1), (0, 2))  # X, O, X, O, X
+
+    class ClienteTCP:
+        """Jogador de teste sobre asyncio, com o framing de p2p."""
+
+        async def conectar(self):
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', PORTA)
+            self.frames = BufferFrames()
+            self.pendentes = deque()
+
+        def enviar(self, msg):
+            self.writer.write(codificar_frame(msg.encode()))
+
+        async def esperar(self, prefixo):
+            while True:
+                while not self.pendentes:
+                    dados = await self.reader.read(65536)
+                    if not dados:
+                        raise ConnectionError("servidor fechou a conexão")
+                    self.pendentes.extend(bytes(m).decode() for m in self.frames.alimentar(dados))
+                msg = self.pendentes.popleft()
+                if msg.startswith(prefixo):
+                    return msg
+
+        def fechar(self):
+            self.writer.close()
+
+    class ClienteUDP:
+        """Jogador de teste com p2p (UDP confiável), bloqueante no executor."""
+
+        async def conectar(self):
+            loop = asyncio.get_running_loop()
+            self.sock, self.endereco = await loop.run_in_executor(
+                None, p2p.conectar_cliente, 'UDP', '127.0.0.1', PORTA)
+
+        def enviar(self, msg):
+            p2p.enviar(self.sock, msg, 'UDP', self.endereco)
+
+        async def esperar(self, prefixo):
+            loop = asyncio.get_running_loop()
+            while True:
+                msg, _ = await loop.run_in_executor(None, p2p.receber, self.sock, 'UDP')
+                if msg is None:
+                    raise ConnectionError("sem resposta do servidor (timeout UDP)")
+                if msg.startswith(prefixo):
+                    return msg
+
+        def fechar(self):
+            p2p.encerrar(self.sock)
+
+    async def jogar(a, b, simbolo_a):
+        x, o = (a, b) if simbolo_a == 'X' else (b, a)
+        for vez, jogada in enumerate(JOGADAS):
+            jogador, outro = (x, o) if vez % 2 == 0 else (o, x)
+            jogador.enviar(criar_msg_jogada(*jogada))
+            await outro.esperar("JOGADA" if vez < len(JOGADAS) - 1 else "FIM_DE_JOGO")
+        await x.esperar("FIM_DE_JOGO")
+
+    async def medir(classe, rodadas):
+        a, b = classe(), classe()
+        tempos = {'reconectar': 0.0, 'revanche': 0.0}
+        for _ in range(rodadas):
+            # Cada rodada: conexões novas (partida 1) e uma revanche (partida 2)
+            for modo in tempos:
+                inicio = time.perf_counter()
+                if modo == 'reconectar':
+                    for cliente in (a, b):
+                        await cliente.conectar()
+                        cliente.enviar(criar_msg_fila(VARIANTE_CLASSICA))
+                        await asyncio.sleep(0)  # a entra na fila antes de b
+                else:
+                    for cliente in (a, b):
+                        cliente.enviar(criar_msg_reiniciar(2))
+                simbolo_a = (await a.esperar("INICIO"))[-1]
+                await b.esperar("INICIO")
+                tempos[modo] += time.perf_counter() - inicio
+                await jogar(a, b, simbolo_a)
+            for cliente in (a, b):
+                cliente.fechar()
+        return tempos
+
+    async def principal(rodadas):
+        servidor, recursos = await servidor_async.iniciar_servidor('127.0.0.1', PORTA)
+        resultados = {'TCP': await medir(ClienteTCP, rodadas),
+                      'UDP': await medir(ClienteUDP, max(1, rodadas // 10))}
+        await asyncio.sleep(0.1)
+        servidor_async.encerrar_recursos(recursos)
+        return resultados, servidor.estatisticas()
+
+    rodadas = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    resultados, estatisticas = asyncio.run(principal(rodadas))
+    for protocolo, tempos in resultados.items():
+        n = rodadas if protocolo == 'TCP' else max(1, rodadas // 10)
+        for modo, total in tempos.items():
+            print(f"{protocolo} {modo:>10}: {total / n * 1e6:7.0f} us até os dois INICIO "
+                  f"({n} rodadas)")
+    print(f"Partidas: {estatisticas['partidas_concluidas']}, "
+          f"revanches: {estatisticas['revanches']}, pareamentos: {estatisticas['pareamentos']}")
@@ -0,0 +1,253 @@
+# === simulacao.py ===
+# Simulação em massa de partidas sem interface (autojogo)
+# Joga milhões de partidas com as regras de jogo.py (ou de qualquer motor com
+# a mesma interface, como jogo_bitboard) para levantar estatísticas de
+# abertura e números de carga do motor de regras.
+#
+# O trabalho é dividido em lotes de partidas distribuídos por um
+# multiprocessing.Pool: cada processo recebe só (semente, quantidade,
+# políticas), joga o lote inteiro e devolve contadores pequenos. Como não há
+# estado compartilhado nem tráfego por partida, a vazão cresce de forma quase
+# linear com a quantidade de núcleos.
+#
+# Uso:
+#   python simulacao.py [partidas] [processos] [politica_x] [politica_o] [motor]
+#   python simulacao.py 1000000 8 aleatoria perfeita jogo_bitboard
+
+import importlib
+import multiprocessing
+import os
+import random
+import time
+
+import tabela_jogo
+
+POLITICAS = ('aleatoria', 'perfeita')
+MOTOR_PADRAO = 'jogo_bitboard'
+TAMANHO_LOTE_PADRAO = 5_000
+
+
+# =====================================================================
+# POLÍTICAS DE JOGO
+# =====================================================================
+
+def _jogada_aleatoria(tabuleiro, jogador, livres, rng):
+    """Escolhe uma casa livre qualquer."""
+    return rng.choice(livres)
+
+
+def _jogada_perfeita(tabuleiro, jogador, livres, rng):
+    """Escolhe ao acaso entre as jogadas ótimas da tabela pré-calculada."""
+    linha, coluna = rng.choice(tabela_jogo.melhores_jogadas(tabuleiro, jogador))
+    return linha * 3 + coluna
+
+
+_FUNCOES_POLITICA = {
+    'aleatoria': _jogada_aleatoria,
+    'perfeita': _jogada_perfeita,
+}
+
+
+class ResultadoSimulacao:
+    """
+    Contadores agregados de um conjunto de partidas.
+
+    Atributos:
+        vitorias_x, vitorias_o, empates: Resultados finais
+        duracoes: duracoes[n] = partidas que terminaram com n jogadas
+        aberturas: aberturas[casa] = [vitórias X, vitórias O, empates] quando
+                   X abriu na casa (0-8)
+        segundos: Tempo de parede da simulação (preenchido por simular)
+    """
+
+    def __init__(self):
+        self.vitorias_x = 0
+        self.vitorias_o = 0
+        self.empates = 0
+        self.duracoes = [0] * 10
+        self.aberturas = [[0, 0, 0] for _ in range(9)]
+        self.segundos = 0.0
+
+    @property
+    def partidas(self):
+        return self.vitorias_x + self.vitorias_o + self.empates
+
+    @property
+    def partidas_por_segundo(self):
+        return self.partidas / self.segundos if self.segundos else 0.0
+
+    def somar(self, outro):
+        """Acumula os contadores de outro resultado (ex.: de um lote)."""
+        self.vitorias_x += outro.vitorias_x
+        self.vitorias_o += outro.vitorias_o
+        self.empates += outro.empates
+        for n, quantidade in enumerate(outro.duracoes):
+            self.duracoes[n] += quantidade
+        for casa, contagem in enumerate(outro.aberturas):
+            for i, quantidade in enumerate(contagem):
+                self.aberturas[casa][i] += quantidade
+        return self
+
+    def relatorio(self):
+        """Texto com resultados, histograma de duração e aberturas."""
+        total = self.partidas or 1
+        linhas = [
+            f"Partidas: {self.partidas:,} em {self.segundos:.2f} s "
+            f"({self.partidas_por_segundo:,.0f} partidas/s)",
+            f"Vitórias X: {self.vitorias_x:,} ({self.vitorias_x / total:.1%})  "
+            f"Vitórias O: {self.vitorias_o:,} ({self.vitorias_o / total:.1%})  "
+            f"Empates: {self.empates:,} ({self.empates / total:.1%})",
+            "",
+            "Duração (jogadas):",
+        ]
+        maior = max(self.duracoes) or 1
+        for n, quantidade in enumerate(self.duracoes):
+            if quantidade:
+                barra = '#' * max(1, round(40 * quantidade / maior))
+                linhas.append(f"  {n}: {quantidade:>12,} {barra}")
+
+        linhas += ["", "Abertura de X (linha, coluna): X vence / O vence / empate"]
+        for casa, (x, o, empate) in enumerate(self.aberturas):
+            soma = x + o + empate
+            if soma:
+                linhas.append(f"  {divmod(casa, 3)}: {x / soma:6.1%} {o / soma:6.1%} "
+                              f"{empate / soma:6.1%}  ({soma:,} partidas)")
+        return "\n".join(linhas)
+
+
+# =====================================================================
+# EXECUÇÃO DE UM LOTE (DENTRO DE CADA PROCESSO)
+# =====================================================================
+
+def simular_lote(semente, quantidade, politica_x='aleatoria', politica_o='aleatoria',
+                 motor=MOTOR_PADRAO):
+    """
+    Joga `quantidade` partidas completas no processo atual.
+
+    Args:
+        semente (int): Semente do gerador (lotes reproduzíveis)
+        quantidade (int): Número de partidas do lote
+        politica_x, politica_o (str): Nome da política de cada jogador
+        motor (str): Módulo com a interface de jogo.py ('jogo' ou 'jogo_bitboard')
+
+    Returns:
+        ResultadoSimulacao: Contadores do lote
+    """
+    modulo = importlib.import_module(motor)
+    criar_tabuleiro = modulo.criar_tabuleiro
+    realizar_jogada = modulo.realizar_jogada
+    verificar_vitoria = modulo.verificar_vitoria
+    verificar_empate = modulo.verificar_empate
+    escolher = {'X': _FUNCOES_POLITICA[politica_x], 'O': _FUNCOES_POLITICA[politica_o]}
+
+    rng = random.Random(semente)
+    resultado = ResultadoSimulacao()
+    for _ in range(quantidade):
+        tabuleiro = criar_tabuleiro()
+        livres = list(range(9))
+        jogador = 'X'
+        abertura = None
+        jogadas = 0
+        while True:
+            casa = escolher[jogador](tabuleiro, jogador, livres, rng)
+            realizar_jogada(tabuleiro, casa // 3, casa % 3, jogador)
+            livres.remove(casa)
+            jogadas += 1
+            if abertura is None:
+                abertura = casa
+
+            if verificar_vitoria(tabuleiro, jogador):
+                if jogador == 'X':
+                    resultado.vitorias_x += 1
+                    resultado.aberturas[abertura][0] += 1
+                else:
+                    resultado.vitorias_o += 1
+                    resultado.aberturas[abertura][1] += 1
+                break
+            if verificar_empate(tabuleiro):
+                resultado.empates += 1
+                resultado.aberturas[abertura][2] += 1
+                break
+            jogador = 'O' if jogador == 'X' else 'X'
+        resultado.duracoes[jogadas] += 1
+    return resultado
+
+
+def _executar_lote(argumentos):
+    """Adaptador para Pool.imap_unordered (um único argumento)."""
+    return simular_lote(*argumentos)
+
+
+# =====================================================================
+# DISTRIBUIÇÃO ENTRE PROCESSOS
+# =====================================================================
+
+def simular(partidas, processos=None, politica_x='aleatoria', politica_o='aleatoria',
+            motor=MOTOR_PADRAO, tamanho_lote=TAMANHO_LOTE_PADRAO, semente=None):
+    """
+    Joga `partidas` partidas distribuídas em lotes por um pool de processos.
+
+    Args:
+        partidas (int): Total de partidas
+        processos (int): Processos do pool (padrão: núcleos disponíveis);
+                         1 executa tudo no processo atual, sem pool
+        politica_x, politica_o (str): 'aleatoria' ou 'perfeita'
+        motor (str): Módulo de regras ('jogo' ou 'jogo_bitboard')
+        tamanho_lote (int): Partidas por tarefa enviada a um processo
+        semente (int): Semente base (None = aleatória)
+
+    Returns:
+        ResultadoSimulacao: Contadores agregados, com o tempo total em `segundos`
+    """
+    for politica in (politica_x, politica_o):
+        if politica not in _FUNCOES_POLITICA:
+            raise ValueError(f"Política desconhecida: {politica} (use {', '.join(POLITICAS)})")
+    if processos is None:
+        processos = os.cpu_count() or 1
+    if semente is None:
+        semente = random.randrange(1 << 32)
+
+    # Lotes com sementes distintas: o resultado depende só de (semente, lotes)
+    lotes = []
+    restantes = partidas
+    while restantes > 0:
+        quantidade = min(tamanho_lote, restantes)
+        lotes.append((semente + len(lotes), quantidade, politica_x, politica_o, motor))
+        restantes -= quantidade
+
+    total = ResultadoSimulacao()
+    inicio = time.perf_counter()
+    if processos == 1:
+        for lote in lotes:
+            total.somar(_executar_lote(lote))
+    else:
+        with multiprocessing.Pool(processos) as pool:
+            for parcial in pool.imap_unordered(_executar_lote, lotes):
+                total.somar(parcial)
+    total.segundos = time.perf_counter() - inicio
+    return total
+
+
+def main():
+    """
+    Ponto de entrada em linha de comando.
+
+    Uso:
+        python simulacao.py [partidas] [processos] [politica_x] [politica_o] [motor]
+    """
+    import sys
+
+    partidas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    processos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    politica_x = sys.argv[3] if len(sys.argv) > 3 else 'aleatoria'
+    politica_o = sys.argv[4] if len(sys.argv) > 4 else 'aleatoria'
+    motor = sys.argv[5] if len(sys.argv) > 5 else MOTOR_PADRAO
+
+    resultado = simular(partidas, processos, politica_x, politica_o, motor)
+    print(f"X: {politica_x}, O: {politica_o}, motor: {motor}, "
+          f"processos: {processos or os.cpu_count()}")
+    print(resultado.relatorio())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+# === solver.py ===
+# Jogador perfeito para o jogo da velha 3x3 (oponente computador / dicas)
+# Busca minimax (forma negamax) com poda alfa-beta sobre bitboards de
+# jogo_bitboard, tabela de transposição indexada por chaves Zobrist e
+# redução pelas 8 simetrias do tabuleiro (4 rotações x espelhamento):
+# posições equivalentes por simetria compartilham a mesma entrada na tabela.
+#
+# A API pública recebe tabuleiros de jogo.py (lista 3x3 de strings) ou
+# TabuleiroBits. Um único Solver compartilhado atende vários bots: depois das
+# primeiras consultas quase toda posição já está na tabela de transposição.
+# Os valores exatos da raiz também vão para um CacheAvaliacao
+# (cache_avaliacao.py), que sobrevive entre execuções: o Solver compartilhado
+# usa o cache padrão; Solvers criados à parte só o usam se receberem um.
+
+from cache_avaliacao import abrir_cache_padrao
+from jogo import ZOBRIST, ZOBRIST_VEZ_O
+from jogo_bitboard import TABULEIRO_CHEIO, TabuleiroBits, de_lista, venceu, venceu_com
+
+# === ORDEM DE BUSCA ===
+# Centro, cantos e depois bordas: as melhores jogadas costumam vir primeiro,
+# o que aumenta a quantidade de cortes alfa-beta
+ORDEM_CASAS = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# Quantidade de bits ligados para cada máscara de 9 bits
+POPCOUNT = tuple(bin(m).count('1') for m in range(1 << 9))
+
+# === SIMETRIAS ===
+# Cada simetria é uma permutação das casas: SIMETRIAS[s][casa] = casa transformada
+def _rotacionar(casa):
+    linha, coluna = divmod(casa, 3)
+    return coluna * 3 + (2 - linha)
+
+def _espelhar(casa):
+    linha, coluna = divmod(casa, 3)
+    return linha * 3 + (2 - coluna)
+
+def _gerar_simetrias():
+    simetrias = []
+    permutacao = list(range(9))
+    for _ in range(4):
+        simetrias.append(tuple(permutacao))
+        simetrias.append(tuple(_espelhar(c) for c in permutacao))
+        permutacao = [_rotacionar(c) for c in permutacao]
+    return tuple(simetrias)
+
+SIMETRIAS = _gerar_simetrias()
+
+# === CHAVES ZOBRIST ===
+# As mesmas chaves de jogo.py: a chave da simetria identidade é igual a
+# jogo.chave_zobrist() do tabuleiro em lista.
+# ZOBRIST_SIMETRIA[s][casa][jogador]: chave da casa depois de aplicar a simetria s.
+# Com isso as 8 chaves (uma por simetria) são atualizadas por XOR a cada jogada
+ZOBRIST_SIMETRIA = tuple(
+    tuple(ZOBRIST[simetria[casa]] for casa in range(9)) for simetria in SIMETRIAS
+)
+
+# === FLAGS DA TABELA DE TRANSPOSIÇÃO ===
+EXATO = 0
+LIMITE_INFERIOR = 1
+LIMITE_SUPERIOR = 2
+
+
+def chaves_simetricas(bits_x, bits_o, indice_vez):
+    """
+    Calcula as 8 chaves Zobrist (uma por simetria) de uma posição.
+
+    Args:
+        bits_x, bits_o (int): Bitboards dos jogadores
+        indice_vez (int): 0 se é a vez do X, 1 se é a vez do O
+
+    Returns:
+        tuple: 8 chaves de 64 bits; min() delas é a chave canônica
+    """
+    chaves = []
+    for tabela in ZOBRIST_SIMETRIA:
+        chave = ZOBRIST_VEZ_O if indice_vez else 0
+        for casa in range(9):
+            bit = 1 << casa
+            if bits_x & bit:
+                chave ^= tabela[casa][0]
+            elif bits_o & bit:
+                chave ^= tabela[casa][1]
+        chaves.append(chave)
+    return tuple(chaves)
+
+
+def _para_bits(tabuleiro):
+    """Aceita lista 3x3 de jogo.py ou TabuleiroBits e devolve (bits_x, bits_o)."""
+    if not isinstance(tabuleiro, TabuleiroBits):
+        tabuleiro = de_lista(tabuleiro)
+    return tabuleiro.bits[0], tabuleiro.bits[1]
+
+
+class Solver:
+    """
+    Busca perfeita com alfa-beta e tabela de transposição canônica.
+
+    Os valores são sempre do ponto de vista de quem joga:
+        > 0: vitória (quanto maior, mais rápida)
+        = 0: empate
+        < 0: derrota (quanto menor, mais rápida)
+
+    Atributos:
+        tabela: chave canônica -> (valor, flag)
+        nos: Nós visitados desde a criação (estatística)
+        acertos_tabela: Consultas resolvidas pela tabela de transposição
+        cache: CacheAvaliacao persistente opcional (chave canônica -> valor exato)
+    """
+
+    def __init__(self, cache=None):
+        self.tabela = {}
+        self.nos = 0
+        self.acertos_tabela = 0
+        self.cache = cache
+
+    def _negamax(self, meu, dele, indice, chaves, alfa, beta):
+        """
+        Valor exato da posição para quem joga (índice `indice`).
+
+        Args:
+            meu, dele (int): Bitboards de quem joga e do adversário
+            indice (int): 0 (X) ou 1 (O) - quem joga
+            chaves (tuple): 8 chaves Zobrist simétricas da posição
+            alfa, beta (int): Janela alfa-beta
+        """
+        self.nos += 1
+        livres = TABULEIRO_CHEIO & ~(meu | dele)
+        if not livres:
+            return 0  # Tabuleiro cheio sem vencedor
+
+        # === CONSULTA À TABELA DE TRANSPOSIÇÃO ===
+        chave = min(chaves)
+        entrada = self.tabela.get(chave)
+        if entrada is not None:
+            valor, flag = entrada
+            if flag == EXATO:
+                self.acertos_tabela += 1
+                return valor
+            if flag == LIMITE_INFERIOR:
+                alfa = max(alfa, valor)
+            else:
+                beta = min(beta, valor)
+            if alfa >= beta:
+                self.acertos_tabela += 1
+                return valor
+
+        alfa_original = alfa
+        melhor = -100
+        vazias_depois = POPCOUNT[livres] - 1
+        for casa in ORDEM_CASAS:
+            bit = 1 << casa
+            if not livres & bit:
+                continue
+            novo = meu | bit
+            if venceu_com(novo, casa):
+                # Vitória imediata: não há nada melhor nesta posição
+                melhor = 1 + vazias_depois
+                break
+            novas_chaves = tuple(
+                (chave_s ^ tabela[casa][indice] ^ ZOBRIST_VEZ_O)
+                for chave_s, tabela in zip(chaves, ZOBRIST_SIMETRIA)
+            )
+            valor = -self._negamax(dele, novo, 1 - indice, novas_chaves, -beta, -alfa)
+            if valor > melhor:
+                melhor = valor
+            if melhor > alfa:
+                alfa = melhor
+            if alfa >= beta:
+                break  # Corte beta
+
+        # === GRAVAÇÃO NA TABELA ===
+        if melhor <= alfa_original:
+            flag = LIMITE_SUPERIOR
+        elif melhor >= beta:
+            flag = LIMITE_INFERIOR
+        else:
+            flag = EXATO
+        self.tabela[chave] = (melhor, flag)
+        return melhor
+
+    def _valor_exato(self, meu, dele, indice, chaves):
+        """Negamax com janela completa, consultando antes o cache persistente."""
+        if self.cache is None:
+            return self._negamax(meu, dele, indice, chaves, -100, 100)
+        chave = min(chaves)
+        valor = self.cache.obter(chave)
+        if valor is None:
+            valor = self._negamax(meu, dele, indice, chaves, -100, 100)
+            self.cache.guardar(chave, valor)
+        return valor
+
+    def _analisar_raiz(self, tabuleiro, jogador):
+        """
+        Avalia cada jogada possível da raiz com janela completa.
+
+        Returns:
+            list: [(casa, valor)] para quem joga; vazia se a partida acabou
+        """
+        bits_x, bits_o = _para_bits(tabuleiro)
+        indice = 0 if jogador == 'X' else 1
+        meu, dele = (bits_x, bits_o) if indice == 0 else (bits_o, bits_x)
+        if venceu(dele):
+            return []  # Adversário já venceu
+        livres = TABULEIRO_CHEIO & ~(meu | dele)
+        chaves = chaves_simetricas(bits_x, bits_o, indice)
+
+        resultados = []
+        vazias_depois = POPCOUNT[livres] - 1
+        for casa in ORDEM_CASAS:
+            bit = 1 << casa
+            if not livres & bit:
+                continue
+            novo = meu | bit
+            if venceu_com(novo, casa):
+                resultados.append((casa, 1 + vazias_depois))
+                continue
+            novas_chaves = tuple(
+                (chave_s ^ tabela[casa][indice] ^ ZOBRIST_VEZ_O)
+                for chave_s, tabela in zip(chaves, ZOBRIST_SIMETRIA)
+            )
+            valor = -self._valor_exato(dele, novo, 1 - indice, novas_chaves)
+            resultados.append((casa, valor))
+        return resultados
+
+    # =====================================================================
+    # CONSULTAS PÚBLICAS
+    # =====================================================================
+
+    def melhores_jogadas(self, tabuleiro, jogador):
+        """
+        Todas as jogadas ótimas para `jogador`.
+
+        Returns:
+            list: [(linha, coluna)] (vazia se a partida já terminou)
+        """
+        resultados = self._analisar_raiz(tabuleiro, jogador)
+        if not resultados:
+            return []
+        melhor = max(valor for _, valor in resultados)
+        return [divmod(casa, 3) for casa, valor in resultados if valor == melhor]
+
+    def melhor_jogada(self, tabuleiro, jogador):
+        """
+        Uma jogada ótima para `jogador` (prefere centro, cantos, bordas).
+
+        Returns:
+            tuple: (linha, coluna) ou None se não há jogadas
+        """
+        jogadas = self.melhores_jogadas(tabuleiro, jogador)
+        return jogadas[0] if jogadas else None
+
+    def avaliar(self, tabuleiro, jogador):
+        """
+        Valor bruto da posição para `jogador`, que está na vez.
+
+        Returns:
+            int: > 0 vitória, 0 empate, < 0 derrota (com jogo perfeito)
+        """
+        bits_x, bits_o = _para_bits(tabuleiro)
+        indice = 0 if jogador == 'X' else 1
+        meu, dele = (bits_x, bits_o) if indice == 0 else (bits_o, bits_x)
+        if venceu(dele):
+            return -(1 + POPCOUNT[TABULEIRO_CHEIO & ~(meu | dele)])
+        return self._valor_exato(meu, dele, indice, chaves_simetricas(bits_x, bits_o, indice))
+
+    def valor_posicao(self, tabuleiro, jogador):
+        """
+        Resultado da posição com jogo perfeito, para `jogador` na vez.
+
+        Returns:
+            int: 1 (vence), 0 (empata) ou -1 (perde)
+        """
+        valor = self.avaliar(tabuleiro, jogador)
+        return (valor > 0) - (valor < 0)
+
+
+# =====================================================================
+# SOLVER COMPARTILHADO (usado pelos bots)
+# =====================================================================
+
+_solver_padrao = Solver(cache=abrir_cache_padrao())
+
+
+def solver_padrao():
+    """O Solver compartilhado do processo (com o cache persistente padrão)."""
+    return _solver_padrao
+
+
+def melhor_jogada(tabuleiro, jogador):
+    """Jogada ótima usando o Solver compartilhado do processo."""
+    return _solver_padrao.melhor_jogada(tabuleiro, jogador)
+
+
+def melhores_jogadas(tabuleiro, jogador):
+    """Todas as jogadas ótimas usando o Solver compartilhado do processo."""
+    return _solver_padrao.melhores_jogadas(tabuleiro, jogador)
+
+
+def valor_posicao(tabuleiro, jogador):
+    """Resultado (1, 0, -1) com jogo perfeito usando o Solver compartilhado."""
+    return _solver_padrao.valor_posicao(tabuleiro, jogador)
@@ -0,0 +1,4 @@
+@echo off
+echo Iniciando o servidor de partidas...
+python servidor_async.py 0.0.0.0 5555 AMBOS
+pause
\ No newline at end of file
@@ -0,0 +1,364 @@
+# === tabela_jogo.py ===
+# Tabela pré-calculada de TODAS as posições alcançáveis do jogo da velha 3x3
+# O jogo padrão tem só 5.478 posições legais, então a IA e as dicas não
+# precisam buscar nada: cada consulta vira uma leitura em um array.
+#
+# Etapa de build (gera tabela_jogo.bin ao lado deste arquivo):
+#   python tabela_jogo.py
+#
+# Formato do arquivo: cabeçalho de 8 bytes + 3^9 entradas de 16 bits
+# (little-endian) indexadas pela chave em base 3 do tabuleiro
+# (casa i vale 0 = vazia, 1 = X, 2 = O, peso 3^i). Cada entrada:
+#   bits 0-8   máscara das jogadas ótimas (bit i = casa linha*3 + coluna)
+#   bits 9-12  profundidade até o fim da partida com jogo perfeito (0-9)
+#   bits 13-14 resultado para quem joga: 1 = derrota, 2 = empate, 3 = vitória
+#              (0 = posição não alcançável a partir de criar_tabuleiro())
+#
+# O arquivo é carregado sob demanda via mmap na primeira consulta: a
+# inicialização do programa não paga nada e o SO compartilha as páginas entre
+# processos. Se o arquivo não existir, ele é gerado na hora (menos de 0,1 s).
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from jogo import DIGITO_SIMBOLO, codificar_tabuleiro
+from jogo_bitboard import TABULEIRO_CHEIO, TabuleiroBits, venceu
+from solver import ORDEM_CASAS, POPCOUNT, Solver, solver_padrao
+
+# === FORMATO DO ARQUIVO ===
+ARQUIVO_TABELA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tabela_jogo.bin')
+CABECALHO = struct.Struct('<4sHH')  # assinatura, versão, reservado
+ASSINATURA = b'VELH'
+VERSAO_TABELA = 1
+ENTRADA = struct.Struct('<H')
+TOTAL_ENTRADAS = 3 ** 9
+
+# === CAMPOS DE CADA ENTRADA ===
+BITS_PROFUNDIDADE = 9
+BITS_RESULTADO = 13
+MASCARA_JOGADAS = 0x1FF
+MASCARA_PROFUNDIDADE = 0xF
+
+NAO_ALCANCAVEL = 0
+DERROTA = 1
+EMPATE = 2
+VITORIA = 3
+
+# BASE3_DE_BITS[mascara] = soma de 3^i para cada bit i ligado: a chave de uma
+# posição em bitboards é BASE3_DE_BITS[x] + 2 * BASE3_DE_BITS[o] (O(1))
+BASE3_DE_BITS = tuple(
+    sum(3 ** i for i in range(9) if mascara >> i & 1) for mascara in range(1 << 9)
+)
+VALOR_SIMBOLO = DIGITO_SIMBOLO
+
+
+def chave_base3(tabuleiro):
+    """
+    Chave em base 3 de um tabuleiro (lista 3x3 de jogo.py ou TabuleiroBits).
+
+    Para listas é o mesmo código de jogo.codificar_tabuleiro.
+
+    Returns:
+        int: Índice 0 a 3^9 - 1 na tabela
+    """
+    if isinstance(tabuleiro, TabuleiroBits):
+        return BASE3_DE_BITS[tabuleiro.bits[0]] + 2 * BASE3_DE_BITS[tabuleiro.bits[1]]
+    return codificar_tabuleiro(tabuleiro)
+
+
+def _vez_pela_chave(chave):
+    """Símbolo de quem joga na posição, pelas contagens de X e O ('X' começa)."""
+    quantidade_x = quantidade_o = 0
+    while chave:
+        chave, digito = divmod(chave, 3)
+        if digito == 1:
+            quantidade_x += 1
+        elif digito == 2:
+            quantidade_o += 1
+    return 'X' if quantidade_x == quantidade_o else 'O'
+
+
+# =====================================================================
+# BUILD: ENUMERAÇÃO DE TODAS AS POSIÇÕES
+# =====================================================================
+
+def _codificar_entrada(resultado, profundidade, jogadas):
+    return resultado << BITS_RESULTADO | profundidade << BITS_PROFUNDIDADE | jogadas
+
+
+def gerar_tabela():
+    """
+    Enumera todas as posições alcançáveis a partir do tabuleiro vazio.
+
+    Usa o Solver para o valor e as jogadas ótimas de cada posição.
+
+    Returns:
+        array: 3^9 entradas de 16 bits (tipo 'H') no formato descrito acima
+    """
+    tabela = array('H', bytes(2 * TOTAL_ENTRADAS))
+    solver = Solver()
+    visitadas = set()
+    pilha = [(0, 0, 0)]  # (bits_x, bits_o, índice de quem joga)
+
+    while pilha:
+        bits_x, bits_o, indice = pilha.pop()
+        chave = BASE3_DE_BITS[bits_x] + 2 * BASE3_DE_BITS[bits_o]
+        if chave in visitadas:
+            continue
+        visitadas.add(chave)
+
+        meu, dele = (bits_x, bits_o) if indice == 0 else (bits_o, bits_x)
+        livres = TABULEIRO_CHEIO & ~(bits_x | bits_o)
+
+        # Posições terminais: o adversário acabou de vencer ou não há casas
+        if venceu(dele):
+            tabela[chave] = _codificar_entrada(DERROTA, 0, 0)
+            continue
+        if not livres:
+            tabela[chave] = _codificar_entrada(EMPATE, 0, 0)
+            continue
+
+        tabuleiro = TabuleiroBits(bits_x, bits_o)
+        resultados = solver._analisar_raiz(tabuleiro, 'X' if indice == 0 else 'O')
+        melhor = max(valor for _, valor in resultados)
+        jogadas = 0
+        for casa, valor in resultados:
+            if valor == melhor:
+                jogadas |= 1 << casa
+
+        # Valor do solver: ±(1 + casas vazias no fim da partida), 0 no empate
+        vazias = POPCOUNT[livres]
+        if melhor > 0:
+            tabela[chave] = _codificar_entrada(VITORIA, vazias - (melhor - 1), jogadas)
+        elif melhor < 0:
+            tabela[chave] = _codificar_entrada(DERROTA, vazias - (-melhor - 1), jogadas)
+        else:
+            tabela[chave] = _codificar_entrada(EMPATE, vazias, jogadas)
+
+        for casa in range(9):
+            bit = 1 << casa
+            if livres & bit:
+                if indice == 0:
+                    pilha.append((bits_x | bit, bits_o, 1))
+                else:
+                    pilha.append((bits_x, bits_o | bit, 0))
+
+    return tabela
+
+
+def salvar_tabela(tabela, caminho=ARQUIVO_TABELA):
+    """Grava a tabela em disco (cabeçalho + entradas little-endian)."""
+    dados = array('H', tabela)
+    if dados.itemsize != 2:
+        raise ValueError("array('H') precisa ter 2 bytes por item")
+    if struct.pack('=H', 1) != ENTRADA.pack(1):
+        dados.byteswap()  # Máquina big-endian: o arquivo é sempre little-endian
+
+    # Nome único: processos que geram a tabela ao mesmo tempo não escrevem
+    # no mesmo temporário
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(caminho)),
+                                     suffix='.tmp', delete=False) as arquivo:
+        temporario = arquivo.name
+        try:
+            arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO_TABELA, 0))
+            arquivo.write(dados.tobytes())
+        except BaseException:
+            arquivo.close()
+            os.unlink(temporario)
+            raise
+    os.chmod(temporario, 0o644)  # NamedTemporaryFile cria com 0600
+    os.replace(temporario, caminho)  # Leitores nunca veem um arquivo pela metade
+
+
+# =====================================================================
+# CARREGAMENTO SOB DEMANDA (MMAP)
+# =====================================================================
+
+def _arquivo_valido(arquivo):
+    """True se o arquivo aberto tem a assinatura, a versão e o tamanho certos."""
+    cabecalho = arquivo.read(CABECALHO.size)
+    if len(cabecalho) < CABECALHO.size:
+        return False
+    assinatura, versao, _ = CABECALHO.unpack(cabecalho)
+    tamanho = os.fstat(arquivo.fileno()).st_size
+    return (assinatura == ASSINATURA and versao == VERSAO_TABELA
+            and tamanho == CABECALHO.size + ENTRADA.size * TOTAL_ENTRADAS)
+
+
+class TabelaJogo:
+    """
+    Acesso O(1) à tabela pré-calculada, mapeada em memória na primeira consulta.
+
+    Atributos:
+        caminho: Arquivo .bin da tabela
+        dados: mmap (ou bytes, se mmap não estiver disponível) após carregar
+        solver: Solver usado para posições fora da tabela (padrão: o
+                compartilhado de solver.py, com cache persistente)
+    """
+
+    def __init__(self, caminho=ARQUIVO_TABELA):
+        self.caminho = caminho
+        self.dados = None
+        self.solver = None
+
+    def _solver(self):
+        if self.solver is None:
+            self.solver = solver_padrao()
+        return self.solver
+
+    def _carregar(self):
+        """
+        Abre (gerando se preciso) e mapeia o arquivo da tabela.
+
+        O cabeçalho e o tamanho são conferidos no mesmo descritor que é
+        mapeado: outro processo pode trocar o arquivo entre a geração e a
+        abertura, e o mmap nunca cobre um arquivo inválido.
+        """
+        for _ in range(2):
+            try:
+                with open(self.caminho, 'rb') as arquivo:
+                    if _arquivo_valido(arquivo):
+                        try:
+                            self.dados = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+                        except (OSError, ValueError):
+                            arquivo.seek(0)
+                            self.dados = arquivo.read()  # Sistemas sem mmap para este arquivo
+                        return self.dados
+            except FileNotFoundError:
+                pass
+            salvar_tabela(gerar_tabela(), self.caminho)
+        raise ValueError(f"Tabela inválida em {self.caminho} mesmo após gerá-la")
+
+    def fechar(self):
+        """Libera o mapeamento (a próxima consulta carrega de novo)."""
+        if isinstance(self.dados, mmap.mmap):
+            self.dados.close()
+        self.dados = None
+
+    def entrada(self, chave):
+        """Entrada bruta de 16 bits da chave em base 3."""
+        dados = self.dados if self.dados is not None else self._carregar()
+        return ENTRADA.unpack_from(dados, CABECALHO.size + ENTRADA.size * chave)[0]
+
+    # =====================================================================
+    # CONSULTAS
+    # =====================================================================
+
+    def consultar(self, tabuleiro):
+        """
+        Dados completos de uma posição.
+
+        Returns:
+            tuple: (resultado, profundidade, mascara_jogadas) para quem está na
+                   vez, ou None se a posição não é alcançável em jogo normal
+        """
+        valor = self.entrada(chave_base3(tabuleiro))
+        resultado = valor >> BITS_RESULTADO
+        if resultado == NAO_ALCANCAVEL:
+            return None
+        return (resultado,
+                valor >> BITS_PROFUNDIDADE & MASCARA_PROFUNDIDADE,
+                valor & MASCARA_JOGADAS)
+
+    def _consultar_para(self, tabuleiro, jogador):
+        """consultar(), mas só se `jogador` é mesmo quem está na vez."""
+        chave = chave_base3(tabuleiro)
+        valor = self.entrada(chave)
+        if valor >> BITS_RESULTADO == NAO_ALCANCAVEL or _vez_pela_chave(chave) != jogador:
+            return None
+        return valor
+
+    def melhores_jogadas(self, tabuleiro, jogador):
+        """
+        Todas as jogadas ótimas para `jogador` (mesma interface do solver).
+
+        Posições fora da tabela (tabuleiro montado à mão, jogador fora da vez)
+        são resolvidas pelo solver.
+
+        Returns:
+            list: [(linha, coluna)] (vazia se a partida já terminou)
+        """
+        valor = self._consultar_para(tabuleiro, jogador)
+        if valor is None:
+            return self._solver().melhores_jogadas(tabuleiro, jogador)
+        jogadas = valor & MASCARA_JOGADAS
+        return [divmod(casa, 3) for casa in ORDEM_CASAS if jogadas >> casa & 1]
+
+    def melhor_jogada(self, tabuleiro, jogador):
+        """Uma jogada ótima (prefere centro, cantos, bordas) ou None."""
+        jogadas = self.melhores_jogadas(tabuleiro, jogador)
+        return jogadas[0] if jogadas else None
+
+    def valor_posicao(self, tabuleiro, jogador):
+        """
+        Resultado da posição com jogo perfeito, para `jogador` na vez.
+
+        Returns:
+            int: 1 (vence), 0 (empata) ou -1 (perde)
+        """
+        valor = self._consultar_para(tabuleiro, jogador)
+        if valor is None:
+            return self._solver().valor_posicao(tabuleiro, jogador)
+        return (valor >> BITS_RESULTADO) - EMPATE
+
+    def profundidade(self, tabuleiro, jogador):
+        """Jogadas até o fim da partida com jogo perfeito dos dois lados."""
+        valor = self._consultar_para(tabuleiro, jogador)
+        if valor is None:
+            solver_valor = self._solver().avaliar(tabuleiro, jogador)
+            vazias = POPCOUNT[TABULEIRO_CHEIO & ~_ocupadas(tabuleiro)]
+            return vazias - (abs(solver_valor) - 1) if solver_valor else vazias
+        return valor >> BITS_PROFUNDIDADE & MASCARA_PROFUNDIDADE
+
+
+def _ocupadas(tabuleiro):
+    """Máscara das casas ocupadas de um tabuleiro em qualquer formato."""
+    if isinstance(tabuleiro, TabuleiroBits):
+        return tabuleiro.ocupadas
+    return sum(1 << (i * 3 + j) for i in range(3) for j in range(3)
+               if tabuleiro[i][j] in VALOR_SIMBOLO)
+
+
+# =====================================================================
+# TABELA COMPARTILHADA DO PROCESSO
+# =====================================================================
+
+_tabela_padrao = TabelaJogo()
+
+
+def melhor_jogada(tabuleiro, jogador):
+    """Jogada ótima por consulta à tabela (carregada na primeira chamada)."""
+    return _tabela_padrao.melhor_jogada(tabuleiro, jogador)
+
+
+def melhores_jogadas(tabuleiro, jogador):
+    """Todas as jogadas ótimas por consulta à tabela."""
+    return _tabela_padrao.melhores_jogadas(tabuleiro, jogador)
+
+
+def valor_posicao(tabuleiro, jogador):
+    """Resultado (1, 0, -1) com jogo perfeito por consulta à tabela."""
+    return _tabela_padrao.valor_posicao(tabuleiro, jogador)
+
+
+if __name__ == '__main__':
+    # Etapa de build: gera o arquivo e mostra estatísticas
+    import time
+
+    inicio = time.perf_counter()
+    tabela = gerar_tabela()
+    salvar_tabela(tabela)
+    duracao = time.perf_counter() - inicio
+    posicoes = sum(1 for valor in tabela if valor >> BITS_RESULTADO)
+    print(f"{posicoes} posições alcançáveis gravadas em {ARQUIVO_TABELA}")
+    print(f"Tamanho: {os.path.getsize(ARQUIVO_TABELA):,} bytes, build em {duracao:.2f} s")
+
+    vazio = [[' '] * 3 for _ in range(3)]
+    n = 100_000
+    inicio = time.perf_counter()
+    for _ in range(n):
+        melhor_jogada(vazio, 'X')
+    print(f"Consulta à tabela: {(time.perf_counter() - inicio) / n * 1e6:.2f} us por jogada")
@@ -0,0 +1,101 @@
+# === trabalhador_ia.py ===
+# Execução da IA fora da thread da interface gráfica
+# Qualquer cálculo de jogada feito dentro de um callback do Tkinter roda na
+# thread principal e congela a janela até terminar. O TrabalhadorIA mantém
+# uma thread de fundo com uma fila de pedidos; o resultado volta para a
+# thread da interface por uma função de agendamento (root.after no main.py).
+#
+# Cada pedido recebe um número de versão. Quando o tabuleiro muda (jogada,
+# reinício, saída da partida) a interface chama cancelar(), que avança a
+# versão: pedidos antigos ainda na fila são descartados sem calcular e
+# resultados que chegarem atrasados são ignorados na entrega.
+
+import queue
+import threading
+
+
+class TrabalhadorIA:
+    """
+    Thread única que calcula jogadas sob demanda.
+
+    Atributos:
+        agendar: Função que executa um callable na thread da interface
+                 (ex.: lambda f: root.after(0, f))
+        versao: Versão atual; resultados de versões anteriores são descartados
+        fila: Pedidos pendentes (versao, funcao, args, callback)
+        calculados: Pedidos efetivamente calculados (estatística)
+        descartados: Pedidos ou resultados descartados por estarem obsoletos
+    """
+
+    def __init__(self, agendar):
+        self.agendar = agendar
+        self.versao = 0
+        self.fila = queue.Queue()
+        self.calculados = 0
+        self.descartados = 0
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _garantir_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._executar, daemon=True)
+            self.thread.start()
+
+    def solicitar(self, funcao, args, callback):
+        """
+        Agenda `funcao(*args)` na thread de fundo.
+
+        `callback(resultado)` é chamado na thread da interface, e só se nenhum
+        cancelar() aconteceu desde o pedido. Os argumentos devem ser cópias:
+        a interface continua livre para alterar o próprio estado.
+
+        Returns:
+            int: Versão do pedido
+        """
+        with self.lock:
+            versao = self.versao
+        self._garantir_thread()
+        self.fila.put((versao, funcao, args, callback))
+        return versao
+
+    def cancelar(self):
+        """Torna obsoletos todos os pedidos feitos até agora."""
+        with self.lock:
+            self.versao += 1
+
+    def obsoleto(self, versao):
+        """True se o pedido `versao` foi cancelado."""
+        with self.lock:
+            return versao != self.versao
+
+    def encerrar(self):
+        """Cancela tudo e encerra a thread de fundo."""
+        self.cancelar()
+        if self.thread is not None:
+            self.fila.put(None)
+            self.thread = None
+
+    def _executar(self):
+        """Laço da thread de fundo."""
+        while True:
+            pedido = self.fila.get()
+            if pedido is None:
+                return
+            versao, funcao, args, callback = pedido
+            if self.obsoleto(versao):
+                self.descartados += 1  # Tabuleiro mudou antes de começar
+                continue
+            try:
+                resultado = funcao(*args)
+            except Exception as e:
+                print(f"Erro no cálculo da IA: {e}")
+                continue
+            self.calculados += 1
+            self.agendar(lambda v=versao, r=resultado, c=callback: self._entregar(v, r, c))
+
+    def _entregar(self, versao, resultado, callback):
+        """Executa na thread da interface: confere a versão de novo antes de usar."""
+        if self.obsoleto(versao):
+            self.descartados += 1
+            return
+        callback(resultado)
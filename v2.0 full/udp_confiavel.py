@@ -0,0 +1,307 @@
+# === udp_confiavel.py ===
+# Camada de entrega confiável sobre UDP (usada por p2p.enviar/receber)
+# UDP não garante entrega: um único datagrama "JOGADA" perdido travava a partida
+# até o timeout de 30 s. Aqui cada mensagem recebe um número de sequência,
+# o receptor confirma com ACK e o emissor retransmite o que não foi confirmado,
+# com prazo calculado a partir do RTT medido (SRTT/RTTVAR, como no TCP).
+#
+# Formato dos datagramas (após o handshake CONEXAO_UDP, que continua em texto):
+#   DADOS: [0x01][seq: 4 bytes big-endian][conteúdo da mensagem]
+#   ACK:   [0x02][seq: 4 bytes big-endian]
+#
+# CanalConfiavel não faz I/O (só calcula o que enviar), por isso é usado tanto
+# pelo TransporteConfiavel bloqueante do p2p quanto pelo servidor_async.
+
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+# === TIPOS DE PACOTE ===
+TIPO_DADOS = 0x01
+TIPO_ACK = 0x02
+CABECALHO = struct.Struct('!BI')
+
+# === PARÂMETROS DE RETRANSMISSÃO (RFC 6298, ajustados para jogo em rede local) ===
+RTO_INICIAL = 0.5       # Antes da primeira medida de RTT
+RTO_MINIMO = 0.03       # O mínimo de 1 s do TCP seria lento demais para o jogo
+RTO_MAXIMO = 3.0        # Teto do prazo de retransmissão
+ALFA = 1 / 8            # Peso da nova amostra no SRTT
+BETA = 1 / 4            # Peso da nova amostra no RTTVAR
+
+# Backoff por pacote limitado a 2**BACKOFF_MAXIMO vezes o RTO. Diferente do
+# TCP, o RTO base não é dobrado a cada perda: as mensagens do jogo são poucas
+# e minúsculas, então reenviar cedo não congestiona a rede e mantém a latência
+# baixa mesmo com 10-20% de perda.
+BACKOFF_MAXIMO = 3
+TEMPO_MAXIMO_SEM_ACK = 10.0  # Depois disso o peer é considerado perdido
+
+# Intervalo máximo de espera do recvfrom quando não há nada pendente,
+# para que envios feitos por outra thread sejam retransmitidos a tempo
+ESPERA_MAXIMA = 0.1
+
+
+class FalhaEntrega(ConnectionError):
+    """Mensagem não confirmada dentro de TEMPO_MAXIMO_SEM_ACK segundos."""
+
+
+class EstimadorRTT:
+    """
+    Estima o RTT e calcula o timeout de retransmissão (RTO).
+
+    Atributos:
+        srtt: RTT suavizado (None até a primeira amostra)
+        rttvar: Variação do RTT
+        rto: Timeout de retransmissão atual
+    """
+
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.rto = RTO_INICIAL
+
+    def registrar_amostra(self, rtt):
+        """
+        Atualiza SRTT/RTTVAR com uma nova medida e recalcula o RTO.
+
+        Args:
+            rtt (float): Tempo (s) entre envio e ACK de um pacote NÃO retransmitido
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ALFA) * self.srtt + ALFA * rtt
+        self.rto = min(RTO_MAXIMO, max(RTO_MINIMO, self.srtt + 4 * self.rttvar))
+
+    def prazo_retransmissao(self, tentativas):
+        """
+        Tempo de espera pelo ACK de um pacote já enviado `tentativas` vezes.
+
+        Returns:
+            float: RTO com backoff exponencial limitado (em segundos)
+        """
+        return min(RTO_MAXIMO, self.rto * (2 ** min(tentativas, BACKOFF_MAXIMO)))
+
+
+def codificar_dados(seq, conteudo):
+    """Monta um datagrama DADOS com o número de sequência."""
+    return CABECALHO.pack(TIPO_DADOS, seq) + conteudo
+
+
+def codificar_ack(seq):
+    """Monta um datagrama ACK confirmando `seq`."""
+    return CABECALHO.pack(TIPO_ACK, seq)
+
+
+def decodificar_pacote(dados):
+    """
+    Separa cabeçalho e conteúdo de um datagrama.
+
+    Returns:
+        tuple: (tipo, seq, conteudo) ou None se não for um pacote desta camada
+               (ex.: "CONEXAO_UDP" do handshake em texto)
+    """
+    if len(dados) < CABECALHO.size or dados[0] not in (TIPO_DADOS, TIPO_ACK):
+        return None
+    tipo, seq = CABECALHO.unpack_from(dados)
+    return tipo, seq, dados[CABECALHO.size:]
+
+
+class CanalConfiavel:
+    """
+    Estado de entrega confiável com UM peer (sequências, ACKs, RTT).
+
+    Não faz I/O: cada método devolve os datagramas que devem ser enviados.
+
+    Atributos:
+        rtt: EstimadorRTT do peer
+        proximo_seq: Próximo número de sequência a enviar
+        pendentes: seq -> [pacote, instante_envio, prazo, retransmissões]
+        proximo_esperado: Próximo seq a entregar para a aplicação
+        fora_de_ordem: seq -> conteúdo recebido antes da hora
+        retransmissoes: Contador de pacotes retransmitidos
+        duplicados: Contador de pacotes recebidos repetidos
+    """
+
+    def __init__(self):
+        self.rtt = EstimadorRTT()
+        self.proximo_seq = 0
+        self.pendentes = {}
+        self.proximo_esperado = 0
+        self.fora_de_ordem = {}
+        self.retransmissoes = 0
+        self.duplicados = 0
+
+    def preparar_envio(self, conteudo, agora):
+        """
+        Registra uma nova mensagem como pendente de confirmação.
+
+        Returns:
+            bytes: Datagrama DADOS a ser enviado
+        """
+        seq = self.proximo_seq
+        self.proximo_seq += 1
+        pacote = codificar_dados(seq, conteudo)
+        self.pendentes[seq] = [pacote, agora, agora + self.rtt.rto, 0]
+        return pacote
+
+    def processar_ack(self, seq, agora):
+        """Remove `seq` dos pendentes e mede o RTT (algoritmo de Karn)."""
+        pendente = self.pendentes.pop(seq, None)
+        if pendente is not None and pendente[3] == 0:
+            # Só amostra pacotes não retransmitidos - senão o ACK é ambíguo
+            self.rtt.registrar_amostra(agora - pendente[1])
+
+    def processar_dados(self, seq, conteudo):
+        """
+        Trata um datagrama DADOS recebido.
+
+        Returns:
+            tuple: (ack, entregues) - datagrama ACK a enviar (sempre, mesmo
+                   para duplicados, pois o ACK anterior pode ter se perdido)
+                   e lista de conteúdos liberados em ordem para a aplicação
+        """
+        ack = codificar_ack(seq)
+        if seq < self.proximo_esperado or seq in self.fora_de_ordem:
+            self.duplicados += 1
+            return ack, []
+
+        self.fora_de_ordem[seq] = conteudo
+        entregues = []
+        while self.proximo_esperado in self.fora_de_ordem:
+            entregues.append(self.fora_de_ordem.pop(self.proximo_esperado))
+            self.proximo_esperado += 1
+        return ack, entregues
+
+    def vencidos(self, agora):
+        """
+        Seleciona pacotes cujo prazo expirou e reagenda cada um.
+
+        Returns:
+            list: Datagramas a retransmitir
+
+        Raises:
+            FalhaEntrega: Se algum pacote está sem ACK há TEMPO_MAXIMO_SEM_ACK
+        """
+        retransmitir = []
+        for pendente in self.pendentes.values():
+            if pendente[2] > agora:
+                continue
+            if agora - pendente[1] > TEMPO_MAXIMO_SEM_ACK:
+                raise FalhaEntrega("Peer não confirmou a mensagem")
+            pendente[3] += 1
+            pendente[2] = agora + self.rtt.prazo_retransmissao(pendente[3])
+            retransmitir.append(pendente[0])
+        self.retransmissoes += len(retransmitir)
+        return retransmitir
+
+    def proximo_prazo(self):
+        """Instante da próxima retransmissão (None se nada pendente)."""
+        if not self.pendentes:
+            return None
+        return min(pendente[2] for pendente in self.pendentes.values())
+
+
+class TransporteConfiavel:
+    """
+    Entrega confiável bloqueante sobre um socket UDP (um canal por peer).
+
+    enviar() pode ser chamado de qualquer thread; receber() deve ser chamado
+    por uma única thread (no main.py, a thread de recepção), que também
+    processa ACKs e faz as retransmissões enquanto espera.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.canais = {}            # (ip, porta) -> CanalConfiavel
+        self.entregues = deque()    # (conteúdo, endereço) prontos para a aplicação
+        self.lock = threading.Lock()
+
+    def canal(self, endereco):
+        """Retorna (criando se necessário) o canal do peer `endereco`."""
+        # IPv6 devolve (ip, porta, flow_info, scope_id) - a chave usa só (ip, porta)
+        chave = endereco[:2]
+        canal = self.canais.get(chave)
+        if canal is None:
+            canal = self.canais[chave] = CanalConfiavel()
+        return canal
+
+    def enviar(self, conteudo, endereco):
+        """Envia uma mensagem com número de sequência e aguarda ACK em segundo plano."""
+        with self.lock:
+            pacote = self.canal(endereco).preparar_envio(conteudo, time.monotonic())
+        self.sock.sendto(pacote, endereco)
+
+    def _retransmitir_vencidos(self, agora):
+        """Retransmite pacotes vencidos e retorna o próximo prazo global."""
+        proximo = None
+        with self.lock:
+            for endereco, canal in self.canais.items():
+                for pacote in canal.vencidos(agora):
+                    self.sock.sendto(pacote, endereco)
+                prazo = canal.proximo_prazo()
+                if prazo is not None and (proximo is None or prazo < proximo):
+                    proximo = prazo
+        return proximo
+
+    def receber(self, timeout, todas=True):
+        """
+        Aguarda até `timeout` segundos por mensagens novas.
+
+        Args:
+            timeout (float): Tempo máximo de espera em segundos
+            todas (bool): Se False, retorna só a primeira mensagem disponível
+
+        Returns:
+            tuple: (lista_de_conteudos, endereco) de UM peer
+
+        Raises:
+            socket.timeout: Nenhuma mensagem chegou dentro do prazo
+            FalhaEntrega: Peer parou de confirmar mensagens enviadas
+        """
+        limite = time.monotonic() + timeout
+        while not self.entregues:
+            agora = time.monotonic()
+            if agora >= limite:
+                raise socket.timeout("timed out")
+
+            # Acorda a tempo da próxima retransmissão (ou do fim do timeout)
+            prazo = self._retransmitir_vencidos(agora)
+            espera = min(limite, agora + ESPERA_MAXIMA)
+            if prazo is not None:
+                espera = min(espera, prazo)
+            self.sock.settimeout(max(0.001, espera - agora))
+
+            try:
+                dados, endereco = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            self._processar_datagrama(dados, endereco)
+
+        conteudo, endereco = self.entregues.popleft()
+        mensagens = [conteudo]
+        while todas and self.entregues and self.entregues[0][1] == endereco:
+            mensagens.append(self.entregues.popleft()[0])
+        return mensagens, endereco
+
+    def _processar_datagrama(self, dados, endereco):
+        """Trata ACK, DADOS ou um handshake repetido."""
+        pacote = decodificar_pacote(dados)
+        if pacote is None:
+            if dados == b"CONEXAO_UDP":
+                # Cliente não recebeu nossa confirmação - responde de novo
+                self.sock.sendto(b"CONEXAO_CONFIRMADA", endereco)
+            return  # Confirmações repetidas e lixo são ignorados
+
+        tipo, seq, conteudo = pacote
+        with self.lock:
+            canal = self.canal(endereco)
+            if tipo == TIPO_ACK:
+                canal.processar_ack(seq, time.monotonic())
+                return
+            ack, novos = canal.processar_dados(seq, conteudo)
+        self.sock.sendto(ack, endereco)
+        self.entregues.extend((conteudo, endereco) for conteudo in novos)